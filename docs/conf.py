@@ -319,6 +319,8 @@ texinfo_documents = [
 intersphinx_mapping = {
     "python": ("https://docs.python.org/", None),
     "datacites": ("https://datacite.readthedocs.io/en/latest/", None),
+    "flask": ("https://flask.palletsprojects.com/en/stable/", None),
+    "sqlalchemy": ("https://docs.sqlalchemy.org/en/20/", None),
 }
 
 # Autodoc configuraton.
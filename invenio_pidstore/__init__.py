@@ -359,6 +359,17 @@ Above is equivalent to:
    current_pidstore.register_minter('recid', recid_minter)
    current_pidstore.register_fetcher('recid', recid_fetcher)
 
+except that the entry points are only loaded when the minter or fetcher is
+first looked up, which keeps the application startup fast.
+
+Batch minters and batch fetchers, which take a list of
+``(object_uuid, data)`` tuples, are loaded in the same way from the entry
+point groups ``invenio_pidstore.batch_minters`` and
+``invenio_pidstore.batch_fetchers``, and are returned by
+``current_pidstore.get_batch_minter(name)`` and
+``current_pidstore.get_batch_fetcher(name)``. These fall back to adapting
+the minter or fetcher of the same name when no batch version is registered.
+
 """
 
 from .ext import InvenioPIDStore
@@ -0,0 +1,601 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Cache of resolved persistent identifiers.
+
+The resolver cache stores, for a ``(pid_type, pid_value)`` key, the plain
+values needed to resolve the persistent identifier (status, assigned object
+and redirection target) rather than ORM instances.
+
+The cache backend is pluggable (see
+:data:`invenio_pidstore.config.PIDSTORE_RESOLVER_CACHE_BACKEND`): no caching
+by default, an in-process LRU cache, or a Redis cache shared by all processes.
+
+Lookups of nonexistent persistent identifiers can also be cached for a short
+time in a cache created by the same backend, if it is shared by all processes,
+see :data:`invenio_pidstore.config.PIDSTORE_RESOLVER_NEGATIVE_CACHE`.
+
+Entries are invalidated when the transaction that modified (or created) the
+persistent identifier is committed. The state methods of
+:class:`invenio_pidstore.models.PersistentIdentifier` record the modified
+identifiers on the session, and :func:`invalidate_after_commit` drops them
+from the cache of the current application once the commit succeeded.
+"""
+
+from __future__ import absolute_import, print_function
+
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+import six
+from flask import current_app, g, has_app_context
+from invenio_db import db
+from sqlalchemy.orm import make_transient_to_detached
+
+from .errors import PIDDoesNotExistError
+from .models import CHANGED_PIDS_KEY, PersistentIdentifier, PIDStatus, logger
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover
+
+    class RedisError(Exception):
+        """Placeholder of the Redis errors when redis is not installed."""
+
+
+CachedPID = namedtuple(
+    "CachedPID",
+    ["id", "pid_provider", "status", "object_type", "object_uuid", "redirect"],
+)
+"""Cached state of a persistent identifier.
+
+``status`` is the status value (e.g. ``"R"``) and ``redirect`` is either
+``None`` or the ``(pid_type, pid_value)`` of the redirection target.
+"""
+
+
+EXISTS_MEMO_ATTR = "_invenio_pidstore_exists"
+"""Attribute of :data:`flask.g` memoizing which PIDs exist."""
+
+
+def dump_pid(pid, redirect=None):
+    """Build a cache entry from a persistent identifier.
+
+    :param pid: A :class:`invenio_pidstore.models.PersistentIdentifier`
+        instance.
+    :param redirect: The redirection target of ``pid`` if it is redirected.
+    :returns: A :data:`invenio_pidstore.cache.CachedPID` instance.
+    """
+    return CachedPID(
+        id=pid.id,
+        pid_provider=pid.pid_provider,
+        status=PIDStatus(pid.status).value,
+        object_type=pid.object_type,
+        object_uuid=pid.object_uuid,
+        redirect=(redirect.pid_type, redirect.pid_value) if redirect else None,
+    )
+
+
+def load_pid(pid_type, pid_value, entry):
+    """Build a persistent identifier from a cache entry.
+
+    The instance is attached to the current session without querying the
+    database, so that the attributes which are not cached (e.g. ``created``)
+    are loaded on first access.
+
+    :param pid_type: Persistent identifier type.
+    :param pid_value: Persistent identifier value.
+    :param entry: A :data:`invenio_pidstore.cache.CachedPID` instance.
+    :returns: A tuple containing (pid, redirection target). The redirection
+        target only holds its type and value.
+    """
+    pid = PersistentIdentifier(
+        id=entry.id,
+        pid_type=pid_type,
+        pid_value=pid_value,
+        pid_provider=entry.pid_provider,
+        status=PIDStatus(entry.status),
+        object_type=entry.object_type,
+        object_uuid=entry.object_uuid,
+    )
+    make_transient_to_detached(pid)
+    pid = db.session.merge(pid, load=False)
+    redirect = None
+    if entry.redirect:
+        redirect = PersistentIdentifier(
+            pid_type=entry.redirect[0], pid_value=entry.redirect[1]
+        )
+    return pid, redirect
+
+
+class PIDCacheBackend(object):
+    """Interface of the backends of the resolver cache.
+
+    Subclasses implement ``_get()``, :meth:`set`, :meth:`invalidate` and
+    :meth:`clear`. Keys are ``(pid_type, pid_value)`` tuples and values are
+    :data:`invenio_pidstore.cache.CachedPID` instances.
+    """
+
+    enabled = True
+    """Whether lookups should go through the cache at all."""
+
+    def __init__(self):
+        """Initialize the hit and miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Get a cached value and count the hit or miss.
+
+        :param key: A ``(pid_type, pid_value)`` tuple.
+        :returns: The cached value or ``None``.
+        """
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _get(self, key):
+        """Get a cached value or ``None``."""
+        raise NotImplementedError()
+
+    def set(self, key, value):
+        """Store a value.
+
+        :param key: A ``(pid_type, pid_value)`` tuple.
+        :param value: The value to cache.
+        """
+        raise NotImplementedError()
+
+    def invalidate(self, keys):
+        """Remove entries.
+
+        :param keys: Iterable of ``(pid_type, pid_value)`` tuples.
+        """
+        raise NotImplementedError()
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self):
+        """Return the hit and miss counters."""
+        return dict(hits=self.hits, misses=self.misses)
+
+    def negative_cache(self, max_entries=None, ttl=10):
+        """Create the matching cache of nonexistent PIDs.
+
+        Only backends shared by all processes support it: a commit only
+        invalidates the entries of the committing process, so that the other
+        processes would report a newly minted PID as missing. By default
+        negative caching is thus disabled.
+
+        :param max_entries: Maximum number of entries.
+        :param ttl: Number of seconds an entry is valid. (Default: ``10``)
+        :returns: A :class:`invenio_pidstore.cache.PIDCacheBackend` instance.
+        """
+        logger.warning(
+            "PIDSTORE_RESOLVER_NEGATIVE_CACHE requires a shared cache backend."
+        )
+        return NullCache()
+
+
+class NullCache(PIDCacheBackend):
+    """Cache backend which does not cache anything.
+
+    This is the default backend.
+    """
+
+    enabled = False
+
+    def _get(self, key):
+        """Return ``None``."""
+        return None
+
+    def set(self, key, value):
+        """Do nothing."""
+
+    def invalidate(self, keys):
+        """Do nothing."""
+
+
+class ResolverCache(PIDCacheBackend):
+    """In-process LRU cache with expiring entries.
+
+    The cache is thread-safe. Each process has its own entries, and only the
+    entries of the process committing a change are invalidated.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60, timer=time.monotonic):
+        """Initialize the cache.
+
+        :param max_entries: Maximum number of entries before the least
+            recently used ones are evicted. (Default: ``1024``)
+        :param ttl: Number of seconds an entry is valid. (Default: ``60``)
+        :param timer: Clock used to expire entries.
+        """
+        super(ResolverCache, self).__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.timer = timer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        """Get a cached value unless it expired."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                expires, value = item
+                if expires > self.timer():
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+            return None
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (self.timer() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        """Remove entries."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            super(ResolverCache, self).clear()
+
+    @property
+    def stats(self):
+        """Return the hit and miss counters and the number of entries."""
+        return dict(hits=self.hits, misses=self.misses, size=len(self._entries))
+
+    def __len__(self):
+        """Return the number of entries."""
+        return len(self._entries)
+
+
+class RedisCache(PIDCacheBackend):
+    """Redis cache shared by all processes.
+
+    Since the entries are shared, invalidating them on commit makes the
+    change visible to all processes at once.
+
+    A reader which loaded a PID before the commit could write the old state
+    back right after the entry was invalidated, and this stale entry would be
+    served to all processes for ``ttl`` seconds. To prevent this, invalidated
+    entries are replaced by an empty tombstone for ``invalidation_ttl``
+    seconds and entries are only written if the key does not exist.
+
+    Redis errors are logged and never propagated: lookups are then treated as
+    misses and writes are skipped, so that an outage of the cache falls back
+    to the database.
+    """
+
+    def __init__(self, client, ttl=60, prefix="pidstore:pid:", invalidation_ttl=5):
+        """Initialize the cache.
+
+        :param client: A ``redis.Redis`` client.
+        :param ttl: Number of seconds an entry is valid. (Default: ``60``)
+        :param prefix: Prefix of the Redis keys.
+            (Default: ``"pidstore:pid:"``)
+        :param invalidation_ttl: Number of seconds entries are not written
+            again after they were invalidated. (Default: ``5``)
+        """
+        super(RedisCache, self).__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.invalidation_ttl = invalidation_ttl
+
+    def _key(self, key):
+        """Build the Redis key of a ``(pid_type, pid_value)`` tuple."""
+        return "{0}{1}:{2}".format(self.prefix, *key)
+
+    @contextmanager
+    def _errors(self, action):
+        """Log and swallow the Redis errors raised by ``action``."""
+        try:
+            yield
+        except RedisError:
+            logger.exception("Failed to %s the Redis PID cache", action)
+
+    def _get(self, key):
+        """Get and decode a cached value."""
+        with self._errors("read"):
+            data = self.client.get(self._key(key))
+            if not data:
+                return None
+            values = json.loads(data)
+            if values[4]:
+                values[4] = uuid.UUID(values[4])
+            if values[5]:
+                values[5] = tuple(values[5])
+            return CachedPID(*values)
+        return None
+
+    def set(self, key, value):
+        """Encode and store a value unless the entry was invalidated."""
+        values = list(value)
+        if values[4]:
+            values[4] = str(values[4])
+        with self._errors("write"):
+            self.client.set(self._key(key), json.dumps(values), ex=self.ttl, nx=True)
+
+    def invalidate(self, keys):
+        """Replace entries by tombstones."""
+        names = [self._key(key) for key in keys]
+        if names:
+            with self._errors("invalidate"):
+                pipe = self.client.pipeline(transaction=False)
+                for name in names:
+                    pipe.set(name, "", ex=self.invalidation_ttl)
+                pipe.execute()
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._errors("clear"):
+            names = list(self.client.scan_iter(match=self.prefix + "*"))
+            if names:
+                self.client.delete(*names)
+        super(RedisCache, self).clear()
+
+    def negative_cache(self, max_entries=None, ttl=10):
+        """Create a cache of nonexistent PIDs sharing the Redis client.
+
+        :param max_entries: Ignored, Redis evicts the entries itself.
+        :param ttl: Number of seconds an entry is valid. (Default: ``10``)
+        :returns: A :class:`invenio_pidstore.cache.RedisNegativeCache`
+            instance.
+        """
+        return RedisNegativeCache(
+            self.client, ttl=ttl, invalidation_ttl=self.invalidation_ttl
+        )
+
+
+class RedisNegativeCache(RedisCache):
+    """Redis cache of nonexistent PIDs shared by all processes.
+
+    Since the entries are shared, creating a PID makes it visible to all
+    processes as soon as the transaction is committed.
+    """
+
+    def __init__(self, client, ttl=10, prefix="pidstore:missing:", **kwargs):
+        """Initialize the cache.
+
+        :param client: A ``redis.Redis`` client.
+        :param ttl: Number of seconds an entry is valid. (Default: ``10``)
+        :param prefix: Prefix of the Redis keys.
+            (Default: ``"pidstore:missing:"``)
+        :param kwargs: Extra parameters of
+            :class:`invenio_pidstore.cache.RedisCache`.
+        """
+        super(RedisNegativeCache, self).__init__(
+            client, ttl=ttl, prefix=prefix, **kwargs
+        )
+
+    def _get(self, key):
+        """Return ``True`` if the PID is known not to exist."""
+        with self._errors("read"):
+            return True if self.client.get(self._key(key)) else None
+        return None
+
+    def set(self, key, value):
+        """Remember that the PID does not exist."""
+        with self._errors("write"):
+            self.client.set(self._key(key), "1", ex=self.ttl, nx=True)
+
+
+def resolver_cache_factory(app):
+    """Create the resolver cache from the configuration.
+
+    :param app: The Flask application.
+    :returns: A :class:`invenio_pidstore.cache.ResolverCache` if
+        ``PIDSTORE_RESOLVER_CACHE`` is set, otherwise a
+        :class:`invenio_pidstore.cache.NullCache`.
+    """
+    options = app.config.get("PIDSTORE_RESOLVER_CACHE")
+    if options:
+        return ResolverCache(**options)
+    return NullCache()
+
+
+def redis_cache_factory(app):
+    """Create a Redis resolver cache from the configuration.
+
+    Uses ``PIDSTORE_RESOLVER_CACHE_REDIS_URL`` (or ``CACHE_REDIS_URL``) and
+    the ``ttl`` of ``PIDSTORE_RESOLVER_CACHE``.
+
+    :param app: The Flask application.
+    :returns: A :class:`invenio_pidstore.cache.RedisCache` instance.
+    """
+    import redis
+
+    url = app.config.get("PIDSTORE_RESOLVER_CACHE_REDIS_URL") or app.config.get(
+        "CACHE_REDIS_URL", "redis://localhost:6379/0"
+    )
+    options = app.config.get("PIDSTORE_RESOLVER_CACHE") or {}
+    return RedisCache(redis.Redis.from_url(url), ttl=options.get("ttl", 60))
+
+
+def negative_cache_factory(app, backend):
+    """Create the cache of nonexistent PIDs from the configuration.
+
+    :param app: The Flask application.
+    :param backend: The resolver cache backend, which creates the negative
+        cache (see :meth:`invenio_pidstore.cache.PIDCacheBackend.negative_cache`).
+    :returns: The negative cache of ``backend`` if
+        ``PIDSTORE_RESOLVER_NEGATIVE_CACHE`` is set, otherwise a
+        :class:`invenio_pidstore.cache.NullCache`.
+    """
+    options = app.config.get("PIDSTORE_RESOLVER_NEGATIVE_CACHE")
+    if options:
+        return backend.negative_cache(**options)
+    return NullCache()
+
+
+def cache_for(key, negative=False):
+    """Return the cache to use for a persistent identifier.
+
+    :param key: A ``(pid_type, pid_value)`` tuple.
+    :param negative: Return the cache of nonexistent PIDs instead of the
+        resolver cache. (Default: ``False``)
+    :returns: The enabled cache backend of the current application, or
+        ``None`` if caching is disabled or if the PID was changed in the
+        current transaction.
+    """
+    if not has_app_context():
+        return None
+    state = current_app.extensions.get("invenio-pidstore")
+    if state is None:
+        return None
+    cache = state.negative_cache if negative else state.resolver_cache
+    if not cache.enabled or key in db.session.info.get(CHANGED_PIDS_KEY, ()):
+        return None
+    return cache
+
+
+def get_pid(pid_type, pid_value):
+    """Get a persistent identifier through the caches.
+
+    Nonexistent PIDs are remembered in the negative cache, so that repeated
+    lookups of the same value do not hit the database.
+
+    :param pid_type: Persistent identifier type.
+    :param pid_value: Persistent identifier value.
+    :raises invenio_pidstore.errors.PIDDoesNotExistError: If no PID is found.
+    :returns: A tuple containing (pid, redirection target). The redirection
+        target is only set for redirected PIDs when the resolver cache is
+        enabled. On cache hits, the attributes of the PID which are not
+        cached are loaded on first access.
+    """
+    key = (pid_type, six.text_type(pid_value))
+    negative = cache_for(key, negative=True)
+    if negative is not None and negative.get(key):
+        raise PIDDoesNotExistError(pid_type, pid_value)
+
+    cache = cache_for(key)
+    if cache is not None:
+        entry = cache.get(key)
+        if entry is not None:
+            return load_pid(pid_type, key[1], entry)
+
+    try:
+        pid = PersistentIdentifier.get(pid_type, pid_value)
+    except PIDDoesNotExistError:
+        if negative is not None:
+            negative.set(key, True)
+        raise
+
+    if cache is None:
+        return pid, None
+    redirect = pid.get_redirect() if pid.is_redirected() else None
+    cache.set(key, dump_pid(pid, redirect))
+    return pid, redirect
+
+
+def pids_exist(pid_type, pid_values):
+    """Check which persistent identifiers exist.
+
+    Answers are memoized on :data:`flask.g` for the rest of the request (or
+    application context), and the caches are used when enabled. The
+    remaining values are checked with a single query.
+
+    :param pid_type: Persistent identifier type.
+    :param pid_values: Iterable of persistent identifier values.
+    :returns: A dictionary mapping each value, in the given order, to
+        ``True`` if the PID exists.
+    """
+    result = dict.fromkeys(six.text_type(v) for v in pid_values)
+    memo = g.setdefault(EXISTS_MEMO_ATTR, {}) if has_app_context() else {}
+    changed = db.session.info.get(CHANGED_PIDS_KEY, ())
+
+    missing = []
+    for value in result:
+        key = (pid_type, value)
+        if key in changed:
+            missing.append(value)
+            continue
+        if key not in memo:
+            negative = cache_for(key, negative=True)
+            cache = cache_for(key)
+            if negative is not None and negative.get(key):
+                memo[key] = False
+            elif cache is not None and cache.get(key) is not None:
+                memo[key] = True
+            else:
+                missing.append(value)
+                continue
+        result[value] = memo[key]
+
+    if len(missing) == 1:
+        existing = set()
+        if PersistentIdentifier.exists(pid_type, missing[0]):
+            existing.add((pid_type, missing[0]))
+    else:
+        existing = PersistentIdentifier._existing_keys(
+            (pid_type, value) for value in missing
+        )
+    for value in missing:
+        key = (pid_type, value)
+        result[value] = key in existing
+        if key in changed:
+            continue
+        memo[key] = result[value]
+        negative = cache_for(key, negative=True)
+        if negative is not None and not result[value]:
+            negative.set(key, True)
+    return result
+
+
+def invalidate_after_commit(session):
+    """Invalidate the cache entries of the PIDs changed in the transaction.
+
+    Registered as a SQLAlchemy ``after_commit`` session event listener, which
+    also fires when a savepoint is released.
+    """
+    if session.in_nested_transaction():
+        return
+    keys = session.info.pop(CHANGED_PIDS_KEY, None)
+    if not keys or not has_app_context():
+        return
+    memo = g.get(EXISTS_MEMO_ATTR)
+    if memo:
+        for key in keys:
+            memo.pop(key, None)
+    state = current_app.extensions.get("invenio-pidstore")
+    if state is not None:
+        for cache in (state.resolver_cache, state.negative_cache):
+            # The transaction is committed already: a failing backend must
+            # not leave the session unusable.
+            try:
+                if cache.enabled:
+                    cache.invalidate(keys)
+            except Exception:
+                logger.exception("Failed to invalidate the PID cache")
+
+
+def discard_after_rollback(session, previous_transaction):
+    """Forget the PIDs changed in a transaction which was rolled back.
+
+    Registered as a SQLAlchemy ``after_soft_rollback`` session event listener.
+    Rolling back a savepoint keeps the changes of the outer transaction.
+    """
+    if not session.in_transaction():
+        session.info.pop(CHANGED_PIDS_KEY, None)
@@ -4,6 +4,12 @@
 
 """Click command-line interface for PIDStore management."""
 
+import csv
+import itertools
+import json
+import os
+from datetime import datetime
+
 import click
 from flask.cli import with_appcontext
 from invenio_db import db
@@ -26,6 +32,11 @@ def process_status(ctx, param, value):
     return getattr(PIDStatus, value)
 
 
+def process_statuses(ctx, param, value):
+    """Return status values, or ``None`` if there are none."""
+    return [process_status(ctx, param, v) for v in value] or None
+
+
 #
 # PIDStore management commands
 #
@@ -103,7 +114,7 @@ def get_object(pid_type, pid_value):
     """Get an object behind persistent identifier."""
     from .models import PersistentIdentifier
 
-    obj = PersistentIdentifier.get(pid_type, pid_value)
+    obj = PersistentIdentifier.read(pid_type, pid_value)
     if obj.has_object():
         click.echo("{0.object_type} {0.object_uuid} {0.status}".format(obj))
 
@@ -125,3 +136,444 @@ def dereference_object(object_type, object_uuid, status):
 
     for found_pid in pids.all():
         click.echo("{0.pid_type} {0.pid_value} {0.pid_provider}".format(found_pid))
+
+
+@pid.command("compact-recids")
+@click.option("--batch-size", default=1000, show_default=True, type=int)
+@with_appcontext
+def compact_recids(batch_size):
+    """Remove record identifier rows below the high-water mark."""
+    from .models import RecordIdentifier
+
+    total = 0
+    for deleted in RecordIdentifier.compact(batch_size=batch_size):
+        db.session.commit()
+        total += deleted
+    click.echo("Removed {0} record identifiers.".format(total))
+
+
+@pid.command("fill-recid-pool")
+@click.option("--size", type=int, help="Size of the pool.")
+@with_appcontext
+def fill_recid_pool(size):
+    """Refill the pool of pre-generated record identifiers."""
+    from .providers.recordid_v2 import RecordIdProviderV2
+
+    added = RecordIdProviderV2.fill_pool(size=size)
+    db.session.commit()
+    click.echo("Added {0} record identifiers to the pool.".format(added))
+
+
+def _bulk_options(f):
+    """Add the options selecting persistent identifiers of bulk commands."""
+    f = click.option(
+        "--created-before",
+        type=click.DateTime(),
+        default=None,
+        help="Only change PIDs created before this UTC time.",
+    )(f)
+    f = click.option(
+        "-s",
+        "--status",
+        "statuses",
+        multiple=True,
+        callback=process_statuses,
+        help="Only change PIDs with this status (may be repeated).",
+    )(f)
+    f = click.option(
+        "-i",
+        "--input",
+        "input_file",
+        type=click.File("r"),
+        default=None,
+        help="File with one PID value per line.",
+    )(f)
+    f = click.option(
+        "--all",
+        "all_pids",
+        is_flag=True,
+        default=False,
+        help="Change all the PIDs of the type instead of those of a file.",
+    )(f)
+    return click.argument("pid_type")(f)
+
+
+def _bulk_values(input_file, all_pids):
+    """Return the PID values read from a file, one per line.
+
+    Changing all the PIDs of a type must be requested explicitly with
+    ``--all``, in which case ``None`` is returned.
+    """
+    if (input_file is None) == (not all_pids):
+        raise click.UsageError("Either --input or --all is required.")
+    if input_file is None:
+        return None
+    return [line.strip() for line in input_file if line.strip()]
+
+
+def _bulk_report(action, count, rejected):
+    """Commit a bulk change and print its outcome."""
+    db.session.commit()
+    for r in rejected:
+        click.echo(
+            "Rejected {0.pid_type} {0.pid_value} ({0.status})".format(r), err=True
+        )
+    click.echo(
+        "{0} {1} persistent identifiers ({2} rejected).".format(
+            action, count, len(rejected)
+        )
+    )
+
+
+@pid.command("bulk-reserve")
+@_bulk_options
+@with_appcontext
+def bulk_reserve(pid_type, all_pids, input_file, statuses, created_before):
+    """Reserve many persistent identifiers."""
+    from .models import PersistentIdentifier
+
+    _bulk_report(
+        "Reserved",
+        *PersistentIdentifier.bulk_reserve(
+            pid_type, _bulk_values(input_file, all_pids), statuses, created_before
+        ),
+    )
+
+
+@pid.command("bulk-register")
+@_bulk_options
+@with_appcontext
+def bulk_register(pid_type, all_pids, input_file, statuses, created_before):
+    """Register many persistent identifiers."""
+    from .models import PersistentIdentifier
+
+    _bulk_report(
+        "Registered",
+        *PersistentIdentifier.bulk_register(
+            pid_type, _bulk_values(input_file, all_pids), statuses, created_before
+        ),
+    )
+
+
+@pid.command("bulk-delete")
+@_bulk_options
+@with_appcontext
+def bulk_delete(pid_type, all_pids, input_file, statuses, created_before):
+    """Delete many persistent identifiers."""
+    from .models import PersistentIdentifier
+
+    _bulk_report(
+        "Deleted",
+        *PersistentIdentifier.bulk_delete(
+            pid_type, _bulk_values(input_file, all_pids), statuses, created_before
+        ),
+    )
+
+
+@pid.command("bulk-sync-status")
+@_bulk_options
+@click.option("--to", "status", required=True, callback=process_status)
+@with_appcontext
+def bulk_sync_status(pid_type, all_pids, input_file, statuses, created_before, status):
+    """Synchronize the status of many persistent identifiers."""
+    from .models import PersistentIdentifier
+
+    _bulk_report(
+        "Synced",
+        *PersistentIdentifier.bulk_sync_status(
+            pid_type,
+            status,
+            _bulk_values(input_file, all_pids),
+            statuses,
+            created_before,
+        ),
+    )
+
+
+@pid.command("reassign-objects")
+@click.argument("mapping", metavar="FILE", type=click.File("r"))
+@click.option("-t", "--type", "object_type", default=None)
+@with_appcontext
+def reassign_objects(mapping, object_type):
+    """Move persistent identifiers to other objects.
+
+    FILE is a CSV file with ``old_uuid`` and ``new_uuid`` columns.
+    """
+    from .models import PersistentIdentifier
+
+    pairs = ((r["old_uuid"], r["new_uuid"]) for r in csv.DictReader(mapping))
+    _bulk_report(
+        "Reassigned",
+        *PersistentIdentifier.reassign_objects(pairs, object_type=object_type),
+    )
+
+
+EXPORT_FIELDS = (
+    "pid_type",
+    "pid_value",
+    "pid_provider",
+    "status",
+    "object_type",
+    "object_uuid",
+    "created",
+    "updated",
+    "redirect_pid_type",
+    "redirect_pid_value",
+)
+"""Fields of the exported persistent identifiers.
+
+The ``object_uuid`` of a redirected persistent identifier is the id of its
+redirection, whose target is given by the ``redirect_*`` fields.
+"""
+
+
+def _export_rows(pids, chunk_size):
+    """Return the exported values of persistent identifiers.
+
+    The redirection targets are loaded with one query per chunk of PIDs.
+    """
+    from .models import Redirect
+
+    while True:
+        chunk = list(itertools.islice(pids, chunk_size))
+        if not chunk:
+            return
+        targets = Redirect.get_targets(
+            pid.object_uuid for pid in chunk if pid.is_redirected()
+        )
+        for pid in chunk:
+            yield _export_row(
+                pid, targets.get(pid.object_uuid) if pid.is_redirected() else None
+            )
+
+
+def _export_row(pid, target=None):
+    """Return the exported values of a persistent identifier.
+
+    :param pid: A :class:`invenio_pidstore.models.PersistentIdentifier`
+        instance.
+    :param target: The ``(pid_type, pid_value)`` of the redirection target
+        of a redirected persistent identifier.
+    """
+    target_type, target_value = target or (None, None)
+    return (
+        pid.pid_type,
+        pid.pid_value,
+        pid.pid_provider,
+        str(pid.status),
+        pid.object_type,
+        str(pid.object_uuid) if pid.object_uuid else None,
+        pid.created.isoformat(),
+        pid.updated.isoformat(),
+        target_type,
+        target_value,
+    )
+
+
+@pid.command("export")
+@click.option("-o", "--output", type=click.File("w"), default="-", show_default=True)
+@click.option(
+    "-f",
+    "--format",
+    "fmt",
+    type=click.Choice(["jsonl", "csv", "columns"]),
+    default="jsonl",
+    show_default=True,
+    help="One JSON object per PID, CSV with a header row, or one JSON object "
+    "of columns per chunk of PIDs.",
+)
+@click.option("-p", "--pid-type", default=None)
+@click.option("-s", "--status", default=None, callback=process_status)
+@click.option("-t", "--type", "object_type", default=None)
+@click.option(
+    "--since",
+    type=click.DateTime(),
+    default=None,
+    help="Only export PIDs updated since this UTC time.",
+)
+@click.option("--chunk-size", default=1000, show_default=True, type=int)
+@with_appcontext
+def export(output, fmt, pid_type, status, object_type, since, chunk_size):
+    """Export persistent identifiers."""
+    from .models import PersistentIdentifier
+
+    rows = _export_rows(
+        PersistentIdentifier.iter_pids(
+            pid_type=pid_type,
+            status=status,
+            object_type=object_type,
+            chunk_size=chunk_size,
+            updated_since=since,
+        ),
+        chunk_size,
+    )
+    if fmt == "csv":
+        writer = csv.writer(output)
+        writer.writerow(EXPORT_FIELDS)
+        writer.writerows(rows)
+    elif fmt == "jsonl":
+        for row in rows:
+            output.write(json.dumps(dict(zip(EXPORT_FIELDS, row))))
+            output.write("\n")
+    else:
+        while True:
+            chunk = [row for _, row in zip(range(chunk_size), rows)]
+            if not chunk:
+                break
+            output.write(json.dumps(dict(zip(EXPORT_FIELDS, map(list, zip(*chunk))))))
+            output.write("\n")
+
+
+def _import_row(record):
+    """Return the stored row and redirection of an exported persistent identifier.
+
+    :returns: A tuple ``(row, redirect)`` where ``redirect`` is the
+        ``(id, pid_type, pid_value)`` tuple of the redirection of a redirected
+        persistent identifier, or ``None``.
+    """
+    record = {k: v if v != "" else None for k, v in record.items()}
+    created, updated = (
+        datetime.fromisoformat(record[f]) if record.get(f) else None
+        for f in ("created", "updated")
+    )
+    row = (
+        record["pid_type"],
+        record["pid_value"],
+        record.get("pid_provider"),
+        record.get("status"),
+        record.get("object_type"),
+        record.get("object_uuid"),
+        created,
+        updated,
+    )
+    redirect = None
+    if record.get("redirect_pid_type") and record.get("object_uuid"):
+        redirect = (
+            record["object_uuid"],
+            record["redirect_pid_type"],
+            record["redirect_pid_value"],
+        )
+    return row, redirect
+
+
+def _read_checkpoint(path):
+    """Return the progress of an import recorded in a checkpoint.
+
+    :returns: A dictionary with the number of ``records`` already imported,
+        the highest ``max_recid`` seen and the pending ``redirects``, whose
+        target was not imported yet.
+    """
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return dict(records=0, max_recid=0, redirects=[])
+
+
+def _write_checkpoint(path, progress):
+    """Atomically record the progress of an import."""
+    tmp_path = "{0}.tmp".format(path)
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, path)
+
+
+@pid.command("import")
+@click.argument("input_file", metavar="FILE", type=click.File("r"))
+@click.option(
+    "-f",
+    "--format",
+    "fmt",
+    type=click.Choice(["jsonl", "csv"]),
+    default=None,
+    help="Format of the file, as written by the export command. "
+    "(Default: csv for .csv files, jsonl otherwise)",
+)
+@click.option("--chunk-size", default=5000, show_default=True, type=int)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="File recording the progress after each chunk. An interrupted "
+    "import resumes from it, and it is removed once the import is complete.",
+)
+@click.option(
+    "--conflicts",
+    "conflicts_file",
+    type=click.File("a"),
+    default=None,
+    help="Append the persistent identifiers that already existed to this file, "
+    "one JSON object per line.",
+)
+@with_appcontext
+def import_pids(input_file, fmt, chunk_size, checkpoint, conflicts_file):
+    """Import persistent identifiers exported with the export command.
+
+    The rows are stored as they were exported, each chunk is committed
+    separately and existing persistent identifiers are skipped. Redirections
+    are rebuilt once their target is imported, and the record identifier
+    sequence is moved past the highest imported integer ``recid`` at the end.
+    """
+    from .models import PersistentIdentifier, RecordIdentifier, Redirect
+
+    if fmt is None:
+        fmt = "csv" if input_file.name.endswith(".csv") else "jsonl"
+    if fmt == "csv":
+        records = csv.DictReader(input_file)
+    else:
+        records = (json.loads(line) for line in input_file if line.strip())
+
+    progress = _read_checkpoint(checkpoint)
+    records = itertools.islice(records, progress["records"], None)
+    if progress["records"]:
+        click.echo("Resuming after {0} records.".format(progress["records"]), err=True)
+
+    total_created = total_conflicts = 0
+    while True:
+        chunk = [_import_row(r) for r in itertools.islice(records, chunk_size)]
+        if not chunk:
+            break
+        created, conflicts = PersistentIdentifier.bulk_import([row for row, _ in chunk])
+        created_keys = set(created)
+        progress["redirects"] = Redirect.bulk_import(
+            progress["redirects"]
+            + [r for row, r in chunk if r and (row[0], row[1]) in created_keys]
+        )
+        db.session.commit()
+
+        progress["records"] += len(chunk)
+        for (pid_type, pid_value, *_), _ in chunk:
+            if pid_type == "recid" and pid_value.isdigit():
+                progress["max_recid"] = max(progress["max_recid"], int(pid_value))
+        if checkpoint:
+            _write_checkpoint(checkpoint, progress)
+
+        if conflicts_file:
+            for e in conflicts:
+                conflicts_file.write(
+                    json.dumps(dict(pid_type=e.pid_type, pid_value=e.pid_value))
+                )
+                conflicts_file.write("\n")
+        total_created += len(created)
+        total_conflicts += len(conflicts)
+        click.echo(
+            "{0} records processed, {1} imported, {2} conflicts.".format(
+                progress["records"], total_created, total_conflicts
+            ),
+            err=True,
+        )
+
+    if progress["max_recid"] > RecordIdentifier.max():
+        RecordIdentifier.insert(progress["max_recid"])
+        db.session.commit()
+    for _, pid_type, pid_value in progress["redirects"]:
+        click.echo(
+            "Redirection target {0}:{1} does not exist.".format(pid_type, pid_value),
+            err=True,
+        )
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    click.echo(
+        "Imported {0} persistent identifiers ({1} conflicts).".format(
+            total_created, total_conflicts
+        )
+    )
@@ -15,3 +15,71 @@ PIDSTORE_DATACITE_DOI_PREFIX = ""
 """Provide a DOI prefix here."""
 
 PIDSTORE_RECORDID_OPTIONS = {"length": 10, "split_every": 5, "checksum": True}
+
+PIDSTORE_RECID_POOL_SIZE = None
+"""Number of pre-generated record identifiers v2 kept in a pool.
+
+Disabled by default. When set,
+:meth:`invenio_pidstore.providers.recordid_v2.RecordIdProviderV2.create`
+claims a reserved record identifier from the pool with a single ``UPDATE``
+and only generates a new one if the pool is empty. The pool is refilled up
+to this size with ``invenio pid fill-recid-pool``, e.g. from a periodic job.
+
+Pooled record identifiers are reserved ``recid`` rows with the ``"pool"``
+provider. The bulk commands (e.g. ``invenio pid bulk-register``) leave them
+out until they are claimed.
+"""
+
+PIDSTORE_RESOLVER_CACHE = None
+"""In-process cache of resolved persistent identifiers.
+
+Disabled by default. Set to a dictionary such as
+``{"max_entries": 10000, "ttl": 60}`` to cache up to ``max_entries``
+resolved persistent identifiers for ``ttl`` seconds in each process.
+"""
+
+PIDSTORE_RESOLVER_CACHE_BACKEND = None
+"""Factory of the resolver cache backend.
+
+A callable, or its import path, taking the Flask application and returning a
+:class:`invenio_pidstore.cache.PIDCacheBackend`. By default
+:func:`invenio_pidstore.cache.resolver_cache_factory` is used, which honours
+``PIDSTORE_RESOLVER_CACHE``. To share the cache between all processes use
+``"invenio_pidstore.cache:redis_cache_factory"``, which requires the ``redis``
+extra (``pip install invenio-pidstore[redis]``).
+"""
+
+PIDSTORE_RESOLVER_CACHE_REDIS_URL = None
+"""Redis URL of the shared resolver cache (Default: ``CACHE_REDIS_URL``)."""
+
+PIDSTORE_RESOLVER_NEGATIVE_CACHE = None
+"""Cache of nonexistent persistent identifiers.
+
+Disabled by default. Set to a dictionary such as ``{"ttl": 10}`` to remember
+failed lookups for ``ttl`` seconds. The cache is created by the backend of
+``PIDSTORE_RESOLVER_CACHE_BACKEND`` and requires a backend shared by all
+processes, such as the Redis one, which invalidates the entries of created
+PIDs for all processes on commit. With the in-process backends it remains
+disabled, since other processes would keep reporting newly minted PIDs as
+missing.
+"""
+
+PIDSTORE_RESOLVER_MAX_REDIRECTS = 10
+"""Maximum number of redirections followed by resolvers following redirects.
+
+See the ``follow_redirects`` parameter of
+:class:`invenio_pidstore.resolver.Resolver`.
+"""
+
+PIDSTORE_RECID_BLOCK_SIZE = None
+"""Number of legacy record identifiers reserved per database round trip.
+
+Disabled by default, i.e. :class:`invenio_pidstore.models.RecordIdentifier`
+inserts one row per record identifier. When set, blocks of identifiers are
+reserved and handed out from memory, first to the reserving session and, once
+its transaction commits, to the whole process (see
+:class:`invenio_pidstore.providers.recordid.RecordIdBlockAllocator`). Only
+enable it if gaps in the record identifiers are acceptable: identifiers are
+no longer minted in order across processes, and the unused identifiers of a
+block are lost when the process exits.
+"""
@@ -60,9 +60,19 @@ class PIDRedirectedError(ResolverError):
     def __init__(self, pid, dest_pid, *args, **kwargs):
         """Initialize exception."""
         self.destination_pid = dest_pid
+        self.hops = kwargs.pop("hops", None)
         super(PIDRedirectedError, self).__init__(pid, *args, **kwargs)
 
 
+class PIDRedirectLoopError(ResolverError):
+    """Persistent identifier redirects in a loop or through too many PIDs."""
+
+    def __init__(self, pid, hops, *args, **kwargs):
+        """Initialize exception."""
+        self.hops = hops
+        super(PIDRedirectLoopError, self).__init__(pid, *args, **kwargs)
+
+
 class PIDObjectAlreadyAssigned(PersistentIdentifierError):
     """Persistent identifier is already assigned to another object."""
 
@@ -6,44 +6,233 @@
 
 from __future__ import absolute_import, print_function
 
-import importlib.metadata
+import importlib.util
+from collections.abc import MutableMapping
 
-from invenio_base.utils import entry_points
+import click
+import six
+from invenio_base.utils import entry_points, obj_or_import_string
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.utils import cached_property, import_string
 
 from . import config
-from .cli import pid as cmd
-from .errors import PIDDoesNotExistError
-from .models import PersistentIdentifier, logger
+from .cache import (
+    discard_after_rollback,
+    invalidate_after_commit,
+    negative_cache_factory,
+    pids_exist,
+    resolver_cache_factory,
+)
+from .models import batch, logger
 
 
 def pid_exists(value, pidtype=None):
     """Check if a persistent identifier exists.
 
+    The answer is memoized for the current request.
+
     :param value: The PID value.
     :param pidtype: The pid value (Default: None).
     :returns: `True` if the PID exists.
     """
-    try:
-        PersistentIdentifier.get(pidtype, value)
-        return True
-    except PIDDoesNotExistError:
-        return False
+    return pids_exist(pidtype, [value])[six.text_type(value)]
+
+
+def pid_exists_many(values, pidtype=None):
+    """Check if persistent identifiers exist.
+
+    The values which were not checked earlier in the current request are
+    checked with a single query.
+
+    :param values: The PID values.
+    :param pidtype: The pid type (Default: None).
+    :returns: A dictionary mapping each value to `True` if the PID exists.
+    """
+    return pids_exist(pidtype, values)
+
+
+class _LazyGroup(click.Group):
+    """Click group importing its commands on first use."""
+
+    def __init__(self, import_name, **kwargs):
+        """Initialize the group.
+
+        :param import_name: Import path of the actual group.
+        """
+        super(_LazyGroup, self).__init__(**kwargs)
+        self.import_name = import_name
+
+    @cached_property
+    def group(self):
+        """The actual group."""
+        return import_string(self.import_name)
+
+    def list_commands(self, ctx):
+        """List the commands of the actual group."""
+        return self.group.list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        """Get a command of the actual group."""
+        return self.group.get_command(ctx, name)
+
+
+class _EntryPointRegistry(MutableMapping):
+    """Registry of objects loaded lazily from an entry point group.
+
+    The entry point group is only scanned on first access, and each entry
+    point is only loaded when its name is looked up. Loaded objects are
+    memoized.
+    """
+
+    def __init__(self, group=None):
+        """Initialize the registry.
+
+        :param group: The entry point group. (Default: None).
+        """
+        self.group = group
+        self._entry_points = None
+        self._objects = {}
+
+    @property
+    def _pending(self):
+        """Entry points not loaded yet, by name."""
+        if self._entry_points is None:
+            self._entry_points = {}
+            if self.group:
+                for ep in entry_points(group=self.group):
+                    if ep.name not in self._objects:
+                        self._entry_points.setdefault(ep.name, ep)
+        return self._entry_points
+
+    def __getitem__(self, name):
+        """Get an object, loading its entry point if needed."""
+        if name not in self._objects:
+            self._objects[name] = self._pending.pop(name).load()
+        return self._objects[name]
+
+    def __setitem__(self, name, obj):
+        """Register an object, replacing any entry point with that name."""
+        self._pending.pop(name, None)
+        self._objects[name] = obj
+
+    def __delitem__(self, name):
+        """Unregister an object or entry point."""
+        if self._pending.pop(name, None) is None:
+            del self._objects[name]
+
+    def __contains__(self, name):
+        """Check if an object or entry point is registered."""
+        return name in self._objects or name in self._pending
+
+    def __iter__(self):
+        """Iterate over the registered names."""
+        return iter(list(self._objects) + list(self._pending))
+
+    def __len__(self):
+        """Return the number of registered names."""
+        return len(self._objects) + len(self._pending)
 
 
 class _PIDStoreState(object):
     """Persistent identifier store state."""
 
     def __init__(
-        self, app, minters_entry_point_group=None, fetchers_entry_point_group=None
+        self,
+        app,
+        minters_entry_point_group=None,
+        fetchers_entry_point_group=None,
+        batch_minters_entry_point_group=None,
+        batch_fetchers_entry_point_group=None,
     ):
         """Initialize state."""
         self.app = app
-        self.minters = {}
-        self.fetchers = {}
-        if minters_entry_point_group:
-            self.load_minters_entry_point_group(minters_entry_point_group)
-        if fetchers_entry_point_group:
-            self.load_fetchers_entry_point_group(fetchers_entry_point_group)
+        self.minters = _EntryPointRegistry(minters_entry_point_group)
+        self.batch_minters = _EntryPointRegistry(batch_minters_entry_point_group)
+        self.fetchers = _EntryPointRegistry(fetchers_entry_point_group)
+        self.batch_fetchers = _EntryPointRegistry(batch_fetchers_entry_point_group)
+        self._resolver_cache = None
+        self._negative_cache = None
+        self._recid_allocator = None
+        self._recid_generator = None
+        self._recid_options = None
+
+    @property
+    def resolver_cache(self):
+        """Resolver cache backend.
+
+        Created on first access by ``PIDSTORE_RESOLVER_CACHE_BACKEND``.
+
+        :returns: A :class:`invenio_pidstore.cache.PIDCacheBackend` instance.
+        """
+        if self._resolver_cache is None:
+            factory = obj_or_import_string(
+                self.app.config.get("PIDSTORE_RESOLVER_CACHE_BACKEND"),
+                default=resolver_cache_factory,
+            )
+            self._resolver_cache = factory(self.app)
+        return self._resolver_cache
+
+    @property
+    def negative_cache(self):
+        """Cache of nonexistent PIDs.
+
+        Created on first access from ``PIDSTORE_RESOLVER_NEGATIVE_CACHE`` by
+        the resolver cache backend.
+
+        :returns: A :class:`invenio_pidstore.cache.PIDCacheBackend` instance.
+        """
+        if self._negative_cache is None:
+            self._negative_cache = negative_cache_factory(self.app, self.resolver_cache)
+        return self._negative_cache
+
+    @property
+    def recid_allocator(self):
+        """Block allocator of legacy record identifiers.
+
+        Created on first access from ``PIDSTORE_RECID_BLOCK_SIZE``.
+
+        :returns: A
+            :class:`invenio_pidstore.providers.recordid.RecordIdBlockAllocator`
+            instance or ``None`` if record identifiers are allocated one by
+            one.
+        """
+        block_size = self.app.config.get("PIDSTORE_RECID_BLOCK_SIZE")
+        if self._recid_allocator is None and block_size and block_size > 1:
+            from .providers.recordid import (
+                RecordIdBlockAllocator,
+                discard_blocks_after_rollback,
+                release_blocks_after_commit,
+            )
+
+            # Share blocks of record identifiers once their reservation is
+            # committed and discard those reserved in rolled back transactions.
+            if not event.contains(Session, "after_commit", release_blocks_after_commit):
+                event.listen(Session, "after_commit", release_blocks_after_commit)
+                event.listen(
+                    Session, "after_soft_rollback", discard_blocks_after_rollback
+                )
+            self._recid_allocator = RecordIdBlockAllocator(block_size)
+        return self._recid_allocator
+
+    @property
+    def recid_generator(self):
+        """Generator of random record identifiers.
+
+        Created from ``PIDSTORE_RECORDID_OPTIONS`` on first access, and again
+        only if the option is replaced.
+
+        :returns: A
+            :class:`invenio_pidstore.providers.recordid_v2.RecordIdGenerator`
+            instance.
+        """
+        options = self.app.config.get("PIDSTORE_RECORDID_OPTIONS")
+        if self._recid_generator is None or options is not self._recid_options:
+            from .providers.recordid_v2 import RecordIdGenerator
+
+            self._recid_generator = RecordIdGenerator.from_options(options or {})
+            self._recid_options = options
+        return self._recid_generator
 
     def register_minter(self, name, minter):
         """Register a minter.
@@ -54,6 +243,33 @@ class _PIDStoreState(object):
         if name not in self.minters:
             self.minters[name] = minter
 
+    def register_batch_minter(self, name, minter):
+        """Register a batch minter.
+
+        A batch minter takes a list of ``(record_uuid, data)`` tuples and
+        returns the list of minted persistent identifiers.
+
+        :param name: Minter name, usually the name of the single-item minter.
+        :param minter: The new batch minter.
+        """
+        if name not in self.batch_minters:
+            self.batch_minters[name] = minter
+
+    def get_batch_minter(self, name):
+        """Get a batch minter.
+
+        :param name: Minter name.
+        :raises KeyError: If neither a batch minter nor a minter is registered
+            with this name.
+        :returns: The registered batch minter, or the single-item minter
+            adapted with :func:`invenio_pidstore.minters.batch_minter_adapter`.
+        """
+        if name in self.batch_minters:
+            return self.batch_minters[name]
+        from .minters import batch_minter_adapter
+
+        return batch_minter_adapter(self.minters[name])
+
     def register_fetcher(self, name, fetcher):
         """Register a fetcher.
 
@@ -63,6 +279,42 @@ class _PIDStoreState(object):
         if name not in self.fetchers:
             self.fetchers[name] = fetcher
 
+    def register_batch_fetcher(self, name, fetcher):
+        """Register a batch fetcher.
+
+        A batch fetcher takes a list of ``(record_uuid, data)`` tuples and
+        returns a :class:`invenio_pidstore.fetchers.FetchedPIDs` instance.
+
+        :param name: Fetcher name, usually the name of the single-record
+            fetcher.
+        :param fetcher: The new batch fetcher.
+        """
+        if name not in self.batch_fetchers:
+            self.batch_fetchers[name] = fetcher
+
+    def get_batch_fetcher(self, name):
+        """Get a batch fetcher.
+
+        :param name: Fetcher name.
+        :raises KeyError: If neither a batch fetcher nor a fetcher is
+            registered with this name.
+        :returns: The registered batch fetcher, or the single-record fetcher
+            adapted with
+            :func:`invenio_pidstore.fetchers.batch_fetcher_adapter`.
+        """
+        if name in self.batch_fetchers:
+            return self.batch_fetchers[name]
+        from .fetchers import batch_fetcher_adapter
+
+        return batch_fetcher_adapter(self.fetchers[name])
+
+    def batch(self):
+        """Change persistent identifiers without a savepoint per call.
+
+        See :func:`invenio_pidstore.models.batch`.
+        """
+        return batch()
+
     def load_minters_entry_point_group(self, entry_point_group):
         """Load minters from an entry point group.
 
@@ -71,6 +323,22 @@ class _PIDStoreState(object):
         for ep in entry_points(group=entry_point_group):
             self.register_minter(ep.name, ep.load())
 
+    def load_batch_minters_entry_point_group(self, entry_point_group):
+        """Load batch minters from an entry point group.
+
+        :param entry_point_group: The entrypoint group.
+        """
+        for ep in entry_points(group=entry_point_group):
+            self.register_batch_minter(ep.name, ep.load())
+
+    def load_batch_fetchers_entry_point_group(self, entry_point_group):
+        """Load batch fetchers from an entry point group.
+
+        :param entry_point_group: The entrypoint group.
+        """
+        for ep in entry_points(group=entry_point_group):
+            self.register_batch_fetcher(ep.name, ep.load())
+
     def load_fetchers_entry_point_group(self, entry_point_group):
         """Load fetchers from an entry point group.
 
@@ -88,6 +356,8 @@ class InvenioPIDStore(object):
         app=None,
         minters_entry_point_group="invenio_pidstore.minters",
         fetchers_entry_point_group="invenio_pidstore.fetchers",
+        batch_minters_entry_point_group="invenio_pidstore.batch_minters",
+        batch_fetchers_entry_point_group="invenio_pidstore.batch_fetchers",
     ):
         """Extension initialization.
 
@@ -95,16 +365,27 @@ class InvenioPIDStore(object):
             (Default: `invenio_pidstore.minters`).
         :param fetchers_entry_point_group: The entrypoint for fetchers.
             (Default: `invenio_pidstore.fetchers`).
+        :param batch_minters_entry_point_group: The entrypoint for batch
+            minters. (Default: `invenio_pidstore.batch_minters`).
+        :param batch_fetchers_entry_point_group: The entrypoint for batch
+            fetchers. (Default: `invenio_pidstore.batch_fetchers`).
         """
         if app:
             self._state = self.init_app(
                 app,
                 minters_entry_point_group=minters_entry_point_group,
                 fetchers_entry_point_group=fetchers_entry_point_group,
+                batch_minters_entry_point_group=batch_minters_entry_point_group,
+                batch_fetchers_entry_point_group=batch_fetchers_entry_point_group,
             )
 
     def init_app(
-        self, app, minters_entry_point_group=None, fetchers_entry_point_group=None
+        self,
+        app,
+        minters_entry_point_group=None,
+        fetchers_entry_point_group=None,
+        batch_minters_entry_point_group=None,
+        batch_fetchers_entry_point_group=None,
     ):
         """Flask application initialization.
 
@@ -118,7 +399,9 @@ class InvenioPIDStore(object):
             (Default: `{"rec": "recordmetadata.details_view"}` if
             `invenio-records` is installed, otherwise `{}`).
 
-        * Register the `pid_exists` template filter.
+        * Register the `pid_exists` and `pid_exists_many` template filters.
+
+        * Register the session listeners invalidating cached PIDs on commit.
 
         * Initialize extension state.
 
@@ -127,11 +410,21 @@ class InvenioPIDStore(object):
             (Default: None).
         :param fetchers_entry_point_group: The fetchers entry point group
             (Default: None).
+        :param batch_minters_entry_point_group: The batch minters entry point
+            group (Default: None).
+        :param batch_fetchers_entry_point_group: The batch fetchers entry
+            point group (Default: None).
         :returns: PIDStore state application.
         """
         self.init_config(app)
         # Initialize CLI
-        app.cli.add_command(cmd)
+        app.cli.add_command(
+            _LazyGroup(
+                "invenio_pidstore.cli:pid",
+                name="pid",
+                help="PID-Store management commands.",
+            )
+        )
 
         # Initialize logger
         app.config.setdefault("PIDSTORE_APP_LOGGER_HANDLERS", app.debug)
@@ -140,25 +433,32 @@ class InvenioPIDStore(object):
                 logger.addHandler(handler)
 
         # Initialize admin object link endpoints.
-        try:
-            importlib.metadata.version("invenio-records")
+        if importlib.util.find_spec("invenio_records") is not None:
             app.config.setdefault(
                 "PIDSTORE_OBJECT_ENDPOINTS",
                 dict(
                     rec="recordmetadata.details_view",
                 ),
             )
-        except importlib.metadata.PackageNotFoundError:
+        else:
             app.config.setdefault("PIDSTORE_OBJECT_ENDPOINTS", {})
 
         # Register template filter
         app.jinja_env.filters["pid_exists"] = pid_exists
+        app.jinja_env.filters["pid_exists_many"] = pid_exists_many
+
+        # Invalidate cached PIDs when the transaction changing them commits.
+        if not event.contains(Session, "after_commit", invalidate_after_commit):
+            event.listen(Session, "after_commit", invalidate_after_commit)
+            event.listen(Session, "after_soft_rollback", discard_after_rollback)
 
         # Initialize extension state.
         state = _PIDStoreState(
             app=app,
             minters_entry_point_group=minters_entry_point_group,
             fetchers_entry_point_group=fetchers_entry_point_group,
+            batch_minters_entry_point_group=batch_minters_entry_point_group,
+            batch_fetchers_entry_point_group=batch_fetchers_entry_point_group,
         )
         app.extensions["invenio-pidstore"] = state
         return state
@@ -17,6 +17,11 @@ E.g.
             pid_value=extract_pid_value(data),
         )
 
+A batch fetcher takes a list of ``(record_uuid, data)`` tuples and returns a
+:class:`invenio_pidstore.fetchers.FetchedPIDs` instance, holding the
+fetched values column by column. Single-record fetchers can be adapted with
+:func:`invenio_pidstore.fetchers.batch_fetcher_adapter`.
+
 To see more about providers see :mod:`invenio_pidstore.providers`.
 """
 
@@ -33,6 +38,27 @@ FetchedPID = namedtuple("FetchedPID", ["provider", "pid_type", "pid_value"])
 """A pid fetcher."""
 
 
+class FetchedPIDs(namedtuple("FetchedPIDs", ["provider", "pid_type", "pid_value"])):
+    """PIDs fetched by a batch fetcher.
+
+    Each field is a list with one item per record.
+    """
+
+    __slots__ = ()
+
+    def __len__(self):
+        """Return the number of fetched PIDs."""
+        return len(self.pid_value)
+
+    def rows(self):
+        """Iterate over the fetched PIDs.
+
+        :returns: An iterator of :data:`invenio_pidstore.fetchers.FetchedPID`
+            instances.
+        """
+        return map(FetchedPID._make, zip(self.provider, self.pid_type, self.pid_value))
+
+
 def recid_fetcher_v2(record_uuid, data):
     """Fetch a record's identifiers.
 
@@ -61,3 +87,57 @@ def recid_fetcher(record_uuid, data):
         pid_type=RecordIdProvider.pid_type,
         pid_value=str(data[pid_field]),
     )
+
+
+def recid_fetcher_v2_many(records):
+    """Fetch the identifiers of many records.
+
+    Batch version of :func:`recid_fetcher_v2`.
+
+    :param records: Iterable of ``(record_uuid, data)`` tuples.
+    :returns: A :class:`invenio_pidstore.fetchers.FetchedPIDs` instance.
+    """
+    return _fetch_recids(RecordIdProviderV2, records)
+
+
+def recid_fetcher_many(records):
+    """Legacy way to fetch the identifiers of many records.
+
+    Batch version of :func:`recid_fetcher`.
+
+    :param records: Iterable of ``(record_uuid, data)`` tuples.
+    :returns: A :class:`invenio_pidstore.fetchers.FetchedPIDs` instance.
+    """
+    return _fetch_recids(RecordIdProvider, records)
+
+
+def batch_fetcher_adapter(fetcher):
+    """Adapt a fetcher to the batch fetcher signature.
+
+    The returned batch fetcher calls ``fetcher`` for each record.
+
+    :param fetcher: Fetcher taking a ``(record_uuid, data)`` pair.
+    :returns: A batch fetcher taking an iterable of ``(record_uuid, data)``
+        tuples and returning a :class:`invenio_pidstore.fetchers.FetchedPIDs`
+        instance.
+    """
+
+    def fetch_many(records):
+        fetched = [fetcher(record_uuid, data) for record_uuid, data in records]
+        if not fetched:
+            return FetchedPIDs([], [], [])
+        return FetchedPIDs(*(list(column) for column in zip(*fetched)))
+
+    return fetch_many
+
+
+def _fetch_recids(provider, records):
+    """Fetch the record identifiers of records."""
+    pid_field = current_app.config["PIDSTORE_RECID_FIELD"]
+    pid_values = [str(data[pid_field]) for _, data in records]
+    n = len(pid_values)
+    return FetchedPIDs(
+        provider=[provider] * n,
+        pid_type=[provider.pid_type] * n,
+        pid_value=pid_values,
+    )
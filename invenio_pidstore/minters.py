@@ -32,6 +32,27 @@ def recid_minter_v2(record_uuid, data):
     return provider.pid
 
 
+def recid_minter_v2_many(records):
+    """Mint record identifiers with RecordIDProviderV2 for many records.
+
+    Batch version of :func:`recid_minter_v2`, creating all the persistent
+    identifiers with
+    :meth:`invenio_pidstore.providers.recordid_v2.RecordIdProviderV2.create_many`.
+
+    :param records: Iterable of ``(record_uuid, data)`` tuples.
+    :returns: The list of fresh `invenio_pidstore.models.PersistentIdentifier`
+        instances, in the order of ``records``.
+    """
+    records = list(records)
+    pid_field = current_app.config["PIDSTORE_RECID_FIELD"]
+    for _, data in records:
+        assert pid_field not in data
+    providers = RecordIdProviderV2.create_many(
+        [("rec", record_uuid) for record_uuid, _ in records]
+    )
+    return _set_pid_values(pid_field, records, providers)
+
+
 def recid_minter(record_uuid, data):
     """Mint record identifiers.
 
@@ -62,3 +83,49 @@ def recid_minter(record_uuid, data):
     provider = RecordIdProvider.create(object_type="rec", object_uuid=record_uuid)
     data[pid_field] = provider.pid.pid_value
     return provider.pid
+
+
+def recid_minter_many(records):
+    """Mint record identifiers for many records.
+
+    Batch version of :func:`recid_minter`, reserving all the record
+    identifiers together with
+    :meth:`invenio_pidstore.providers.recordid.RecordIdProvider.create_many`.
+
+    :param records: Iterable of ``(record_uuid, data)`` tuples.
+    :returns: The list of fresh `invenio_pidstore.models.PersistentIdentifier`
+        instances, in the order of ``records``.
+    """
+    records = list(records)
+    pid_field = current_app.config["PIDSTORE_RECID_FIELD"]
+    for _, data in records:
+        assert pid_field not in data
+    providers = RecordIdProvider.create_many(
+        [("rec", record_uuid) for record_uuid, _ in records]
+    )
+    return _set_pid_values(pid_field, records, providers)
+
+
+def batch_minter_adapter(minter):
+    """Adapt a minter to the batch minter signature.
+
+    The returned batch minter calls ``minter`` for each record.
+
+    :param minter: Minter taking a ``(record_uuid, data)`` pair.
+    :returns: A batch minter taking an iterable of ``(record_uuid, data)``
+        tuples and returning the list of minted persistent identifiers.
+    """
+
+    def mint_many(records):
+        return [minter(record_uuid, data) for record_uuid, data in records]
+
+    return mint_many
+
+
+def _set_pid_values(pid_field, records, providers):
+    """Store the minted values in the records and return the PIDs."""
+    pids = []
+    for (_, data), provider in zip(records, providers):
+        data[pid_field] = provider.pid.pid_value
+        pids.append(provider.pid)
+    return pids
@@ -6,15 +6,38 @@
 
 from __future__ import absolute_import, print_function
 
+import csv
+import io
 import logging
 import uuid
+from collections import Counter, namedtuple
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
 from enum import Enum
 
 import six
 from invenio_db import db
 from invenio_i18n import lazy_gettext as _
-from sqlalchemy import func
+from sqlalchemy import (
+    and_,
+    cast,
+    column,
+    delete,
+    exists,
+    func,
+    literal,
+    not_,
+    or_,
+    select,
+    text,
+    type_coerce,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy_utils.types import ChoiceType, UUIDType
 
@@ -27,6 +50,55 @@ from .errors import (
 
 logger = logging.getLogger("invenio-pidstore")
 
+CHANGED_PIDS_KEY = "invenio_pidstore.changed_pids"
+"""Session info key of the PIDs changed in the current transaction."""
+
+BATCH_KEY = "invenio_pidstore.batch"
+"""Session info key counting the active :func:`batch` blocks."""
+
+POOL_PROVIDER = "pool"
+"""Provider name of the pre-generated persistent identifiers of a pool.
+
+Pooled PIDs are left out of the set-based transitions, e.g.
+:meth:`PersistentIdentifier.bulk_register`, until they are claimed.
+"""
+
+
+@contextmanager
+def batch():
+    """Change persistent identifiers without a savepoint per call.
+
+    Inside the block, :meth:`PersistentIdentifier.create`, ``assign()``,
+    ``unassign()``, ``redirect()``, ``reserve()``, ``register()``,
+    ``delete()`` and ``sync_status()`` only change the session, and the
+    changes are flushed by the surrounding unit of work. Database errors are
+    thus raised at flush time: e.g. a duplicated persistent identifier raises
+    :exc:`sqlalchemy.exc.IntegrityError` instead of
+    :exc:`invenio_pidstore.errors.PIDAlreadyExists`, and the failed flush
+    rolls back the whole transaction.
+
+    .. code-block:: python
+
+        with batch():
+            pid = PersistentIdentifier.create("recid", "1")
+            pid.assign("rec", rec_uuid)
+            pid.register()
+        db.session.commit()
+    """
+    info = db.session.info
+    info[BATCH_KEY] = info.get(BATCH_KEY, 0) + 1
+    try:
+        yield
+    finally:
+        info[BATCH_KEY] -= 1
+
+
+def _savepoint():
+    """Return a savepoint for a change, unless in a :func:`batch` block."""
+    if db.session.info.get(BATCH_KEY):
+        return nullcontext()
+    return db.session.begin_nested()
+
 
 PID_STATUS_TITLES = {
     "NEW": _("New"),
@@ -78,6 +150,81 @@ class PIDStatus(Enum):
         return PID_STATUS_TITLES[self.name]
 
 
+class PIDRecord(
+    namedtuple(
+        "PIDRecord",
+        [
+            "id",
+            "pid_type",
+            "pid_value",
+            "pid_provider",
+            "status",
+            "object_type",
+            "object_uuid",
+        ],
+    )
+):
+    """Read-only persistent identifier.
+
+    Lightweight alternative to
+    :class:`invenio_pidstore.models.PersistentIdentifier` instances for read
+    paths, built from Core rows (see
+    :meth:`invenio_pidstore.models.PersistentIdentifier.read`). It is not
+    tracked by the session, and ``status`` is the raw status value (e.g.
+    ``"R"``), which compares equal to the
+    :class:`invenio_pidstore.models.PIDStatus` members.
+    """
+
+    __slots__ = ()
+
+    def has_object(self):
+        """Determine if this PID has an assigned object."""
+        return bool(self.object_type and self.object_uuid)
+
+    def get_assigned_object(self, object_type=None):
+        """Return the current assigned object UUID.
+
+        :param object_type: If it's specified, returns only if the PID
+            object_type is the same, otherwise returns None. (default: None).
+        :returns: The object UUID.
+        """
+        if object_type is not None and self.object_type != object_type:
+            return None
+        return self.object_uuid
+
+    def get_redirect(self):
+        """Get redirected persistent identifier.
+
+        :returns: A :class:`invenio_pidstore.models.PIDRecord` instance.
+        """
+        return PersistentIdentifier._read_one(
+            PersistentIdentifier.id
+            == select(Redirect.pid_id)
+            .where(Redirect.id == self.object_uuid)
+            .scalar_subquery()
+        )
+
+    def is_redirected(self):
+        """Return true if the persistent identifier has been redirected."""
+        return self.status == PIDStatus.REDIRECTED
+
+    def is_registered(self):
+        """Return true if the persistent identifier has been registered."""
+        return self.status == PIDStatus.REGISTERED
+
+    def is_deleted(self):
+        """Return true if the persistent identifier has been deleted."""
+        return self.status == PIDStatus.DELETED
+
+    def is_new(self):
+        """Return true if the PID is new."""
+        return self.status == PIDStatus.NEW
+
+    def is_reserved(self):
+        """Return true if the PID has been reserved."""
+        return self.status == PIDStatus.RESERVED
+
+
 class PersistentIdentifier(db.Model, db.Timestamp):
     """Store and register persistent identifiers.
 
@@ -115,6 +262,9 @@ class PersistentIdentifier(db.Model, db.Timestamp):
     object_uuid = db.Column(UUIDType, nullable=True)
     """Object ID - e.g. a record id."""
 
+    _IN_CHUNK_SIZE = 500
+    """Maximum number of values bound in a single ``IN`` clause."""
+
     #
     # Class methods
     #
@@ -142,7 +292,7 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             instance.
         """
         try:
-            with db.session.begin_nested():
+            with _savepoint():
                 obj = cls(
                     pid_type=pid_type,
                     pid_value=pid_value,
@@ -152,6 +302,7 @@ class PersistentIdentifier(db.Model, db.Timestamp):
                 if object_type and object_uuid:
                     obj.assign(object_type, object_uuid)
                 db.session.add(obj)
+            obj._changed()
             logger.info(
                 "Created PID {0}:{1}".format(pid_type, pid_value), extra={"pid": obj}
             )
@@ -187,6 +338,499 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             raise
         return obj
 
+    @classmethod
+    def bulk_create(cls, rows, chunk_size=500):
+        """Create many persistent identifiers with multi-row INSERTs.
+
+        Rows are validated like in :meth:`create` and inserted in chunks of
+        ``chunk_size`` rows, each chunk in a single statement. Rows whose
+        ``pid_type``/``pid_value`` already exist (in the database or earlier
+        in ``rows``) are not inserted and are reported as conflicts instead of
+        aborting the batch.
+
+        :param rows: Iterable of ``(pid_type, pid_value, pid_provider, status,
+            object_type, object_uuid)`` tuples. ``status`` defaults to
+            :attr:`invenio_pidstore.models.PIDStatus.NEW` when ``None``.
+        :param chunk_size: Number of rows per INSERT statement.
+            (Default: ``500``).
+        :raises invenio_pidstore.errors.PIDInvalidAction: If an object is
+            assigned to a deleted persistent identifier.
+        :returns: A tuple ``(created, conflicts)`` with the list of created
+            ``(pid_type, pid_value)`` keys and the list of
+            :exc:`invenio_pidstore.errors.PIDAlreadyExists` errors.
+        """
+        created, conflicts = cls._insert_new(
+            (cls._bulk_row(*row) for row in rows), chunk_size
+        )
+        logger.info(
+            "Bulk created {0} PIDs ({1} conflicts)".format(len(created), len(conflicts))
+        )
+        return created, conflicts
+
+    @classmethod
+    def _insert_new(cls, rows, chunk_size):
+        """Insert column values in chunks, skipping the existing keys."""
+        created = []
+        conflicts = []
+        seen = set()
+        chunk = []
+
+        def flush(chunk):
+            existing = cls._existing_keys(
+                (r["pid_type"], r["pid_value"]) for r in chunk
+            )
+            values = []
+            for r in chunk:
+                key = (r["pid_type"], r["pid_value"])
+                if key in existing:
+                    conflicts.append(PIDAlreadyExists(*key))
+                else:
+                    values.append(r)
+            if values:
+                created.extend(cls._insert_rows(values, conflicts))
+
+        for values in rows:
+            key = (values["pid_type"], values["pid_value"])
+            if key in seen:
+                conflicts.append(PIDAlreadyExists(*key))
+                continue
+            seen.add(key)
+            chunk.append(values)
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+        db.session.info.setdefault(CHANGED_PIDS_KEY, set()).update(created)
+        return created, conflicts
+
+    @classmethod
+    def _bulk_row(
+        cls,
+        pid_type,
+        pid_value,
+        pid_provider=None,
+        status=None,
+        object_type=None,
+        object_uuid=None,
+        created=None,
+        updated=None,
+    ):
+        """Validate a bulk row and convert it to column values."""
+        status = PIDStatus(status or PIDStatus.NEW)
+        if object_type and object_uuid:
+            if status == PIDStatus.DELETED:
+                raise PIDInvalidAction(
+                    "You cannot assign objects to a deleted/redirected persistent"
+                    " identifier."
+                )
+        else:
+            object_type = object_uuid = None
+        return cls._stored_row(
+            pid_type,
+            pid_value,
+            pid_provider,
+            status,
+            object_type,
+            object_uuid,
+            created,
+            updated,
+        )
+
+    @classmethod
+    def _stored_row(
+        cls,
+        pid_type,
+        pid_value,
+        pid_provider=None,
+        status=None,
+        object_type=None,
+        object_uuid=None,
+        created=None,
+        updated=None,
+    ):
+        """Convert a stored row to column values, without validating it."""
+        if object_uuid is not None and not isinstance(object_uuid, uuid.UUID):
+            object_uuid = uuid.UUID(object_uuid)
+        created = created or datetime.now(tz=timezone.utc)
+        return dict(
+            pid_type=pid_type,
+            pid_value=six.text_type(pid_value),
+            pid_provider=pid_provider,
+            status=PIDStatus(status or PIDStatus.NEW),
+            object_type=object_type,
+            object_uuid=object_uuid,
+            created=created,
+            updated=updated or created,
+        )
+
+    @classmethod
+    def bulk_import(cls, rows):
+        """Import stored persistent identifiers, skipping the existing ones.
+
+        Meant for migrations: unlike :meth:`bulk_create`, the rows are stored
+        as they are, e.g. a deleted persistent identifier keeps its object and
+        a redirected one the id of its
+        :class:`invenio_pidstore.models.Redirect` (see
+        :meth:`invenio_pidstore.models.Redirect.bulk_import`). On PostgreSQL
+        the rows are loaded with ``COPY`` into a temporary staging table and
+        moved with a single ``INSERT ... ON CONFLICT DO NOTHING``.
+
+        :param rows: List of ``(pid_type, pid_value, pid_provider, status,
+            object_type, object_uuid, created, updated)`` tuples. The
+            timestamps are optional and default to the current time.
+        :returns: A tuple ``(created, conflicts)`` as in :meth:`bulk_create`.
+        """
+        values = [cls._stored_row(*row) for row in rows]
+        if db.engine.dialect.name == "postgresql":  # pragma: no cover
+            created, conflicts = cls._copy_rows(values)
+        else:
+            created, conflicts = cls._insert_new(values, chunk_size=500)
+        logger.info(
+            "Imported {0} PIDs ({1} conflicts)".format(len(created), len(conflicts))
+        )
+        return created, conflicts
+
+    _COPY_COLUMNS = (
+        "pid_type",
+        "pid_value",
+        "pid_provider",
+        "status",
+        "object_type",
+        "object_uuid",
+        "created",
+        "updated",
+    )
+
+    @classmethod
+    def _copy_rows(cls, values):  # pragma: no cover
+        """Insert rows through a PostgreSQL ``COPY`` into a staging table."""
+        columns = ", ".join(cls._COPY_COLUMNS)
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for r in values:
+            writer.writerow(
+                [
+                    r["status"].value if c == "status" else r[c]
+                    for c in cls._COPY_COLUMNS
+                ]
+            )
+        buf.seek(0)
+
+        connection = db.session.connection()
+        connection.execute(
+            text(
+                "CREATE TEMPORARY TABLE IF NOT EXISTS pidstore_pid_import "
+                "ON COMMIT DROP AS SELECT {0} FROM {1} WITH NO DATA".format(
+                    columns, cls.__tablename__
+                )
+            )
+        )
+        connection.execute(text("TRUNCATE pidstore_pid_import"))
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(
+            "COPY pidstore_pid_import ({0}) FROM STDIN WITH (FORMAT csv)".format(
+                columns
+            ),
+            buf,
+        )
+        created = [
+            tuple(row)
+            for row in connection.execute(
+                text(
+                    "INSERT INTO {1} ({0}) SELECT {0} FROM pidstore_pid_import "
+                    "ON CONFLICT (pid_type, pid_value) DO NOTHING "
+                    "RETURNING pid_type, pid_value".format(columns, cls.__tablename__)
+                )
+            )
+        ]
+        remaining = Counter((r["pid_type"], r["pid_value"]) for r in values)
+        remaining.subtract(created)
+        conflicts = [PIDAlreadyExists(*key) for key in remaining.elements()]
+
+        db.session.info.setdefault(CHANGED_PIDS_KEY, set()).update(created)
+        return created, conflicts
+
+    @classmethod
+    def _existing_keys(cls, keys):
+        """Return the subset of ``(pid_type, pid_value)`` keys in the table."""
+        by_type = {}
+        for pid_type, pid_value in keys:
+            by_type.setdefault(pid_type, []).append(pid_value)
+
+        existing = set()
+        for pid_type, values in by_type.items():
+            for i in range(0, len(values), cls._IN_CHUNK_SIZE):
+                existing.update(
+                    db.session.query(cls.pid_type, cls.pid_value).filter(
+                        cls.pid_type == pid_type,
+                        cls.pid_value.in_(values[i : i + cls._IN_CHUNK_SIZE]),
+                    )
+                )
+        return existing
+
+    @classmethod
+    def _insert_rows(cls, values, conflicts):
+        """Insert rows in one statement, falling back to one by one.
+
+        The fallback only happens if a concurrent transaction inserted one of
+        the keys after they were checked.
+        """
+        try:
+            with db.session.begin_nested():
+                db.session.execute(cls.__table__.insert(), values)
+            return [(r["pid_type"], r["pid_value"]) for r in values]
+        except IntegrityError:
+            pass
+
+        created = []
+        for r in values:
+            key = (r["pid_type"], r["pid_value"])
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(cls.__table__.insert(), [r])
+                created.append(key)
+            except IntegrityError:
+                conflicts.append(PIDAlreadyExists(*key))
+        return created
+
+    @classmethod
+    def claim(
+        cls,
+        pid_type,
+        pool_provider,
+        pid_provider=None,
+        status=PIDStatus.RESERVED,
+        object_type=None,
+        object_uuid=None,
+    ):
+        """Claim a pre-generated persistent identifier from a pool.
+
+        Pooled persistent identifiers are reserved, have no object and are
+        marked with the ``pool_provider`` provider. One of them is claimed
+        with a single ``UPDATE ... RETURNING`` statement, skipping the rows
+        locked by concurrent transactions. On databases without
+        ``RETURNING`` (MySQL), it is selected, updated and loaded separately.
+
+        :param pid_type: Persistent identifier type.
+        :param pool_provider: Provider name marking the pooled PIDs.
+        :param pid_provider: Persistent identifier provider of the claimed
+            PID. (default: None).
+        :param status: Status of the claimed PID.
+            (Default: :attr:`invenio_pidstore.models.PIDStatus.RESERVED`)
+        :param object_type: The object type is a string that identify its type.
+            (default: None).
+        :param object_uuid: The object UUID. (default: None).
+        :returns: A :class:`invenio_pidstore.models.PersistentIdentifier`
+            instance or ``None`` if the pool is empty.
+        """
+        candidate = (
+            select(cls.id)
+            .where(
+                cls.pid_type == pid_type,
+                cls.pid_provider == pool_provider,
+                cls.status == PIDStatus.RESERVED,
+                cls.object_uuid.is_(None),
+            )
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if not (object_type and object_uuid):
+            object_type = object_uuid = None
+        values = dict(
+            pid_provider=pid_provider,
+            status=status,
+            object_type=object_type,
+            object_uuid=object_uuid,
+            updated=datetime.now(tz=timezone.utc),
+        )
+        if db.engine.dialect.update_returning:
+            obj = db.session.execute(
+                update(cls)
+                .where(cls.id == candidate.scalar_subquery())
+                .values(**values)
+                .returning(cls),
+                execution_options=dict(
+                    synchronize_session=False, populate_existing=True
+                ),
+            ).scalar_one_or_none()
+        else:
+            # MySQL cannot return the updated row, nor update the table it
+            # selects from in a subquery.
+            pid_id = db.session.execute(candidate).scalar()
+            obj = None
+            if pid_id is not None:
+                db.session.execute(
+                    update(cls).where(cls.id == pid_id).values(**values),
+                    execution_options=dict(synchronize_session=False),
+                )
+                obj = db.session.get(cls, pid_id, populate_existing=True)
+        if obj is None:
+            return None
+        obj._changed()
+        logger.info(
+            "Claimed PID {0}:{1}".format(pid_type, obj.pid_value), extra={"pid": obj}
+        )
+        return obj
+
+    @classmethod
+    def get_or_create(
+        cls,
+        pid_type,
+        pid_value,
+        pid_provider=None,
+        status=PIDStatus.NEW,
+        object_type=None,
+        object_uuid=None,
+    ):
+        """Get a persistent identifier, creating it if it does not exist.
+
+        Unlike :meth:`create`, an existing persistent identifier is not an
+        error: it is detected by a single ``INSERT ... ON CONFLICT DO
+        NOTHING`` statement, without a savepoint or an exception. The
+        arguments are only used to create the persistent identifier.
+
+        :param pid_type: Persistent identifier type.
+        :param pid_value: Persistent identifier value.
+        :param pid_provider: Persistent identifier provider. (default: None).
+        :param status: Current PID status.
+            (Default: :attr:`invenio_pidstore.models.PIDStatus.NEW`)
+        :param object_type: The object type is a string that identify its type.
+            (default: None).
+        :param object_uuid: The object UUID. (default: None).
+        :returns: A tuple ``(pid, created)`` with a
+            :class:`invenio_pidstore.models.PersistentIdentifier` instance and
+            whether it was created.
+        """
+        insert = cls._dialect_insert()
+        if insert is None:  # pragma: no cover
+            try:
+                return cls.get(pid_type, pid_value), False
+            except PIDDoesNotExistError:
+                return (
+                    cls.create(
+                        pid_type,
+                        pid_value,
+                        pid_provider=pid_provider,
+                        status=status,
+                        object_type=object_type,
+                        object_uuid=object_uuid,
+                    ),
+                    True,
+                )
+
+        values = cls._bulk_row(
+            pid_type, pid_value, pid_provider, status, object_type, object_uuid
+        )
+        stmt = insert(cls.__table__).values(values)
+        row = db.session.execute(
+            stmt.on_conflict_do_nothing(
+                index_elements=["pid_type", "pid_value"]
+            ).returning(cls.__table__.c.id)
+        ).first()
+        if row is None:
+            return cls.get(pid_type, pid_value), False
+
+        obj = db.session.get(cls, row.id)
+        obj._changed()
+        logger.info(
+            "Created PID {0}:{1}".format(pid_type, pid_value), extra={"pid": obj}
+        )
+        return obj, True
+
+    @classmethod
+    def upsert(
+        cls,
+        pid_type,
+        pid_value,
+        pid_provider=None,
+        status=PIDStatus.NEW,
+        object_type=None,
+        object_uuid=None,
+    ):
+        """Create a persistent identifier or overwrite the existing one.
+
+        A single ``INSERT ... ON CONFLICT DO UPDATE`` statement sets the
+        provider, status and assigned object of an existing persistent
+        identifier, without a savepoint or an exception. The status
+        transitions of :meth:`register`, :meth:`delete`, etc. are not applied,
+        only the check that no object is assigned to a deleted persistent
+        identifier. Deleted and redirected persistent identifiers are never
+        overwritten, since this would resurrect them or orphan their
+        redirection.
+
+        :param pid_type: Persistent identifier type.
+        :param pid_value: Persistent identifier value.
+        :param pid_provider: Persistent identifier provider. (default: None).
+        :param status: Current PID status.
+            (Default: :attr:`invenio_pidstore.models.PIDStatus.NEW`)
+        :param object_type: The object type is a string that identify its type.
+            (default: None).
+        :param object_uuid: The object UUID. (default: None).
+        :raises: :exc:`invenio_pidstore.errors.PIDInvalidAction` if the
+            existing persistent identifier is deleted or redirected.
+        :returns: A :class:`invenio_pidstore.models.PersistentIdentifier`
+            instance.
+        """
+        values = cls._bulk_row(
+            pid_type, pid_value, pid_provider, status, object_type, object_uuid
+        )
+        protected = (PIDStatus.DELETED, PIDStatus.REDIRECTED)
+        insert = cls._dialect_insert()
+        if insert is None:  # pragma: no cover
+            obj, created = cls.get_or_create(
+                pid_type,
+                pid_value,
+                pid_provider=pid_provider,
+                status=status,
+                object_type=object_type,
+                object_uuid=object_uuid,
+            )
+            if not created:
+                if obj.status in protected:
+                    raise PIDInvalidAction(
+                        "Persistent identifier is deleted or redirected."
+                    )
+                for key in ("pid_provider", "status", "object_type", "object_uuid"):
+                    setattr(obj, key, values[key])
+                obj._changed()
+            return obj
+
+        stmt = insert(cls.__table__).values(values)
+        row = db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["pid_type", "pid_value"],
+                set_=dict(
+                    pid_provider=stmt.excluded.pid_provider,
+                    status=stmt.excluded.status,
+                    object_type=stmt.excluded.object_type,
+                    object_uuid=stmt.excluded.object_uuid,
+                    updated=stmt.excluded.updated,
+                ),
+                where=not_(cls.__table__.c.status.in_(protected)),
+            ).returning(cls.__table__.c.id)
+        ).one_or_none()
+        if row is None:
+            raise PIDInvalidAction("Persistent identifier is deleted or redirected.")
+
+        obj = db.session.get(cls, row.id, populate_existing=True)
+        obj._changed()
+        logger.info(
+            "Upserted PID {0}:{1}".format(pid_type, pid_value), extra={"pid": obj}
+        )
+        return obj
+
+    @classmethod
+    def _dialect_insert(cls):
+        """Return the INSERT construct supporting ``ON CONFLICT``, if any."""
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":  # pragma: no cover
+            return postgresql.insert
+        if dialect == "sqlite":
+            return sqlite.insert
+        return None  # pragma: no cover
+
     @classmethod
     def get(cls, pid_type, pid_value, pid_provider=None):
         """Get persistent identifier.
@@ -207,6 +851,61 @@ class PersistentIdentifier(db.Model, db.Timestamp):
         except NoResultFound:
             raise PIDDoesNotExistError(pid_type, pid_value)
 
+    @classmethod
+    def get_many(cls, pid_type, pid_values, pid_provider=None, raise_on_missing=False):
+        """Get many persistent identifiers of the same type at once.
+
+        The values are looked up with a single ``IN`` query (split in chunks
+        for very long lists) instead of one query per value.
+
+        :param pid_type: Persistent identifier type.
+        :param pid_values: Iterable of persistent identifier values.
+        :param pid_provider: Persistent identifier provider. (default: None).
+        :param raise_on_missing: Raise an error for the first value which is
+            not found instead of collecting it. (default: False).
+        :raises: :exc:`invenio_pidstore.errors.PIDDoesNotExistError` if
+            ``raise_on_missing`` is set and a PID is not found.
+        :returns: A dictionary mapping each value, in the given order, to its
+            :class:`invenio_pidstore.models.PersistentIdentifier` instance or
+            to ``None`` if the PID was not found.
+        """
+        result = dict.fromkeys(six.text_type(v) for v in pid_values)
+        values = list(result)
+        for i in range(0, len(values), cls._IN_CHUNK_SIZE):
+            query = db.session.query(cls).filter(
+                cls.pid_type == pid_type,
+                cls.pid_value.in_(values[i : i + cls._IN_CHUNK_SIZE]),
+            )
+            if pid_provider:
+                query = query.filter(cls.pid_provider == pid_provider)
+            for pid in query:
+                result[pid.pid_value] = pid
+
+        if raise_on_missing:
+            for value, pid in result.items():
+                if pid is None:
+                    raise PIDDoesNotExistError(pid_type, value)
+        return result
+
+    @classmethod
+    def exists(cls, pid_type, pid_value):
+        """Check if a persistent identifier exists.
+
+        Runs a ``SELECT EXISTS`` query without loading the PID.
+
+        :param pid_type: Persistent identifier type.
+        :param pid_value: Persistent identifier value.
+        :returns: ``True`` if the PID exists.
+        """
+        return db.session.scalar(
+            select(
+                exists().where(
+                    cls.pid_type == pid_type,
+                    cls.pid_value == six.text_type(pid_value),
+                )
+            )
+        )
+
     @classmethod
     def get_by_object(cls, pid_type, object_type, object_uuid):
         """Get a persistent identifier for a given object.
@@ -230,6 +929,186 @@ class PersistentIdentifier(db.Model, db.Timestamp):
         except NoResultFound:
             raise PIDDoesNotExistError(pid_type, None)
 
+    @classmethod
+    def iter_pids(
+        cls,
+        pid_type=None,
+        status=None,
+        object_type=None,
+        chunk_size=1000,
+        id_range=None,
+        updated_since=None,
+    ):
+        """Iterate over the persistent identifiers in constant memory.
+
+        The table is walked in pages of ``chunk_size`` rows ordered by ``id``,
+        each page starting after the last ``id`` of the previous one (keyset
+        pagination), so that the cost of a page does not depend on its
+        position. Rows are streamed with ``yield_per`` and each instance is
+        expunged from the session once the next one is requested, so changes
+        made to the yielded instances are not saved.
+
+        :param pid_type: Only iterate over this persistent identifier type.
+            (default: None).
+        :param status: Only iterate over PIDs with this status.
+            (default: None).
+        :param object_type: Only iterate over PIDs assigned to this object
+            type. (default: None).
+        :param chunk_size: Number of rows per page. (default: 1000).
+        :param id_range: ``(start, end)`` tuple restricting the iteration to
+            ``start <= id < end``, e.g. from :meth:`id_ranges`. Either bound
+            may be ``None``. (default: None).
+        :param updated_since: Only iterate over PIDs updated at or after this
+            datetime. (default: None).
+        :returns: A generator of
+            :class:`invenio_pidstore.models.PersistentIdentifier` instances.
+        """
+        start, end = id_range or (None, None)
+        criteria = cls._iter_criteria(pid_type, status, object_type)
+        if updated_since is not None:
+            criteria.append(cls.updated >= updated_since)
+        if start is not None:
+            criteria.append(cls.id >= start)
+        if end is not None:
+            criteria.append(cls.id < end)
+
+        last_id = None
+        while True:
+            query = db.session.query(cls).filter(*criteria)
+            if last_id is not None:
+                query = query.filter(cls.id > last_id)
+            query = query.order_by(cls.id).limit(chunk_size).yield_per(chunk_size)
+            count = 0
+            for pid in query:
+                count += 1
+                last_id = pid.id
+                yield pid
+                db.session.expunge(pid)
+            if count < chunk_size:
+                return
+
+    @classmethod
+    def id_ranges(cls, partitions, pid_type=None, status=None, object_type=None):
+        """Split the persistent identifiers in ranges of ``id``.
+
+        The ranges can be passed to :meth:`iter_pids` by parallel workers,
+        to iterate over the table without overlap. They have the same width,
+        so they may not hold the same number of rows.
+
+        :param partitions: Number of ranges.
+        :param pid_type: Only consider this persistent identifier type.
+            (default: None).
+        :param status: Only consider PIDs with this status. (default: None).
+        :param object_type: Only consider PIDs assigned to this object type.
+            (default: None).
+        :returns: A list of at most ``partitions`` ``(start, end)`` tuples,
+            empty if there is no matching PID.
+        """
+        low, high = (
+            db.session.query(func.min(cls.id), func.max(cls.id))
+            .filter(*cls._iter_criteria(pid_type, status, object_type))
+            .one()
+        )
+        if low is None:
+            return []
+        width = -(-(high - low + 1) // partitions)
+        return [(i, min(i + width, high + 1)) for i in range(low, high + 1, width)]
+
+    @classmethod
+    def _iter_criteria(cls, pid_type, status, object_type):
+        """Build the filters of :meth:`iter_pids`."""
+        criteria = []
+        if pid_type is not None:
+            criteria.append(cls.pid_type == pid_type)
+        if status is not None:
+            criteria.append(cls.status == status)
+        if object_type is not None:
+            criteria.append(cls.object_type == object_type)
+        return criteria
+
+    @classmethod
+    def read(cls, pid_type, pid_value, pid_provider=None):
+        """Read a persistent identifier without loading an ORM instance.
+
+        :param pid_type: Persistent identifier type.
+        :param pid_value: Persistent identifier value.
+        :param pid_provider: Persistent identifier provider. (default: None).
+        :raises: :exc:`invenio_pidstore.errors.PIDDoesNotExistError` if no
+            PID is found.
+        :returns: A :class:`invenio_pidstore.models.PIDRecord` instance.
+        """
+        criteria = [cls.pid_type == pid_type, cls.pid_value == six.text_type(pid_value)]
+        if pid_provider:
+            criteria.append(cls.pid_provider == pid_provider)
+        record = cls._read_one(*criteria)
+        if record is None:
+            raise PIDDoesNotExistError(pid_type, pid_value)
+        return record
+
+    @classmethod
+    def read_many(cls, pid_type, pid_values):
+        """Read many persistent identifiers without loading ORM instances.
+
+        :param pid_type: Persistent identifier type.
+        :param pid_values: Iterable of persistent identifier values.
+        :returns: A dictionary mapping each value, in the given order, to its
+            :class:`invenio_pidstore.models.PIDRecord` instance or to ``None``
+            if the PID was not found.
+        """
+        result = dict.fromkeys(six.text_type(v) for v in pid_values)
+        values = list(result)
+        for i in range(0, len(values), cls._IN_CHUNK_SIZE):
+            query = cls._read_query().where(
+                cls.pid_type == pid_type,
+                cls.pid_value.in_(values[i : i + cls._IN_CHUNK_SIZE]),
+            )
+            for row in db.session.execute(query):
+                result[row.pid_value] = PIDRecord._make(row)
+        return result
+
+    @classmethod
+    def read_by_object(cls, pid_type, object_type, object_uuid):
+        """Read a persistent identifier for a given object.
+
+        :param pid_type: Persistent identifier type.
+        :param object_type: The object type is a string that identify its type.
+        :param object_uuid: The object UUID.
+        :raises invenio_pidstore.errors.PIDDoesNotExistError: If no PID is
+            found.
+        :returns: A :class:`invenio_pidstore.models.PIDRecord` instance.
+        """
+        record = cls._read_one(
+            cls.pid_type == pid_type,
+            cls.object_type == object_type,
+            cls.object_uuid == object_uuid,
+        )
+        if record is None:
+            raise PIDDoesNotExistError(pid_type, None)
+        return record
+
+    @classmethod
+    def _read_query(cls):
+        """Select the columns of :class:`PIDRecord` instances.
+
+        The status is selected as a plain string, skipping the conversion to
+        :class:`PIDStatus`.
+        """
+        return select(
+            cls.id,
+            cls.pid_type,
+            cls.pid_value,
+            cls.pid_provider,
+            type_coerce(cls.status, db.String).label("status"),
+            cls.object_type,
+            cls.object_uuid,
+        )
+
+    @classmethod
+    def _read_one(cls, *criteria):
+        """Read the first persistent identifier matching the criteria."""
+        row = db.session.execute(cls._read_query().where(*criteria).limit(1)).first()
+        return PIDRecord._make(row) if row is not None else None
+
     #
     # Assigned object methods
     #
@@ -288,7 +1167,7 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             self.unassign()
 
         try:
-            with db.session.begin_nested():
+            with _savepoint():
                 self.object_type = object_type
                 self.object_uuid = object_uuid
                 db.session.add(self)
@@ -297,6 +1176,7 @@ class PersistentIdentifier(db.Model, db.Timestamp):
                 "Failed to assign %s:%s", object_type, object_uuid, extra=dict(pid=self)
             )
             raise
+        self._changed()
         logger.info(
             "Assigned object {0}:{1}".format(object_type, object_uuid),
             extra=dict(pid=self),
@@ -316,7 +1196,7 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             return True
 
         try:
-            with db.session.begin_nested():
+            with _savepoint():
                 if self.is_redirected():
                     db.session.delete(db.session.get(Redirect, self.object_uuid))
                     # Only registered PIDs can be redirected so we set it back
@@ -328,6 +1208,7 @@ class PersistentIdentifier(db.Model, db.Timestamp):
         except SQLAlchemyError:
             logger.exception("Failed to unassign object.", extra=dict(pid=self))
             raise
+        self._changed()
         logger.info("Unassigned object from {0}.".format(self), extra=dict(pid=self))
         return True
 
@@ -339,6 +1220,228 @@ class PersistentIdentifier(db.Model, db.Timestamp):
         """
         return db.session.get(Redirect, self.object_uuid).pid
 
+    @classmethod
+    def bulk_assign(cls, pairs, overwrite=False):
+        """Assign many persistent identifiers to objects.
+
+        Each chunk of pairs is joined to the table as a ``VALUES`` list and
+        assigned with a single UPDATE. The rules of :meth:`assign` apply:
+        deleted and redirected persistent identifiers are rejected, and so are
+        the ones already assigned to another object unless ``overwrite`` is
+        set. Persistent identifiers that do not exist are ignored.
+
+        :param pairs: Iterable of ``(pid_type, pid_value, object_type,
+            object_uuid)`` tuples.
+        :param overwrite: Replace the objects already assigned.
+            (default: False).
+        :returns: A tuple ``(count, rejected)`` with the number of assigned
+            persistent identifiers and the list of rejected ones as
+            :class:`invenio_pidstore.models.PIDRecord` instances.
+        """
+        rows = [
+            (
+                pid_type,
+                six.text_type(pid_value),
+                object_type,
+                u if isinstance(u, uuid.UUID) else uuid.UUID(u),
+            )
+            for pid_type, pid_value, object_type, u in pairs
+        ]
+        columns = [
+            ("pid_type", db.String),
+            ("pid_value", db.String),
+            ("object_type", db.String),
+            ("object_uuid", UUIDType),
+        ]
+        now = datetime.now(tz=timezone.utc)
+        changed = set()
+        rejected = []
+        for i in range(0, len(rows), cls._IN_CHUNK_SIZE):
+            v = cls._values(columns, rows[i : i + cls._IN_CHUNK_SIZE])
+            join = [cls.pid_type == v.c.pid_type, cls.pid_value == v.c.pid_value]
+            other_object = or_(
+                cls.object_type != v.c.object_type,
+                cls.object_uuid != v.c.object_uuid,
+            )
+            guards = [cls.status.in_([PIDStatus.DELETED, PIDStatus.REDIRECTED])]
+            if not overwrite:
+                guards.append(and_(cls.object_uuid.isnot(None), other_object))
+            rejected.extend(
+                PIDRecord._make(row)
+                for row in db.session.execute(
+                    cls._read_query().where(*join, or_(*guards))
+                )
+            )
+            changed.update(
+                cls._changed_keys(
+                    update(cls).values(
+                        object_type=v.c.object_type,
+                        object_uuid=v.c.object_uuid,
+                        updated=now,
+                    ),
+                    join
+                    + [
+                        not_(or_(*guards)),
+                        or_(cls.object_uuid.is_(None), other_object),
+                    ],
+                )
+            )
+        db.session.info.setdefault(CHANGED_PIDS_KEY, set()).update(changed)
+        logger.info(
+            "Bulk assigned {0} PIDs ({1} rejected)".format(len(changed), len(rejected))
+        )
+        return len(changed), rejected
+
+    @classmethod
+    def reassign_objects(cls, mapping, object_type=None):
+        """Move the persistent identifiers of objects to other objects.
+
+        Each chunk of the mapping is joined to the table as a ``VALUES`` list
+        and moved with a single UPDATE. Deleted persistent identifiers cannot
+        be assigned (see :meth:`assign`): they stay with their object and are
+        rejected.
+
+        :param mapping: Dictionary (or iterable of pairs) mapping the current
+            object UUIDs to the new ones.
+        :param object_type: Only move the persistent identifiers assigned to
+            this object type. (default: None).
+        :returns: A tuple ``(count, rejected)`` with the number of moved
+            persistent identifiers and the list of rejected ones as
+            :class:`invenio_pidstore.models.PIDRecord` instances.
+        """
+        rows = [
+            tuple(u if isinstance(u, uuid.UUID) else uuid.UUID(u) for u in pair)
+            for pair in dict(mapping).items()
+        ]
+        columns = [("old_uuid", UUIDType), ("new_uuid", UUIDType)]
+        # Redirected PIDs have no object type.
+        criteria = [
+            (
+                cls.object_type == object_type
+                if object_type
+                else cls.object_type.isnot(None)
+            )
+        ]
+        now = datetime.now(tz=timezone.utc)
+        changed = set()
+        rejected = []
+        for i in range(0, len(rows), cls._IN_CHUNK_SIZE):
+            v = cls._values(columns, rows[i : i + cls._IN_CHUNK_SIZE])
+            rejected.extend(
+                PIDRecord._make(row)
+                for row in db.session.execute(
+                    cls._read_query().where(
+                        *criteria,
+                        cls.object_uuid == v.c.old_uuid,
+                        cls.status == PIDStatus.DELETED,
+                    )
+                )
+            )
+            changed.update(
+                cls._changed_keys(
+                    update(cls).values(object_uuid=v.c.new_uuid, updated=now),
+                    criteria
+                    + [
+                        cls.object_uuid == v.c.old_uuid,
+                        cls.status != PIDStatus.DELETED,
+                    ],
+                )
+            )
+        db.session.info.setdefault(CHANGED_PIDS_KEY, set()).update(changed)
+        logger.info(
+            "Reassigned {0} PIDs ({1} rejected)".format(len(changed), len(rejected))
+        )
+        return len(changed), rejected
+
+    @classmethod
+    def _values(cls, columns, rows):
+        """Return rows as a ``VALUES`` list that can be joined to the table.
+
+        SQLite cannot name the columns of a ``VALUES`` list, so a
+        ``UNION ALL`` of SELECTs is used instead.
+
+        :param columns: List of ``(name, type)`` tuples.
+        :param rows: List of tuples of values.
+        """
+        if db.engine.dialect.name == "postgresql":  # pragma: no cover
+            return values(
+                *[column(name, type_) for name, type_ in columns], name="v"
+            ).data(rows)
+        return union_all(
+            *[
+                select(
+                    *[
+                        literal(value, type_).label(name)
+                        for value, (name, type_) in zip(row, columns)
+                    ]
+                )
+                for row in rows
+            ]
+        ).subquery("v")
+
+    @classmethod
+    def get_redirect_chain(cls, pid_type, pid_value, max_depth=10):
+        """Get a persistent identifier and the chain of PIDs it redirects to.
+
+        The chain is followed in the database with a single recursive query,
+        for at most ``max_depth`` redirections. The query carries the path of
+        visited PIDs and stops at the first PID visited twice, which ends the
+        chain if the redirections form a loop.
+
+        :param pid_type: Persistent identifier type.
+        :param pid_value: Persistent identifier value.
+        :param max_depth: Maximum number of redirections to follow.
+            (default: 10).
+        :returns: A list of :class:`invenio_pidstore.models.PersistentIdentifier`
+            instances, starting with the requested PID. It is empty if the PID
+            does not exist.
+        """
+
+        def step(pid_id):
+            return literal("/") + cast(pid_id, db.String) + literal("/")
+
+        # Both terms cast the path to the same wide type, since some databases
+        # derive the column type from the non-recursive term only.
+        path_type = db.String(4000)
+        chain = (
+            select(
+                cls.id.label("id"),
+                literal(0).label("depth"),
+                cast(step(cls.id), path_type).label("path"),
+                literal(False).label("is_cycle"),
+            )
+            .where(cls.pid_type == pid_type, cls.pid_value == six.text_type(pid_value))
+            .cte("redirect_chain", recursive=True)
+        )
+        hop = aliased(cls)
+        chain = chain.union_all(
+            select(
+                Redirect.pid_id,
+                chain.c.depth + 1,
+                cast(
+                    chain.c.path + cast(Redirect.pid_id, db.String) + literal("/"),
+                    path_type,
+                ),
+                chain.c.path.contains(step(Redirect.pid_id)),
+            )
+            .select_from(chain)
+            .join(hop, hop.id == chain.c.id)
+            .join(
+                Redirect,
+                and_(
+                    hop.status == PIDStatus.REDIRECTED,
+                    Redirect.id == hop.object_uuid,
+                ),
+            )
+            .where(chain.c.depth < max_depth, not_(chain.c.is_cycle))
+        )
+        return [
+            pid
+            for pid, depth in db.session.query(cls, chain.c.depth)
+            .join(chain, chain.c.id == cls.id)
+            .order_by(chain.c.depth)
+        ]
+
     #
     # Status methods.
     #
@@ -357,13 +1460,13 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             raise PIDInvalidAction("Persistent identifier is not registered.")
 
         try:
-            with db.session.begin_nested():
+            with _savepoint():
                 if self.is_redirected():
                     r = db.session.get(Redirect, self.object_uuid)
                     r.pid = pid
                 else:
-                    with db.session.begin_nested():
-                        r = Redirect(pid=pid)
+                    with _savepoint():
+                        r = Redirect(id=uuid.uuid4(), pid=pid)
                         db.session.add(r)
 
                 self.status = PIDStatus.REDIRECTED
@@ -375,6 +1478,7 @@ class PersistentIdentifier(db.Model, db.Timestamp):
         except SQLAlchemyError:
             logger.exception("Failed to redirect to %s", pid, extra=dict(pid=self))
             raise
+        self._changed()
         logger.info("Redirected PID to {0}".format(pid), extra=dict(pid=self))
         return True
 
@@ -392,12 +1496,13 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             raise PIDInvalidAction("Persistent identifier is not new or reserved.")
 
         try:
-            with db.session.begin_nested():
+            with _savepoint():
                 self.status = PIDStatus.RESERVED
                 db.session.add(self)
         except SQLAlchemyError:
             logger.exception("Failed to reserve PID.", extra=dict(pid=self))
             raise
+        self._changed()
         logger.info("Reserved PID.", extra=dict(pid=self))
         return True
 
@@ -415,12 +1520,13 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             )
 
         try:
-            with db.session.begin_nested():
+            with _savepoint():
                 self.status = PIDStatus.REGISTERED
                 db.session.add(self)
         except SQLAlchemyError:
             logger.exception("Failed to register PID.", extra=dict(pid=self))
             raise
+        self._changed()
         logger.info("Registered PID.", extra=dict(pid=self))
         return True
 
@@ -435,11 +1541,15 @@ class PersistentIdentifier(db.Model, db.Timestamp):
         """
         removed = False
         try:
-            with db.session.begin_nested():
+            with _savepoint():
                 if self.is_new():
                     # New persistent identifier which haven't been registered
                     # yet.
-                    db.session.delete(self)
+                    if self in db.session.new:
+                        # Created in a batch, it was never flushed.
+                        db.session.expunge(self)
+                    else:
+                        db.session.delete(self)
                     removed = True
                 else:
                     self.status = PIDStatus.DELETED
@@ -448,6 +1558,7 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             logger.exception("Failed to delete PID.", extra=dict(pid=self))
             raise
 
+        self._changed()
         if removed:
             logger.info("Deleted PID (removed).", extra=dict(pid=self))
         else:
@@ -467,15 +1578,194 @@ class PersistentIdentifier(db.Model, db.Timestamp):
             return True
 
         try:
-            with db.session.begin_nested():
+            with _savepoint():
                 self.status = status
                 db.session.add(self)
         except SQLAlchemyError:
             logger.exception("Failed to sync status %s.", status, extra=dict(pid=self))
             raise
+        self._changed()
         logger.info("Synced PID status to {0}.".format(status), extra=dict(pid=self))
         return True
 
+    @classmethod
+    def bulk_reserve(
+        cls, pid_type, pid_values=None, statuses=None, created_before=None
+    ):
+        """Reserve many persistent identifiers with set-based UPDATEs.
+
+        Applies the rules of :meth:`reserve`: only new or reserved persistent
+        identifiers can be reserved, the others are rejected.
+
+        :param pid_type: Persistent identifier type.
+        :param pid_values: Persistent identifier values, or ``None`` for all
+            the persistent identifiers of the type. (default: None).
+        :param statuses: Only consider PIDs with one of these statuses.
+            (default: None).
+        :param created_before: Only consider PIDs created before this
+            datetime. (default: None).
+        :returns: A tuple ``(count, rejected)`` with the number of changed
+            persistent identifiers and the list of rejected ones as
+            :class:`invenio_pidstore.models.PIDRecord` instances.
+        """
+        return cls._bulk_transition(
+            cls._bulk_criteria(pid_type, pid_values, statuses, created_before),
+            PIDStatus.RESERVED,
+            allowed=[PIDStatus.NEW, PIDStatus.RESERVED],
+        )
+
+    @classmethod
+    def bulk_register(
+        cls, pid_type, pid_values=None, statuses=None, created_before=None
+    ):
+        """Register many persistent identifiers with set-based UPDATEs.
+
+        Applies the rules of :meth:`register`: registered, deleted and
+        redirected persistent identifiers are rejected. The arguments and
+        return value are the same as for :meth:`bulk_reserve`.
+        """
+        return cls._bulk_transition(
+            cls._bulk_criteria(pid_type, pid_values, statuses, created_before),
+            PIDStatus.REGISTERED,
+            allowed=[PIDStatus.NEW, PIDStatus.RESERVED],
+        )
+
+    @classmethod
+    def bulk_delete(cls, pid_type, pid_values=None, statuses=None, created_before=None):
+        """Delete many persistent identifiers with set-based statements.
+
+        Applies the rules of :meth:`delete`: new persistent identifiers are
+        removed from the database, the others are marked as deleted. None is
+        rejected. The arguments and return value are the same as for
+        :meth:`bulk_reserve`.
+        """
+        criteria = list(
+            cls._bulk_criteria(pid_type, pid_values, statuses, created_before)
+        )
+        removed = [
+            key
+            for c in criteria
+            for key in cls._changed_keys(delete(cls), c + [cls.status == PIDStatus.NEW])
+        ]
+        db.session.info.setdefault(CHANGED_PIDS_KEY, set()).update(removed)
+        count, rejected = cls._bulk_transition(criteria, PIDStatus.DELETED)
+        return count + len(removed), rejected
+
+    @classmethod
+    def bulk_sync_status(
+        cls, pid_type, status, pid_values=None, statuses=None, created_before=None
+    ):
+        """Synchronize the status of many persistent identifiers.
+
+        Like :meth:`sync_status`, any status can be set and none is rejected.
+        The other arguments and return value are the same as for
+        :meth:`bulk_reserve`.
+
+        :param status: The new status to set.
+        """
+        return cls._bulk_transition(
+            cls._bulk_criteria(pid_type, pid_values, statuses, created_before),
+            PIDStatus(status),
+        )
+
+    @classmethod
+    def _bulk_criteria(cls, pid_type, pid_values, statuses, created_before):
+        """Yield the filters of a set-based change, by chunk of values.
+
+        Unclaimed PIDs of the pool (see :data:`POOL_PROVIDER`) are excluded.
+        """
+        criteria = [
+            cls.pid_type == pid_type,
+            or_(cls.pid_provider.is_(None), cls.pid_provider != POOL_PROVIDER),
+        ]
+        if statuses is not None:
+            criteria.append(cls.status.in_([PIDStatus(s) for s in statuses]))
+        if created_before is not None:
+            criteria.append(cls.created < created_before)
+        if pid_values is None:
+            yield criteria
+            return
+        values = [six.text_type(v) for v in pid_values]
+        for i in range(0, len(values), cls._IN_CHUNK_SIZE):
+            yield criteria + [cls.pid_value.in_(values[i : i + cls._IN_CHUNK_SIZE])]
+
+    @classmethod
+    def _bulk_transition(cls, criteria, status, allowed=None):
+        """Set the status of the selected PIDs, rejecting the disallowed ones.
+
+        :param criteria: Iterable of lists of filters, one UPDATE is issued
+            for each.
+        :param status: The new status.
+        :param allowed: Statuses allowed to change to ``status``, or ``None``
+            to allow all of them. (default: None).
+        """
+        now = datetime.now(tz=timezone.utc)
+        changed = set()
+        rejected = []
+        for c in criteria:
+            if allowed is not None:
+                rejected.extend(
+                    PIDRecord._make(row)
+                    for row in db.session.execute(
+                        cls._read_query().where(*c, cls.status.notin_(allowed))
+                    )
+                )
+                c = c + [cls.status.in_(allowed)]
+            changed.update(
+                cls._changed_keys(
+                    update(cls).values(status=status, updated=now),
+                    c + [cls.status != status],
+                )
+            )
+        db.session.info.setdefault(CHANGED_PIDS_KEY, set()).update(changed)
+        logger.info(
+            "Bulk changed status of {0} PIDs to {1} ({2} rejected)".format(
+                len(changed), status, len(rejected)
+            )
+        )
+        return len(changed), rejected
+
+    @classmethod
+    def _changed_keys(cls, stmt, criteria):
+        """Execute an UPDATE or DELETE and return the keys of the changed rows.
+
+        The ``(pid_type, pid_value)`` keys are returned by the statement where
+        ``RETURNING`` is supported. Other databases (MySQL) first select and
+        lock the matching rows.
+
+        :param stmt: The UPDATE or DELETE statement, without criteria.
+        :param criteria: List of filters of the changed rows.
+        """
+        dialect = db.engine.dialect
+        stmt = stmt.where(*criteria)
+        options = dict(synchronize_session="fetch")
+        if dialect.delete_returning if stmt.is_delete else dialect.update_returning:
+            return [
+                tuple(row)
+                for row in db.session.execute(
+                    stmt.returning(cls.pid_type, cls.pid_value),
+                    execution_options=options,
+                )
+            ]
+        keys = [
+            tuple(row)
+            for row in db.session.execute(
+                select(cls.pid_type, cls.pid_value).where(*criteria).with_for_update()
+            )
+        ]
+        db.session.execute(stmt, execution_options=options)
+        return keys
+
+    def _changed(self):
+        """Record this PID as changed in the current transaction.
+
+        Caches of resolved PIDs are invalidated for the recorded PIDs once the
+        transaction is committed.
+        """
+        db.session.info.setdefault(CHANGED_PIDS_KEY, set()).add(
+            (self.pid_type, six.text_type(self.pid_value))
+        )
+
     def is_redirected(self):
         """Return true if the persistent identifier has been registered."""
         return self.status == PIDStatus.REDIRECTED
@@ -551,6 +1841,76 @@ class Redirect(db.Model, db.Timestamp):
     pid = db.relationship(PersistentIdentifier, backref="redirects")
     """Relationship to persistent identifier."""
 
+    @classmethod
+    def get_targets(cls, ids):
+        """Get the targets of many redirections.
+
+        :param ids: Iterable of redirection ids (the ``object_uuid`` of the
+            redirected persistent identifiers).
+        :returns: A dictionary mapping each existing redirection id to the
+            ``(pid_type, pid_value)`` tuple of its target.
+        """
+        ids = list(ids)
+        targets = {}
+        chunk_size = PersistentIdentifier._IN_CHUNK_SIZE
+        for i in range(0, len(ids), chunk_size):
+            targets.update(
+                (r_id, (t, v))
+                for r_id, t, v in db.session.query(
+                    cls.id,
+                    PersistentIdentifier.pid_type,
+                    PersistentIdentifier.pid_value,
+                )
+                .join(PersistentIdentifier, PersistentIdentifier.id == cls.pid_id)
+                .filter(cls.id.in_(ids[i : i + chunk_size]))
+            )
+        return targets
+
+    @classmethod
+    def bulk_import(cls, rows):
+        """Import redirections whose target exists.
+
+        :param rows: Iterable of ``(id, pid_type, pid_value)`` tuples with the
+            id of the redirection (the ``object_uuid`` of the redirected
+            persistent identifier) and the type and value of its target.
+        :returns: The list of rows whose target does not exist, which are not
+            imported.
+        """
+        rows = [
+            (r_id if isinstance(r_id, uuid.UUID) else uuid.UUID(r_id), t, v)
+            for r_id, t, v in rows
+        ]
+        by_type = {}
+        for _, pid_type, pid_value in rows:
+            by_type.setdefault(pid_type, []).append(six.text_type(pid_value))
+        targets = {}
+        chunk_size = PersistentIdentifier._IN_CHUNK_SIZE
+        for pid_type, values in by_type.items():
+            for i in range(0, len(values), chunk_size):
+                targets.update(
+                    ((t, v), pid_id)
+                    for pid_id, t, v in db.session.query(
+                        PersistentIdentifier.id,
+                        PersistentIdentifier.pid_type,
+                        PersistentIdentifier.pid_value,
+                    ).filter(
+                        PersistentIdentifier.pid_type == pid_type,
+                        PersistentIdentifier.pid_value.in_(values[i : i + chunk_size]),
+                    )
+                )
+
+        values = []
+        missing = []
+        for r_id, pid_type, pid_value in rows:
+            pid_id = targets.get((pid_type, six.text_type(pid_value)))
+            if pid_id is None:
+                missing.append((str(r_id), pid_type, pid_value))
+            else:
+                values.append(dict(id=r_id, pid_id=pid_id))
+        if values:
+            db.session.execute(cls.__table__.insert(), values)
+        return missing
+
 
 class RecordIdentifier(db.Model):
     """Sequence generator for integer record identifiers.
@@ -582,14 +1942,75 @@ class RecordIdentifier(db.Model):
             with db.session.begin_nested():
                 # Someone has likely modified the table without using the
                 # models API. Let's fix the problem.
-                cls._set_sequence(cls.max())
+                cls._set_sequence(cls._max_recid())
                 obj = cls()
                 db.session.add(obj)
         return obj.recid
 
+    @classmethod
+    def next_block(cls, size):
+        """Reserve a block of record identifiers in a single round trip.
+
+        On PostgreSQL the identifiers are drawn from the sequence and only the
+        highest one is inserted in the table. On other databases a single row
+        claiming the highest identifier of the range is inserted. Identifiers
+        are unique, but on PostgreSQL they may not be contiguous when other
+        transactions use the sequence concurrently.
+
+        :param size: Number of record identifiers to reserve.
+        :returns: The list of reserved record identifiers in increasing order.
+        """
+        if db.engine.dialect.name == "postgresql":  # pragma: no cover
+            return [
+                row[0]
+                for row in db.session.execute(
+                    text(
+                        "WITH ids AS ("
+                        "SELECT nextval(pg_get_serial_sequence('{0}', 'recid'))"
+                        " AS recid FROM generate_series(1, :size)), "
+                        "claim AS (INSERT INTO {0} (recid) SELECT max(recid) "
+                        "FROM ids) "
+                        "SELECT recid FROM ids ORDER BY recid".format(cls.__tablename__)
+                    ),
+                    dict(size=size),
+                )
+            ]
+
+        while True:
+            try:
+                with db.session.begin_nested():
+                    high = cls._max_recid() + size
+                    db.session.add(cls(recid=high))
+                return list(range(high - size + 1, high + 1))
+            except IntegrityError:  # pragma: no cover
+                # Another transaction claimed the same range, try again.
+                continue
+
     @classmethod
     def max(cls):
-        """Get max record identifier."""
+        """Get max record identifier.
+
+        On PostgreSQL this is the state of the sequence, or the highest row if
+        it was inserted without using the sequence. Neither requires scanning
+        the table, which can thus be compacted with :meth:`compact`.
+        """
+        if db.engine.dialect.name == "postgresql":  # pragma: no cover
+            max_recid = db.session.execute(
+                text(
+                    "SELECT greatest("
+                    "pg_sequence_last_value(pg_get_serial_sequence("
+                    "'{0}', 'recid')::regclass), "
+                    "(SELECT recid FROM {0} ORDER BY recid DESC LIMIT 1))".format(
+                        cls.__tablename__
+                    )
+                )
+            ).scalar()
+            return max_recid if max_recid else 0
+        return cls._max_recid()
+
+    @classmethod
+    def _max_recid(cls):
+        """Get the highest record identifier stored in the table."""
         max_recid = db.session.query(func.max(cls.recid)).scalar()
         return max_recid if max_recid else 0
 
@@ -603,11 +2024,47 @@ class RecordIdentifier(db.Model):
         """
         if db.engine.dialect.name == "postgresql":  # pragma: no cover
             db.session.execute(
-                "SELECT setval(pg_get_serial_sequence("
-                "'{0}', 'recid'), :newval)".format(cls.__tablename__),
+                text(
+                    "SELECT setval(pg_get_serial_sequence("
+                    "'{0}', 'recid'), :newval)".format(cls.__tablename__)
+                ),
                 dict(newval=val),
             )
 
+    @classmethod
+    def compact(cls, batch_size=1000):
+        """Remove the rows below the highest record identifier.
+
+        Only the highest record identifier is needed to continue the sequence,
+        so the other rows can be removed. Rows are deleted in batches of
+        ``batch_size`` to keep transactions short. This is a generator, and
+        callers are expected to commit between the batches, e.g.:
+
+        .. code-block:: python
+
+            for deleted in RecordIdentifier.compact():
+                db.session.commit()
+
+        :param batch_size: Number of rows deleted per batch.
+            (Default: ``1000``).
+        :returns: A generator yielding the number of rows deleted per batch.
+        """
+        high = cls._max_recid()
+        while True:
+            recids = [
+                recid
+                for recid, in db.session.query(cls.recid)
+                .filter(cls.recid < high)
+                .order_by(cls.recid)
+                .limit(batch_size)
+            ]
+            if not recids:
+                return
+            db.session.query(cls).filter(cls.recid.in_(recids)).delete(
+                synchronize_session=False
+            )
+            yield len(recids)
+
     @classmethod
     def insert(cls, val):
         """Insert a record identifier.
@@ -617,11 +2074,13 @@ class RecordIdentifier(db.Model):
         with db.session.begin_nested():
             obj = cls(recid=val)
             db.session.add(obj)
-            cls._set_sequence(cls.max())
+            cls._set_sequence(max(cls.max(), val))
 
 
 __all__ = (
+    "batch",
     "PersistentIdentifier",
+    "PIDRecord",
     "PIDStatus",
     "RecordIdentifier",
     "Redirect",
@@ -5,9 +5,122 @@
 
 from __future__ import absolute_import, print_function
 
-from ..models import PIDStatus, RecordIdentifier
+import threading
+from collections import deque
+
+from flask import current_app, has_app_context
+from invenio_db import db
+
+from ..models import PersistentIdentifier, PIDStatus, RecordIdentifier
 from .base import BaseProvider
 
+RESERVED_BLOCKS_KEY = "invenio_pidstore.reserved_recid_blocks"
+"""Session info key of the blocks reserved in the current transaction."""
+
+
+class RecordIdBlockAllocator(object):
+    """Hand out record identifiers from blocks reserved in advance.
+
+    Instead of inserting a row in the ``pidstore_recid`` table for each
+    record identifier, a block of ``block_size`` identifiers is reserved in a
+    single round trip with
+    :meth:`invenio_pidstore.models.RecordIdentifier.next_block` and handed
+    out from memory.
+
+    A block is only handed out within the session which reserved it until its
+    transaction commits; other sessions reserve their own block meanwhile.
+    Once committed, the rest of the block is shared by the whole process. If
+    the reserving transaction is rolled back, the rest of the block is
+    discarded.
+
+    This trades strict ordering for throughput: identifiers minted by
+    different sessions interleave, and the identifiers left in a block are
+    never used (gaps) when the process exits.
+    """
+
+    def __init__(self, block_size):
+        """Initialize the allocator.
+
+        :param block_size: Number of identifiers reserved per round trip.
+        """
+        self.block_size = block_size
+        self._ids = deque()
+        self._lock = threading.Lock()
+
+    def next(self):
+        """Return the next record identifier."""
+        pending = db.session.info.get(RESERVED_BLOCKS_KEY, {}).get(self)
+        if pending:
+            return pending.popleft()
+        with self._lock:
+            if self._ids:
+                return self._ids.popleft()
+        pending = deque(RecordIdentifier.next_block(self.block_size))
+        db.session.info.setdefault(RESERVED_BLOCKS_KEY, {})[self] = pending
+        return pending.popleft()
+
+    def release(self, ids):
+        """Share the rest of a block whose reservation was committed.
+
+        :param ids: Identifiers left in the block.
+        """
+        with self._lock:
+            self._ids.extend(ids)
+
+
+def release_blocks_after_commit(session):
+    """Share the blocks reserved in a committed transaction.
+
+    Registered as a SQLAlchemy ``after_commit`` session event listener, which
+    also fires when a savepoint is released.
+    """
+    if not session.in_nested_transaction():
+        for allocator, ids in session.info.pop(RESERVED_BLOCKS_KEY, {}).items():
+            allocator.release(ids)
+
+
+def discard_blocks_after_rollback(session, previous_transaction):
+    """Discard the blocks reserved in a transaction which was rolled back.
+
+    Registered as a SQLAlchemy ``after_soft_rollback`` session event listener.
+    """
+    if not session.in_transaction():
+        session.info.pop(RESERVED_BLOCKS_KEY, None)
+
+
+def next_recid():
+    """Return the next legacy record identifier.
+
+    Uses the block allocator of the current application if
+    ``PIDSTORE_RECID_BLOCK_SIZE`` is set, otherwise
+    :meth:`invenio_pidstore.models.RecordIdentifier.next`.
+    """
+    allocator = _current_allocator()
+    if allocator is not None:
+        return allocator.next()
+    return RecordIdentifier.next()
+
+
+def next_recids(n):
+    """Return the next ``n`` legacy record identifiers.
+
+    Uses the block allocator of the current application if
+    ``PIDSTORE_RECID_BLOCK_SIZE`` is set, otherwise
+    :meth:`invenio_pidstore.models.RecordIdentifier.next_block`.
+    """
+    allocator = _current_allocator()
+    if allocator is not None:
+        return [allocator.next() for _ in range(n)]
+    return RecordIdentifier.next_block(n) if n > 0 else []
+
+
+def _current_allocator():
+    """Return the block allocator of the current application, if any."""
+    state = (
+        current_app.extensions.get("invenio-pidstore") if has_app_context() else None
+    )
+    return state.recid_allocator if state is not None else None
+
 
 class RecordIdProvider(BaseProvider):
     """Record identifier provider."""
@@ -42,10 +155,50 @@ class RecordIdProvider(BaseProvider):
         """
         # Request next integer in recid sequence.
         assert "pid_value" not in kwargs
-        kwargs["pid_value"] = str(RecordIdentifier.next())
+        kwargs["pid_value"] = str(next_recid())
         kwargs.setdefault("status", cls.default_status)
         if object_type and object_uuid:
             kwargs["status"] = PIDStatus.REGISTERED
         return super(RecordIdProvider, cls).create(
             object_type=object_type, object_uuid=object_uuid, **kwargs
         )
+
+    @classmethod
+    def create_many(cls, objects, **kwargs):
+        """Create many new record identifiers.
+
+        The record identifiers are reserved together and the persistent
+        identifiers are inserted with
+        :meth:`invenio_pidstore.models.PersistentIdentifier.bulk_create`.
+
+        :param objects: Iterable of ``(object_type, object_uuid)`` tuples, or
+            ``None`` for record identifiers without an object.
+        :param kwargs: Extra parameters passed to the provider instances.
+            ``status`` overrides the default status.
+        :raises invenio_pidstore.errors.PIDAlreadyExists: If one of the
+            record identifiers already exists, in which case none is created.
+        :returns: A list of :class:`RecordIdProvider` instances, in the order
+            of ``objects``.
+        """
+        objects = [obj or (None, None) for obj in objects]
+        status = kwargs.pop("status", None) or cls.default_status
+        rows = [
+            (
+                cls.pid_type,
+                str(recid),
+                cls.pid_provider,
+                PIDStatus.REGISTERED if object_type and object_uuid else status,
+                object_type,
+                object_uuid,
+            )
+            for recid, (object_type, object_uuid) in zip(
+                next_recids(len(objects)), objects
+            )
+        ]
+        # Roll back the rows inserted before one of the conflicts is raised.
+        with db.session.begin_nested():
+            created, conflicts = PersistentIdentifier.bulk_create(rows)
+            if conflicts:
+                raise conflicts[0]
+        pids = PersistentIdentifier.get_many(cls.pid_type, [row[1] for row in rows])
+        return [cls(pid, **kwargs) for pid in pids.values()]
@@ -6,14 +6,114 @@
 
 from __future__ import absolute_import
 
-import copy
+import base64
+import os
+import threading
+from collections import Counter, namedtuple
 
 from base32_lib import base32
 from flask import current_app
+from invenio_db import db
 
-from ..models import PIDStatus
+from ..errors import PIDAlreadyExists
+from ..models import (
+    CHANGED_PIDS_KEY,
+    POOL_PROVIDER,
+    PersistentIdentifier,
+    PIDStatus,
+    logger,
+)
 from .base import BaseProvider
 
+_B32_TO_INT = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567", "0123456789abcdefghijklmnopqrstuv"
+)
+"""Translate RFC 4648 base32 digits to the digits of ``int(x, 32)``."""
+
+_INT_TO_CROCKFORD = str.maketrans(
+    "0123456789abcdefghijklmnopqrstuv", base32.ENCODING_CHARS
+)
+"""Translate the digits of ``int(x, 32)`` to Crockford base32 digits."""
+
+
+class RecordIdGenerator(namedtuple("RecordIdGenerator", "length split_every checksum")):
+    """Immutable generator of random record identifiers.
+
+    The generator holds resolved ``PIDSTORE_RECORDID_OPTIONS``, so that
+    minting does not copy and merge the configuration for each identifier.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_options(cls, options):
+        """Create a generator from a dictionary of options.
+
+        :param options: ``dict`` with optional keys ``"length"`` (integer),
+            ``"split_every"`` (integer) and ``"checksum"`` (boolean).
+        :returns: A :class:`RecordIdGenerator` instance.
+        """
+        return cls(
+            length=options.get("length", 10),
+            split_every=options.get("split_every", 0),
+            checksum=options.get("checksum", True),
+        )
+
+    def replace(self, options):
+        """Create a generator overriding some of the options.
+
+        :param options: ``dict`` of options, as in :meth:`from_options`.
+            Unknown keys are ignored.
+        :returns: A :class:`RecordIdGenerator` instance.
+        """
+        return self._replace(**{k: v for k, v in options.items() if k in self._fields})
+
+    def generate(self):
+        """Generate a record identifier."""
+        return base32.generate(
+            length=self.length, split_every=self.split_every, checksum=self.checksum
+        )
+
+    def generate_ids(self, n):
+        """Generate many record identifiers at once.
+
+        The random digits of all identifiers are drawn from a single
+        :func:`os.urandom` buffer and encoded together.
+
+        :param n: Number of identifiers.
+        :returns: A list of identifiers, formatted as by :meth:`generate`.
+        """
+        if self.checksum and self.length < 3:
+            raise ValueError("Invalid 'length'. Must be >= 3 if checksum enabled.")
+        if self.split_every < 0:
+            raise ValueError("Invalid 'split_every'. Must be >= 0.")
+        if n <= 0:
+            return []
+        digits = self.length - 2 if self.checksum else self.length
+        # Each group of 5 random bytes is encoded as 8 base32 digits.
+        nbytes = -(-n * digits // 8) * 5
+        encoded = base64.b32encode(os.urandom(nbytes)).decode("ascii")
+        encoded = encoded.translate(_B32_TO_INT)
+        ids = [encoded[i : i + digits] for i in range(0, n * digits, digits)]
+        if self.checksum:
+            ids = [
+                "{0}{1:02d}".format(v, 97 - ((100 * int(v, 32)) % 97) + 1) for v in ids
+            ]
+        ids = "|".join(ids).translate(_INT_TO_CROCKFORD).split("|")
+        step = self.split_every
+        if step > 0:
+            ids = [
+                "-".join(v[i : i + step] for i in range(0, self.length, step))
+                for v in ids
+            ]
+        return ids
+
+
+_stats = Counter()
+"""Number of record ids ``generated`` in bulk and of ``collisions``."""
+
+_stats_lock = threading.Lock()
+
 
 class RecordIdProviderV2(BaseProvider):
     """Record identifier provider V2.
@@ -46,20 +146,49 @@ class RecordIdProviderV2(BaseProvider):
     Default: :attr:`invenio_pidstore.models.PIDStatus.RESERVED`
     """
 
+    max_retries = 5
+    """Maximum number of times colliding record ids are regenerated."""
+
+    pool_provider = POOL_PROVIDER
+    """Provider name of the pre-generated record ids in the pool.
+
+    The set-based transitions of
+    :class:`invenio_pidstore.models.PersistentIdentifier` only skip the
+    pooled record ids with the default ``"pool"`` name.
+    """
+
+    @classmethod
+    def generator(cls, options=None):
+        """Get the record identifier generator.
+
+        :param options: ``dict`` overriding ``PIDSTORE_RECORDID_OPTIONS``.
+            (Default: None).
+        :returns: A :class:`RecordIdGenerator` instance.
+        """
+        state = current_app.extensions.get("invenio-pidstore")
+        if state is not None:
+            generator = state.recid_generator
+        else:
+            generator = RecordIdGenerator.from_options(
+                current_app.config.get("PIDSTORE_RECORDID_OPTIONS", {})
+            )
+        return generator.replace(options) if options else generator
+
     @classmethod
     def generate_id(cls, options=None):
         """Generate record id."""
-        passed_options = options or {}
-        # WHY: A new dict needs to be created to prevent side-effects
-        options = copy.deepcopy(current_app.config.get("PIDSTORE_RECORDID_OPTIONS", {}))
-        options.update(passed_options)
-        length = options.get("length", 10)
-        split_every = options.get("split_every", 0)
-        checksum = options.get("checksum", True)
+        return cls.generator(options).generate()
 
-        return base32.generate(
-            length=length, split_every=split_every, checksum=checksum
-        )
+    @classmethod
+    def generate_ids(cls, n, options=None):
+        """Generate many record ids.
+
+        :param n: Number of record ids.
+        :param options: ``dict`` overriding ``PIDSTORE_RECORDID_OPTIONS``.
+            (Default: None).
+        :returns: A list of record ids.
+        """
+        return cls.generator(options).generate_ids(n)
 
     @classmethod
     def create(cls, object_type=None, object_uuid=None, options=None, **kwargs):
@@ -84,12 +213,179 @@ class RecordIdProviderV2(BaseProvider):
         """
         assert "pid_value" not in kwargs
 
-        kwargs["pid_value"] = cls.generate_id(options)
         kwargs.setdefault("status", cls.default_status)
 
         if object_type and object_uuid:
             kwargs["status"] = cls.default_status_with_obj
 
+        if not options and current_app.config.get("PIDSTORE_RECID_POOL_SIZE"):
+            pid = PersistentIdentifier.claim(
+                cls.pid_type,
+                cls.pool_provider,
+                pid_provider=cls.pid_provider,
+                status=kwargs["status"],
+                object_type=object_type,
+                object_uuid=object_uuid,
+            )
+            if pid is not None:
+                kwargs.pop("status")
+                return cls(pid, **kwargs)
+
+        kwargs["pid_value"] = cls.generate_id(options)
         return super(RecordIdProviderV2, cls).create(
             object_type=object_type, object_uuid=object_uuid, **kwargs
         )
+
+    @classmethod
+    def create_many(cls, objects, options=None, max_retries=None, **kwargs):
+        """Create many new record identifiers.
+
+        Candidate ids are generated in bulk and checked for collisions with a
+        single query. Only the colliding ones are regenerated, the others are
+        inserted in a single statement.
+
+        :param objects: Iterable of ``(object_type, object_uuid)`` tuples, or
+            ``None`` for record identifiers without an object.
+        :param options: ``dict`` overriding ``PIDSTORE_RECORDID_OPTIONS``.
+            (Default: None).
+        :param max_retries: Maximum number of times colliding ids are
+            regenerated. (Default: :attr:`max_retries`).
+        :param kwargs: Extra parameters passed to the provider instances.
+            ``status`` overrides the default status.
+        :raises invenio_pidstore.errors.PIDAlreadyExists: If ids still
+            collide after ``max_retries`` attempts, in which case none is
+            created.
+        :returns: A list of :class:`RecordIdProviderV2` instances, in the
+            order of ``objects``.
+        """
+        if max_retries is None:
+            max_retries = cls.max_retries
+        status = kwargs.pop("status", None)
+        rows = []
+        for obj in objects:
+            object_type, object_uuid = obj or (None, None)
+            row_status = status or cls.default_status
+            if object_type and object_uuid:
+                row_status = cls.default_status_with_obj
+            rows.append(
+                PersistentIdentifier._bulk_row(
+                    cls.pid_type,
+                    "",
+                    pid_provider=cls.pid_provider,
+                    status=row_status,
+                    object_type=object_type,
+                    object_uuid=object_uuid,
+                )
+            )
+
+        cls._insert_generated(rows, cls.generator(options), max_retries)
+        pids = PersistentIdentifier.get_many(
+            cls.pid_type, [r["pid_value"] for r in rows]
+        )
+        return [cls(pid, **kwargs) for pid in pids.values()]
+
+    @classmethod
+    def _insert_generated(cls, rows, generator, max_retries):
+        """Insert rows with generated record ids, regenerating collisions.
+
+        :param rows: List of column values, as returned by
+            :meth:`invenio_pidstore.models.PersistentIdentifier._bulk_row`.
+            Their ``pid_value`` is set to the inserted record id.
+        :param generator: A :class:`RecordIdGenerator` instance.
+        :param max_retries: Maximum number of times colliding ids are
+            regenerated.
+        :raises invenio_pidstore.errors.PIDAlreadyExists: If ids still
+            collide after ``max_retries`` attempts. The rows inserted by the
+            previous attempts are rolled back.
+        """
+        with db.session.begin_nested():
+            pending = rows
+            attempt = 0
+            while pending:
+                values = generator.generate_ids(len(pending))
+                keys = [(cls.pid_type, v) for v in values]
+                existing = PersistentIdentifier._existing_keys(keys)
+                insert = []
+                retry = []
+                seen = set()
+                for row, key in zip(pending, keys):
+                    if key in existing or key in seen:
+                        retry.append(row)
+                        continue
+                    seen.add(key)
+                    row["pid_value"] = key[1]
+                    insert.append(row)
+                conflicts = []
+                if insert:
+                    created = PersistentIdentifier._insert_rows(insert, conflicts)
+                    db.session.info.setdefault(CHANGED_PIDS_KEY, set()).update(created)
+                if conflicts:
+                    conflicting = set((e.pid_type, e.pid_value) for e in conflicts)
+                    retry.extend(
+                        r
+                        for r in insert
+                        if (r["pid_type"], r["pid_value"]) in conflicting
+                    )
+                with _stats_lock:
+                    _stats.update(generated=len(values), collisions=len(retry))
+                if retry:
+                    logger.warning(
+                        "{0} of {1} generated record ids collided".format(
+                            len(retry), len(pending)
+                        )
+                    )
+                    if attempt >= max_retries:
+                        raise PIDAlreadyExists(cls.pid_type, retry[0]["pid_value"])
+                pending = retry
+                attempt += 1
+
+    @classmethod
+    def fill_pool(cls, size=None):
+        """Fill the pool of pre-generated record ids.
+
+        Pooled record ids are reserved, have no object and are created with
+        the :attr:`pool_provider` provider. :meth:`create` claims them
+        instead of generating new ones when ``PIDSTORE_RECID_POOL_SIZE`` is
+        set.
+
+        :param size: Number of record ids in the filled pool.
+            (Default: ``PIDSTORE_RECID_POOL_SIZE``)
+        :returns: The number of record ids added to the pool.
+        """
+        if size is None:
+            size = current_app.config.get("PIDSTORE_RECID_POOL_SIZE") or 0
+        count = (
+            db.session.query(PersistentIdentifier)
+            .filter_by(
+                pid_type=cls.pid_type,
+                pid_provider=cls.pool_provider,
+                status=PIDStatus.RESERVED,
+            )
+            .count()
+        )
+        rows = [
+            PersistentIdentifier._bulk_row(
+                cls.pid_type,
+                "",
+                pid_provider=cls.pool_provider,
+                status=PIDStatus.RESERVED,
+            )
+            for _ in range(size - count)
+        ]
+        cls._insert_generated(rows, cls.generator(), cls.max_retries)
+        return len(rows)
+
+    @classmethod
+    def stats(cls):
+        """Statistics of the record ids generated in bulk by this process.
+
+        :returns: A dictionary with the number of ``generated`` ids, the
+            number of ``collisions`` and the ``collision_rate``.
+        """
+        with _stats_lock:
+            generated, collisions = _stats["generated"], _stats["collisions"]
+        return dict(
+            generated=generated,
+            collisions=collisions,
+            collision_rate=float(collisions) / generated if generated else 0.0,
+        )
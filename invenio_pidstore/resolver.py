@@ -5,15 +5,23 @@
 
 from __future__ import absolute_import, print_function
 
+import six
+from flask import current_app
+from invenio_db import db
+from sqlalchemy import and_
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm.exc import NoResultFound
 
+from .cache import get_pid
 from .errors import (
     PIDDeletedError,
+    PIDDoesNotExistError,
     PIDMissingObjectError,
     PIDRedirectedError,
+    PIDRedirectLoopError,
     PIDUnregistered,
 )
-from .models import PersistentIdentifier
+from .models import PersistentIdentifier, PIDStatus, Redirect
 
 
 class Resolver(object):
@@ -24,7 +32,15 @@ class Resolver(object):
     """
 
     def __init__(
-        self, pid_type=None, object_type=None, getter=None, registered_only=True
+        self,
+        pid_type=None,
+        object_type=None,
+        getter=None,
+        registered_only=True,
+        getter_many=None,
+        follow_redirects=False,
+        max_redirects=None,
+        read_only=False,
     ):
         """Initialize resolver.
 
@@ -32,19 +48,48 @@ class Resolver(object):
         :param object_type: Object type.
         :param getter: Callable that will take an object id for the given
             object type and retrieve the internal object.
+        :param getter_many: Callable that will take a list of object ids for
+            the given object type and return a dictionary mapping each id to
+            its internal object. Used by :meth:`resolve_many`. (Default: None,
+            ``getter`` is called for each object id).
+        :param follow_redirects: Follow chains of redirected PIDs in the
+            database, so that :exc:`invenio_pidstore.errors.PIDRedirectedError`
+            points to the final PID. (Default: False)
+        :param max_redirects: Maximum number of redirections to follow.
+            (Default: ``PIDSTORE_RESOLVER_MAX_REDIRECTS``)
+        :param read_only: Resolve to lightweight
+            :class:`invenio_pidstore.models.PIDRecord` instances read without
+            the ORM, instead of
+            :class:`invenio_pidstore.models.PersistentIdentifier` instances.
+            The resolver cache is not used. (Default: False)
         """
         self.pid_type = pid_type
         self.object_type = object_type
         self.object_getter = getter
+        self.object_getter_many = getter_many
         self.registered_only = registered_only
+        self.follow_redirects = follow_redirects
+        self.max_redirects = max_redirects
+        self.read_only = read_only
 
     def resolve(self, pid_value):
         """Resolve a persistent identifier to an internal object.
 
+        If ``PIDSTORE_RESOLVER_CACHE`` is enabled, the returned persistent
+        identifier may be built from the cache, in which case the attributes
+        which are not cached (e.g. ``created``) are loaded on first access.
+
         :param pid_value: Persistent identifier.
         :returns: A tuple containing (pid, object).
         """
-        pid = PersistentIdentifier.get(self.pid_type, pid_value)
+        if self.follow_redirects:
+            pid, redirect, hops = self._get_pid_following_redirects(pid_value)
+        elif self.read_only:
+            pid, redirect = PersistentIdentifier.read(self.pid_type, pid_value), None
+            hops = None
+        else:
+            pid, redirect = get_pid(self.pid_type, pid_value)
+            hops = None
 
         if pid.is_new() or pid.is_reserved():
             if self.registered_only:
@@ -61,10 +106,150 @@ class Resolver(object):
             raise PIDDeletedError(pid, obj)
 
         if pid.is_redirected():
-            raise PIDRedirectedError(pid, pid.get_redirect())
+            raise PIDRedirectedError(pid, redirect or pid.get_redirect(), hops=hops)
 
         obj_id = pid.get_assigned_object(object_type=self.object_type)
         if not obj_id:
             raise PIDMissingObjectError(self.pid_type, pid_value)
 
         return pid, self.object_getter(obj_id)
+
+    def resolve_redirects(self, pid_value):
+        """Follow the redirections of a persistent identifier.
+
+        The whole chain is loaded with a single recursive query.
+
+        :param pid_value: Persistent identifier.
+        :raises invenio_pidstore.errors.PIDDoesNotExistError: If the PID does
+            not exist.
+        :raises invenio_pidstore.errors.PIDRedirectLoopError: If the
+            redirections form a loop or exceed the maximum number of
+            redirections.
+        :returns: A tuple containing (final pid, hops), where hops is the list
+            of redirected PIDs from the requested one to the final one
+            (excluded).
+        """
+        pid, final, hops = self._get_pid_following_redirects(pid_value)
+        return final or pid, hops
+
+    def _get_pid_following_redirects(self, pid_value):
+        """Get a persistent identifier and its final redirection target.
+
+        :returns: A tuple containing (pid, final pid, hops). The final pid is
+            ``None`` if the PID is not redirected.
+        """
+        max_redirects = self.max_redirects
+        if max_redirects is None:
+            max_redirects = current_app.config["PIDSTORE_RESOLVER_MAX_REDIRECTS"]
+        chain = PersistentIdentifier.get_redirect_chain(
+            self.pid_type, pid_value, max_depth=max_redirects
+        )
+        if not chain:
+            raise PIDDoesNotExistError(self.pid_type, pid_value)
+
+        seen = set()
+        for i, pid in enumerate(chain):
+            if pid.id in seen:
+                raise PIDRedirectLoopError(chain[0], chain[:i])
+            seen.add(pid.id)
+        if chain[-1].is_redirected():
+            raise PIDRedirectLoopError(chain[0], chain)
+        if len(chain) == 1:
+            return chain[0], None, []
+        return chain[0], chain[-1], chain[:-1]
+
+    def resolve_many(self, pid_values):
+        """Resolve many persistent identifiers to their internal objects.
+
+        The persistent identifiers and their redirection targets are loaded
+        with one joined query, and the objects are retrieved with a single
+        call to ``getter_many`` (if provided).
+
+        Errors are not raised but returned in place of the result, so that
+        one unresolvable value does not prevent resolving the others.
+
+        :param pid_values: Iterable of persistent identifier values.
+        :returns: A dictionary mapping each value to either a tuple
+            containing (pid, object) or the
+            :exc:`invenio_pidstore.errors.PersistentIdentifierError` that
+            :meth:`resolve` would have raised for it. Objects not returned by
+            ``getter_many`` are ``None``.
+        """
+        rows = self._get_pids_with_redirects(pid_values)
+
+        obj_ids = []
+        for pid, dest in rows.values():
+            if pid is None or pid.is_redirected():
+                continue
+            if self.registered_only and (pid.is_new() or pid.is_reserved()):
+                continue
+            obj_id = pid.get_assigned_object(object_type=self.object_type)
+            if obj_id:
+                obj_ids.append(obj_id)
+        objects = self._get_objects(list(dict.fromkeys(obj_ids)))
+
+        result = {}
+        for value, (pid, dest) in rows.items():
+            if pid is None:
+                result[value] = PIDDoesNotExistError(self.pid_type, value)
+                continue
+            if (pid.is_new() or pid.is_reserved()) and self.registered_only:
+                result[value] = PIDUnregistered(pid)
+                continue
+            obj_id = pid.get_assigned_object(object_type=self.object_type)
+            if pid.is_deleted():
+                result[value] = PIDDeletedError(pid, objects.get(obj_id))
+            elif pid.is_redirected():
+                result[value] = PIDRedirectedError(pid, dest)
+            elif not obj_id:
+                result[value] = PIDMissingObjectError(self.pid_type, value)
+            else:
+                result[value] = (pid, objects.get(obj_id))
+        return result
+
+    def _get_pids_with_redirects(self, pid_values):
+        """Load persistent identifiers and their redirection targets.
+
+        :returns: A dictionary mapping each value to a tuple containing
+            (pid, redirection target), with ``None`` for missing entries.
+        """
+        result = dict.fromkeys(six.text_type(v) for v in pid_values)
+        values = list(result)
+        chunk_size = PersistentIdentifier._IN_CHUNK_SIZE
+        target = aliased(PersistentIdentifier)
+        for i in range(0, len(values), chunk_size):
+            query = (
+                db.session.query(PersistentIdentifier, target)
+                .outerjoin(
+                    Redirect,
+                    and_(
+                        PersistentIdentifier.status == PIDStatus.REDIRECTED,
+                        Redirect.id == PersistentIdentifier.object_uuid,
+                    ),
+                )
+                .outerjoin(target, target.id == Redirect.pid_id)
+                .filter(
+                    PersistentIdentifier.pid_type == self.pid_type,
+                    PersistentIdentifier.pid_value.in_(values[i : i + chunk_size]),
+                )
+            )
+            for pid, dest in query:
+                result[pid.pid_value] = (pid, dest)
+        return {k: v or (None, None) for k, v in result.items()}
+
+    def _get_objects(self, obj_ids):
+        """Retrieve the internal objects for a list of object ids.
+
+        :returns: A dictionary mapping object ids to internal objects.
+        """
+        if not obj_ids:
+            return {}
+        if self.object_getter_many:
+            return self.object_getter_many(obj_ids)
+        objects = {}
+        for obj_id in obj_ids:
+            try:
+                objects[obj_id] = self.object_getter(obj_id)
+            except NoResultFound:
+                pass
+        return objects
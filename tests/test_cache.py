@@ -0,0 +1,382 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Cache tests."""
+
+from __future__ import absolute_import, print_function
+
+import fnmatch
+import uuid
+
+import pytest
+import redis
+from mock import patch
+
+from invenio_pidstore.cache import (
+    NullCache,
+    RedisCache,
+    RedisNegativeCache,
+    ResolverCache,
+    cache_for,
+    dump_pid,
+    load_pid,
+    redis_cache_factory,
+)
+from invenio_pidstore.errors import PIDDoesNotExistError, PIDMissingObjectError
+from invenio_pidstore.models import CHANGED_PIDS_KEY, PersistentIdentifier, PIDStatus
+from invenio_pidstore.resolver import Resolver
+
+
+class FakeRedis(object):
+    """Minimal in-memory stand-in for a Redis client."""
+
+    def __init__(self):
+        """Initialize the store."""
+        self.data = {}
+
+    def get(self, name):
+        """Get a value."""
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None, nx=False):
+        """Set a value."""
+        if not (nx and name in self.data):
+            self.data[name] = value.encode("utf-8")
+
+    def pipeline(self, transaction=True):
+        """Return a pipeline executing the commands immediately."""
+        return self
+
+    def execute(self):
+        """Execute the pipeline."""
+        return []
+
+    def delete(self, *names):
+        """Delete values."""
+        for name in names:
+            self.data.pop(name, None)
+
+    def scan_iter(self, match):
+        """Iterate over the matching keys."""
+        return [k for k in list(self.data) if fnmatch.fnmatch(k, match)]
+
+
+def test_resolver_cache_lru_ttl():
+    """Test eviction and expiration of cache entries."""
+    now = [0]
+    cache = ResolverCache(max_entries=2, ttl=10, timer=lambda: now[0])
+
+    assert cache.get(("recid", "1")) is None
+    cache.set(("recid", "1"), "a")
+    cache.set(("recid", "2"), "b")
+    assert cache.get(("recid", "1")) == "a"
+    # Least recently used entry is evicted
+    cache.set(("recid", "3"), "c")
+    assert len(cache) == 2
+    assert cache.get(("recid", "2")) is None
+    assert cache.get(("recid", "3")) == "c"
+    assert cache.stats == dict(hits=2, misses=2, size=2)
+
+    # Entries expire
+    now[0] = 10
+    assert cache.get(("recid", "1")) is None
+    assert len(cache) == 1
+
+    cache.invalidate([("recid", "3"), ("recid", "4")])
+    assert len(cache) == 0
+    cache.set(("recid", "3"), "c")
+    cache.clear()
+    assert cache.stats == dict(hits=0, misses=0, size=0)
+
+
+def test_dump_load_pid(app, db):
+    """Test conversion of PIDs to cache entries."""
+    with app.app_context():
+        rec_uuid = uuid.uuid4()
+        pid = PersistentIdentifier.create(
+            "recid",
+            "1",
+            pid_provider="prov",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=rec_uuid,
+        )
+        dest = PersistentIdentifier.create("recid", "2", status=PIDStatus.REGISTERED)
+        db.session.commit()
+
+        entry = dump_pid(pid)
+        assert entry.status == "R"
+        assert entry.redirect is None
+        loaded, redirect = load_pid("recid", "1", entry)
+        assert redirect is None
+        assert loaded.id == pid.id
+        assert loaded.pid_provider == "prov"
+        assert loaded.is_registered()
+        assert loaded.get_assigned_object("rec") == rec_uuid
+
+        loaded, redirect = load_pid("recid", "1", dump_pid(pid, dest))
+        assert (redirect.pid_type, redirect.pid_value) == ("recid", "2")
+
+
+def test_cache_hit_loads_attributes(app, db):
+    """Test that PIDs resolved from the cache load the other attributes."""
+    app.config["PIDSTORE_RESOLVER_CACHE"] = dict(max_entries=10, ttl=60)
+    with app.app_context():
+        pid = PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=uuid.uuid4(),
+        )
+        db.session.commit()
+        created, updated = pid.created, pid.updated
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+        resolver.resolve("1")
+        db.session.close()
+
+        cache = app.extensions["invenio-pidstore"].resolver_cache
+        loaded, obj = resolver.resolve("1")
+        assert cache.stats["hits"] == 1
+        assert obj == pid.object_uuid
+        assert loaded.created == created
+        assert loaded.updated == updated
+        assert loaded.redirects == []
+
+
+def test_savepoint_keeps_changes(app, db):
+    """Test that releasing a savepoint does not invalidate the cache yet."""
+    app.config["PIDSTORE_RESOLVER_CACHE"] = dict(max_entries=10, ttl=60)
+    with app.app_context():
+        pid1 = PersistentIdentifier.create("recid", "1", status=PIDStatus.REGISTERED)
+        pid2 = PersistentIdentifier.create("recid", "2", status=PIDStatus.RESERVED)
+        db.session.commit()
+        cache = app.extensions["invenio-pidstore"].resolver_cache
+        cache.set(("recid", "1"), dump_pid(pid1))
+
+        pid1.delete()
+        pid2.register()
+        assert db.session.info[CHANGED_PIDS_KEY] == {("recid", "1"), ("recid", "2")}
+        assert len(cache) == 1
+        db.session.commit()
+        assert len(cache) == 0
+        assert CHANGED_PIDS_KEY not in db.session.info
+
+
+def test_null_cache():
+    """Test the default no-op cache backend."""
+    cache = NullCache()
+    assert not cache.enabled
+    cache.set(("recid", "1"), "a")
+    assert cache.get(("recid", "1")) is None
+    cache.invalidate([("recid", "1")])
+    assert cache.stats == dict(hits=0, misses=1)
+    cache.clear()
+    assert cache.stats == dict(hits=0, misses=0)
+
+
+def test_redis_cache(app, db):
+    """Test the Redis cache backend."""
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=30)
+    with app.app_context():
+        pid = PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=uuid.uuid4(),
+        )
+        dest = PersistentIdentifier.create("recid", "2", status=PIDStatus.REGISTERED)
+        db.session.commit()
+
+        assert cache.get(("recid", "1")) is None
+        cache.set(("recid", "1"), dump_pid(pid))
+        cache.set(("recid", "2"), dump_pid(dest, pid))
+        assert list(client.data) == ["pidstore:pid:recid:1", "pidstore:pid:recid:2"]
+        assert cache.get(("recid", "1")) == dump_pid(pid)
+        assert cache.get(("recid", "2")) == dump_pid(dest, pid)
+        assert cache.stats == dict(hits=2, misses=1)
+
+        cache.invalidate([("recid", "1")])
+        cache.invalidate([])
+        assert client.data["pidstore:pid:recid:1"] == b""
+        assert cache.get(("recid", "1")) is None
+        # Invalidated entries are not written back by concurrent readers.
+        cache.set(("recid", "1"), dump_pid(pid))
+        assert cache.get(("recid", "1")) is None
+        cache.clear()
+        cache.clear()
+        assert client.data == {}
+
+
+def test_redis_cache_factory(app):
+    """Test the Redis cache factory."""
+    app.config["CACHE_REDIS_URL"] = "redis://localhost:6379/1"
+    app.config["PIDSTORE_RESOLVER_CACHE"] = dict(ttl=5)
+    cache = redis_cache_factory(app)
+    assert cache.ttl == 5
+    assert cache.client.connection_pool.connection_kwargs["db"] == 1
+    app.config["PIDSTORE_RESOLVER_CACHE_REDIS_URL"] = "redis://localhost:6379/2"
+    cache = redis_cache_factory(app)
+    assert cache.client.connection_pool.connection_kwargs["db"] == 2
+
+
+def test_shared_cache_invalidation(app, db):
+    """Test that a commit invalidates the cache shared by other processes."""
+    client = FakeRedis()
+    app.config["PIDSTORE_RESOLVER_CACHE_BACKEND"] = lambda app: RedisCache(client)
+    with app.app_context():
+        cache = app.extensions["invenio-pidstore"].resolver_cache
+        assert cache_for(("recid", "1")) is cache
+        pid = PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=uuid.uuid4(),
+        )
+        db.session.commit()
+        # The commit left a tombstone which blocks stale writes until expired.
+        assert client.data == {"pidstore:pid:recid:1": b""}
+        client.delete("pidstore:pid:recid:1")
+
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+        resolver.resolve("1")
+        # Another process sharing the cache resolves the PID from Redis.
+        other = RedisCache(client)
+        assert other.get(("recid", "1")).status == "R"
+
+        pid.delete()
+        assert cache_for(("recid", "1")) is None
+        db.session.commit()
+        assert other.get(("recid", "1")) is None
+
+        # pid_exists uses the cache
+        pid_exists = app.jinja_env.filters["pid_exists"]
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+        PersistentIdentifier.create("recid", "2", status=PIDStatus.REGISTERED)
+        db.session.commit()
+        pytest.raises(PIDMissingObjectError, resolver.resolve, "2")
+        with patch.object(PersistentIdentifier, "get") as get:
+            assert pid_exists("2", pidtype="recid")
+            assert not get.called
+
+
+def test_cache_for(app):
+    """Test the cache lookup without the extension."""
+    assert cache_for(("recid", "1")) is None
+    del app.extensions["invenio-pidstore"]
+    assert cache_for(("recid", "1")) is None
+
+
+def test_negative_cache(app, db):
+    """Test caching of nonexistent PIDs."""
+    app.config["PIDSTORE_RESOLVER_NEGATIVE_CACHE"] = dict(max_entries=10, ttl=10)
+    with app.app_context():
+        # In-process backends do not support it.
+        assert not app.extensions["invenio-pidstore"].negative_cache.enabled
+
+    client = FakeRedis()
+    app.config["PIDSTORE_RESOLVER_CACHE_BACKEND"] = lambda app: RedisCache(client)
+    app.extensions["invenio-pidstore"]._resolver_cache = None
+    app.extensions["invenio-pidstore"]._negative_cache = None
+    with app.app_context():
+        negative = app.extensions["invenio-pidstore"].negative_cache
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+        pid_exists = app.jinja_env.filters["pid_exists"]
+
+        pytest.raises(PIDDoesNotExistError, resolver.resolve, "1")
+        with patch.object(PersistentIdentifier, "get") as get:
+            pytest.raises(PIDDoesNotExistError, resolver.resolve, "1")
+            assert not pid_exists("1", pidtype="recid")
+            assert not get.called
+        assert negative.stats == dict(hits=2, misses=1)
+
+        # Created PIDs are visible in the transaction and after the commit.
+        PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=uuid.uuid4(),
+        )
+        assert pid_exists("1", pidtype="recid")
+        db.session.commit()
+        assert negative.get(("recid", "1")) is None
+        assert resolver.resolve("1")
+
+        # Same for bulk inserts
+        assert not pid_exists("2", pidtype="recid")
+        PersistentIdentifier.bulk_create([("recid", "2", None, None, None, None)])
+        db.session.commit()
+        assert negative.get(("recid", "2")) is None
+        assert pid_exists("2", pidtype="recid")
+
+
+def test_shared_negative_cache(app, db):
+    """Test that the Redis backend shares the cache of nonexistent PIDs."""
+    client = FakeRedis()
+    app.config["PIDSTORE_RESOLVER_CACHE_BACKEND"] = lambda app: RedisCache(client)
+    app.config["PIDSTORE_RESOLVER_NEGATIVE_CACHE"] = dict(max_entries=10, ttl=10)
+    with app.app_context():
+        negative = app.extensions["invenio-pidstore"].negative_cache
+        assert isinstance(negative, RedisNegativeCache)
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+
+        pytest.raises(PIDDoesNotExistError, resolver.resolve, "1")
+        assert list(client.data) == ["pidstore:missing:recid:1"]
+        # Another process sharing the cache skips the lookup.
+        other = RedisCache(client).negative_cache(ttl=10)
+        assert other.get(("recid", "1")) is True
+        assert other.get(("recid", "2")) is None
+
+        PersistentIdentifier.create("recid", "1", status=PIDStatus.REGISTERED)
+        db.session.commit()
+        assert other.get(("recid", "1")) is None
+        pytest.raises(PIDMissingObjectError, resolver.resolve, "1")
+
+
+class FailingRedis(object):
+    """Redis client whose server is unreachable."""
+
+    def __getattr__(self, name):
+        """Raise a connection error on any command."""
+
+        def command(*args, **kwargs):
+            raise redis.exceptions.ConnectionError("Connection refused")
+
+        return command
+
+
+def test_redis_cache_errors(app, db):
+    """Test that a Redis outage falls back to the database."""
+    client = FailingRedis()
+    app.config["PIDSTORE_RESOLVER_CACHE_BACKEND"] = lambda app: RedisCache(client)
+    app.config["PIDSTORE_RESOLVER_NEGATIVE_CACHE"] = dict(ttl=10)
+    with app.app_context():
+        cache = app.extensions["invenio-pidstore"].resolver_cache
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+        pid_exists = app.jinja_env.filters["pid_exists"]
+
+        pytest.raises(PIDDoesNotExistError, resolver.resolve, "1")
+        PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=uuid.uuid4(),
+        )
+        # The commit succeeds and the session remains usable.
+        db.session.commit()
+        assert resolver.resolve("1")[0].pid_value == "1"
+        assert pid_exists("1", pidtype="recid")
+        assert cache.stats == dict(hits=0, misses=3)
+        cache.clear()
+        assert PersistentIdentifier.query.count() == 1
+
+        # Errors of other backends do not propagate from the commit either.
+        with patch.object(RedisCache, "invalidate", side_effect=RuntimeError):
+            PersistentIdentifier.get("recid", "1").delete()
+            db.session.commit()
+        assert PersistentIdentifier.get("recid", "1").is_deleted()
@@ -6,13 +6,22 @@
 
 from __future__ import absolute_import, print_function
 
+import csv
+import io
+import json
 import uuid
 
 from click.testing import CliRunner
 from flask.cli import ScriptInfo
+from mock import patch
 
 from invenio_pidstore.cli import pid as cmd
-from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_pidstore.models import (
+    PersistentIdentifier,
+    PIDStatus,
+    RecordIdentifier,
+    Redirect,
+)
 
 
 def test_pid_creation(app, db):
@@ -316,3 +325,311 @@ def test_pid_unassign(app, db):
             assert not pid.has_object()
             assert pid.get_assigned_object() is None
             assert pid.get_assigned_object("rec") is None
+
+
+def test_compact_recids(app, db):
+    """Test compaction of the record identifier table."""
+    runner = CliRunner()
+    script_info = ScriptInfo(create_app=lambda: app)
+
+    with app.app_context():
+        for _ in range(5):
+            RecordIdentifier.next()
+        db.session.commit()
+
+    result = runner.invoke(
+        cmd, ["compact-recids", "--batch-size", "2"], obj=script_info
+    )
+    assert 0 == result.exit_code
+    assert result.output == "Removed 4 record identifiers.\n"
+
+    with app.app_context():
+        assert RecordIdentifier.query.count() == 1
+        assert RecordIdentifier.next() == 6
+
+
+def test_fill_recid_pool(app, db):
+    """Test refilling the pool of record identifiers."""
+    runner = CliRunner()
+    script_info = ScriptInfo(create_app=lambda: app)
+    app.config["PIDSTORE_RECID_POOL_SIZE"] = 3
+
+    result = runner.invoke(cmd, ["fill-recid-pool"], obj=script_info)
+    assert 0 == result.exit_code
+    assert result.output == "Added 3 record identifiers to the pool.\n"
+
+    result = runner.invoke(cmd, ["fill-recid-pool", "--size", "5"], obj=script_info)
+    assert result.output == "Added 2 record identifiers to the pool.\n"
+
+    with app.app_context():
+        assert PersistentIdentifier.query.filter_by(pid_provider="pool").count() == 5
+
+
+def test_export(app, db, tmp_path):
+    """Test export of persistent identifiers."""
+    runner = CliRunner()
+    script_info = ScriptInfo(create_app=lambda: app)
+    rec_uuid = uuid.uuid4()
+
+    with app.app_context():
+        PersistentIdentifier.create("doi", "10.1234/a", status=PIDStatus.REGISTERED)
+        PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=rec_uuid,
+        )
+        PersistentIdentifier.create("recid", "2")
+        db.session.commit()
+
+    result = runner.invoke(cmd, ["export", "--chunk-size", "2"], obj=script_info)
+    assert 0 == result.exit_code
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert [r["pid_value"] for r in rows] == ["10.1234/a", "1", "2"]
+    assert rows[1]["object_uuid"] == str(rec_uuid)
+    assert rows[1]["status"] == "R"
+    assert rows[0]["object_uuid"] is None
+    assert rows[0]["created"]
+
+    result = runner.invoke(
+        cmd, ["export", "-f", "csv", "-p", "recid", "-s", "NEW"], obj=script_info
+    )
+    assert 0 == result.exit_code
+    rows = list(csv.DictReader(io.StringIO(result.output)))
+    assert len(rows) == 1
+    assert rows[0]["pid_value"] == "2"
+    assert rows[0]["object_type"] == ""
+
+    result = runner.invoke(
+        cmd, ["export", "-f", "columns", "--chunk-size", "2"], obj=script_info
+    )
+    chunks = [json.loads(line) for line in result.output.splitlines()]
+    assert [c["pid_value"] for c in chunks] == [["10.1234/a", "1"], ["2"]]
+
+    path = str(tmp_path / "pids.jsonl")
+    result = runner.invoke(cmd, ["export", "-t", "rec", "-o", path], obj=script_info)
+    assert 0 == result.exit_code
+    with open(path) as f:
+        assert json.loads(f.read())["pid_value"] == "1"
+
+    result = runner.invoke(cmd, ["export", "--since", "2100-01-01"], obj=script_info)
+    assert 0 == result.exit_code
+    assert result.output == ""
+    result = runner.invoke(cmd, ["export", "--since", "2000-01-01"], obj=script_info)
+    assert len(result.output.splitlines()) == 3
+
+    # Redirected PIDs are exported with their target.
+    with app.app_context():
+        PersistentIdentifier.create(
+            "doi", "10.1234/b", status=PIDStatus.REGISTERED
+        ).redirect(PersistentIdentifier.get("doi", "10.1234/a"))
+        db.session.commit()
+    # The targets are loaded per chunk rather than per PID.
+    with patch.object(PersistentIdentifier, "get_redirect") as get_redirect:
+        result = runner.invoke(cmd, ["export", "-p", "doi"], obj=script_info)
+        assert not get_redirect.called
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert rows[0]["redirect_pid_value"] is None
+    assert rows[1]["status"] == "M"
+    assert (rows[1]["redirect_pid_type"], rows[1]["redirect_pid_value"]) == (
+        "doi",
+        "10.1234/a",
+    )
+
+
+def test_import(app, db, tmp_path):
+    """Test import of persistent identifiers."""
+    runner = CliRunner()
+    script_info = ScriptInfo(create_app=lambda: app)
+    rec_uuid = uuid.uuid4()
+
+    path = tmp_path / "pids.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps(r)
+            for r in [
+                dict(
+                    pid_type="recid",
+                    pid_value="42",
+                    status="R",
+                    object_type="rec",
+                    object_uuid=str(rec_uuid),
+                    created="2010-01-01T00:00:00",
+                    updated="2011-01-01T00:00:00",
+                ),
+                dict(pid_type="recid", pid_value="7", status="K"),
+                dict(pid_type="doi", pid_value="10.1234/a"),
+                dict(pid_type="recid", pid_value="7"),
+            ]
+        )
+    )
+    conflicts = tmp_path / "conflicts.jsonl"
+    result = runner.invoke(
+        cmd,
+        ["import", str(path), "--chunk-size", "3", "--conflicts", str(conflicts)],
+        obj=script_info,
+    )
+    assert 0 == result.exit_code
+    assert "Imported 3 persistent identifiers (1 conflicts)." in result.output
+    assert "4 records processed, 3 imported, 1 conflicts." in result.output
+    assert json.loads(conflicts.read_text()) == dict(pid_type="recid", pid_value="7")
+
+    with app.app_context():
+        pid = PersistentIdentifier.get("recid", "42")
+        assert pid.status == PIDStatus.REGISTERED
+        assert pid.object_uuid == rec_uuid
+        assert pid.created.year == 2010
+        assert pid.updated.year == 2011
+        assert PersistentIdentifier.get("recid", "7").status == PIDStatus.RESERVED
+        assert PersistentIdentifier.get("doi", "10.1234/a").status == PIDStatus.NEW
+        # The record identifier sequence continues after the imported ones.
+        assert RecordIdentifier.next() == 43
+
+    # Deleted and redirected PIDs are imported as they were exported.
+    obj_uuid = uuid.uuid4()
+    with app.app_context():
+        pid = PersistentIdentifier.get("recid", "7")
+        pid.assign("rec", obj_uuid)
+        pid.delete()
+        PersistentIdentifier.create(
+            "doi", "10.1234/b", status=PIDStatus.REGISTERED
+        ).redirect(PersistentIdentifier.get("doi", "10.1234/a"))
+        db.session.commit()
+
+    # Resume from a checkpoint, from a CSV export.
+    csv_path = tmp_path / "pids.csv"
+    result = runner.invoke(
+        cmd, ["export", "-f", "csv", "-o", str(csv_path)], obj=script_info
+    )
+    assert 0 == result.exit_code
+    with app.app_context():
+        Redirect.query.delete()
+        PersistentIdentifier.query.delete()
+        RecordIdentifier.query.delete()
+        db.session.commit()
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(json.dumps(dict(records=1, max_recid=42, redirects=[])))
+    result = runner.invoke(
+        cmd,
+        ["import", str(csv_path), "--checkpoint", str(checkpoint), "--chunk-size", "1"],
+        obj=script_info,
+    )
+    assert 0 == result.exit_code
+    assert "Resuming after 1 records." in result.output
+    assert "Imported 3 persistent identifiers (0 conflicts)." in result.output
+    assert not checkpoint.exists()
+    with app.app_context():
+        assert PersistentIdentifier.query.count() == 3
+        pid = PersistentIdentifier.get("recid", "7")
+        assert pid.is_deleted()
+        assert pid.object_uuid == obj_uuid
+        pid = PersistentIdentifier.get("doi", "10.1234/b")
+        assert pid.is_redirected()
+        assert pid.get_redirect().pid_value == "10.1234/a"
+        # The highest recid of the interrupted run is taken into account.
+        assert RecordIdentifier.next() == 43
+
+    path.write_text(
+        json.dumps(
+            dict(
+                pid_type="doi",
+                pid_value="10.1234/c",
+                status="M",
+                object_uuid=str(uuid.uuid4()),
+                redirect_pid_type="doi",
+                redirect_pid_value="10.1234/x",
+            )
+        )
+    )
+    result = runner.invoke(cmd, ["import", str(path)], obj=script_info)
+    assert "Redirection target doi:10.1234/x does not exist." in result.output
+
+
+def test_bulk_transitions(app, db, tmp_path):
+    """Test bulk status transition commands."""
+    runner = CliRunner()
+    script_info = ScriptInfo(create_app=lambda: app)
+
+    with app.app_context():
+        PersistentIdentifier.create("doi", "10.1234/a")
+        PersistentIdentifier.create("doi", "10.1234/b", status=PIDStatus.REGISTERED)
+        PersistentIdentifier.create("doi", "10.1234/c", status=PIDStatus.RESERVED)
+        db.session.commit()
+
+    path = tmp_path / "values.txt"
+    path.write_text("10.1234/a\n10.1234/b\n\n")
+    result = runner.invoke(
+        cmd, ["bulk-register", "doi", "-i", str(path)], obj=script_info
+    )
+    assert 0 == result.exit_code
+    assert "Rejected doi 10.1234/b (R)" in result.output
+    assert "Registered 1 persistent identifiers (1 rejected)." in result.output
+
+    # Changing all the PIDs of the type must be explicit.
+    result = runner.invoke(
+        cmd, ["bulk-delete", "doi", "-s", "RESERVED"], obj=script_info
+    )
+    assert result.exit_code == 2
+    assert "Either --input or --all is required." in result.output
+    result = runner.invoke(
+        cmd, ["bulk-delete", "doi", "--all", "-i", str(path)], obj=script_info
+    )
+    assert result.exit_code == 2
+
+    result = runner.invoke(
+        cmd, ["bulk-reserve", "doi", "--all", "-s", "REGISTERED"], obj=script_info
+    )
+    assert "Reserved 0 persistent identifiers (2 rejected)." in result.output
+
+    result = runner.invoke(
+        cmd,
+        ["bulk-delete", "doi", "--all", "-s", "RESERVED", "-s", "NEW"],
+        obj=script_info,
+    )
+    assert "Deleted 1 persistent identifiers (0 rejected)." in result.output
+
+    result = runner.invoke(
+        cmd,
+        [
+            "bulk-sync-status",
+            "doi",
+            "--all",
+            "--to",
+            "NEW",
+            "--created-before",
+            "2000-01-01",
+        ],
+        obj=script_info,
+    )
+    assert "Synced 0 persistent identifiers (0 rejected)." in result.output
+
+    with app.app_context():
+        assert PersistentIdentifier.get("doi", "10.1234/a").is_registered()
+        assert PersistentIdentifier.get("doi", "10.1234/c").is_deleted()
+
+
+def test_reassign_objects(app, db, tmp_path):
+    """Test reassignment of objects from a CSV mapping."""
+    runner = CliRunner()
+    script_info = ScriptInfo(create_app=lambda: app)
+    old, new = uuid.uuid4(), uuid.uuid4()
+
+    with app.app_context():
+        PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=old,
+        )
+        db.session.commit()
+
+    path = tmp_path / "mapping.csv"
+    path.write_text("old_uuid,new_uuid\n{0},{1}\n".format(old, new))
+    result = runner.invoke(cmd, ["reassign-objects", str(path)], obj=script_info)
+    assert 0 == result.exit_code
+    assert "Reassigned 1 persistent identifiers (0 rejected)." in result.output
+
+    with app.app_context():
+        assert PersistentIdentifier.get("recid", "1").object_uuid == new
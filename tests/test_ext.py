@@ -7,8 +7,12 @@
 
 from __future__ import absolute_import, print_function
 
-from flask import Flask
-from mock import patch
+import subprocess
+import sys
+
+import pytest
+from flask import Flask, g
+from mock import MagicMock, patch
 
 from invenio_pidstore import InvenioPIDStore
 from invenio_pidstore.models import PersistentIdentifier
@@ -40,6 +44,90 @@ def test_init():
     assert "invenio-pidstore" in app.extensions
 
 
+def test_lazy_entry_points():
+    """Test that entry points are loaded on first access."""
+    app = Flask("testapp")
+    with patch("invenio_pidstore.ext.entry_points") as entry_points:
+        ep = MagicMock()
+        ep.name = "lazy"
+        ep.load.return_value = "minter"
+        entry_points.return_value = [ep]
+        ext = InvenioPIDStore(app)
+        assert not entry_points.called
+
+        minters = ext.minters
+        assert "lazy" in minters
+        assert not ep.load.called
+        assert list(minters) == ["lazy"]
+        assert len(minters) == 1
+        assert minters["lazy"] == "minter"
+        assert minters["lazy"] == "minter"
+        assert ep.load.call_count == 1
+
+        # Registered objects do not override entry points.
+        ext.register_fetcher("lazy", "other")
+        assert ext.fetchers["lazy"] == "minter"
+        ext.fetchers["new"] = "fetcher"
+        assert dict(ext.fetchers) == {"lazy": "minter", "new": "fetcher"}
+        del ext.fetchers["new"]
+        del ext.batch_minters["lazy"]
+        assert "lazy" not in ext.batch_minters
+        with pytest.raises(KeyError):
+            ext.batch_minters["lazy"]
+
+        # Entry point groups can still be loaded eagerly.
+        loaded = ep.load.call_count
+        ext.load_batch_fetchers_entry_point_group("group")
+        assert ep.load.call_count == loaded + 1
+        assert ext.batch_fetchers["lazy"] == "minter"
+
+
+def test_importtime():
+    """Test that importing and initializing the extension stays light."""
+    code = (
+        "from flask import Flask; "
+        "from invenio_pidstore import InvenioPIDStore; "
+        "InvenioPIDStore(Flask('testapp'))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stderr=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    ).stderr
+    modules = set(
+        line.rsplit("|", 1)[-1].strip()
+        for line in output.splitlines()
+        if line.startswith("import time:")
+    )
+    assert "invenio_pidstore.models" in modules
+    for module in (
+        "invenio_pidstore.admin",
+        "invenio_pidstore.cli",
+        "invenio_pidstore.fetchers",
+        "invenio_pidstore.minters",
+        "invenio_pidstore.providers.datacite",
+        "invenio_pidstore.providers.recordid",
+        "invenio_pidstore.providers.recordid_v2",
+        "base32_lib",
+        "datacite",
+        "flask_admin",
+    ):
+        assert module not in modules
+
+
+def test_lazy_cli(app, db):
+    """Test the lazily imported CLI group."""
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["pid", "--help"])
+    assert 0 == result.exit_code
+    assert "compact-recids" in result.output
+
+    result = runner.invoke(args=["pid", "compact-recids"])
+    assert 0 == result.exit_code
+    assert result.output == "Removed 0 record identifiers.\n"
+
+
 def test_logger():
     """Test extension initialization."""
     app = Flask("testapp")
@@ -50,9 +138,9 @@ def test_logger():
 def test_invenio_records():
     """Test extension initialization."""
     app = Flask("testapp")
-    with patch("importlib.metadata"):
-        with patch("importlib.resources"):
-            InvenioPIDStore(app)
+    with patch("importlib.util.find_spec") as find_spec:
+        InvenioPIDStore(app)
+    find_spec.assert_called_with("invenio_records")
     assert app.config["PIDSTORE_OBJECT_ENDPOINTS"]
 
 
@@ -67,3 +155,44 @@ def test_template_filters(app, db):
         assert pid_exists("pid_val0", pidtype="mock_t")
         assert not pid_exists("foo", pidtype="mock_t")
         assert not pid_exists("pid_val0", pidtype="foo")
+
+
+def test_pid_exists_memoization(app, db):
+    """Test the memoization of the 'pid_exists' filters."""
+    with app.app_context():
+        pid_exists = app.jinja_env.filters["pid_exists"]
+        pid_exists_many = app.jinja_env.filters["pid_exists_many"]
+        for value in ("a", "b"):
+            PersistentIdentifier.create("doi", value)
+        db.session.commit()
+
+        with patch.object(
+            PersistentIdentifier,
+            "_existing_keys",
+            wraps=PersistentIdentifier._existing_keys,
+        ) as existing_keys:
+            assert pid_exists_many(["a", "b", "c"], pidtype="doi") == dict(
+                a=True, b=True, c=False
+            )
+            assert existing_keys.call_count == 1
+
+        with patch.object(PersistentIdentifier, "exists") as exists:
+            assert pid_exists("a", pidtype="doi")
+            assert not pid_exists("c", pidtype="doi")
+            template = app.jinja_env.from_string(
+                "{{ (values|pid_exists_many('doi')).values()|list }}"
+            )
+            assert template.render(values=["b", "c"]) == "[True, False]"
+            assert not exists.called
+
+        # Changes are visible in the transaction and after the commit.
+        PersistentIdentifier.create("doi", "c")
+        assert pid_exists("c", pidtype="doi")
+        db.session.commit()
+        assert pid_exists("c", pidtype="doi")
+
+        # Answers about uncommitted changes are not memoized.
+        PersistentIdentifier.create("doi", "d")
+        assert pid_exists("d", pidtype="doi")
+        assert ("doi", "d") not in g._invenio_pidstore_exists
+        db.session.rollback()
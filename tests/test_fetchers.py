@@ -8,8 +8,17 @@ from __future__ import absolute_import, print_function
 import uuid
 
 from invenio_pidstore import current_pidstore
-from invenio_pidstore.fetchers import recid_fetcher, recid_fetcher_v2
+from invenio_pidstore.fetchers import (
+    FetchedPID,
+    FetchedPIDs,
+    recid_fetcher,
+    recid_fetcher_many,
+    recid_fetcher_v2,
+    recid_fetcher_v2_many,
+)
 from invenio_pidstore.minters import recid_minter, recid_minter_v2
+from invenio_pidstore.providers.recordid import RecordIdProvider
+from invenio_pidstore.providers.recordid_v2 import RecordIdProviderV2
 
 
 def test_recid_fetcher(app, db):
@@ -39,6 +48,42 @@ def test_recid_fetcher_v2(app, db):
         assert fetched_pid.pid_value == minted_pid.pid_value
 
 
+def test_recid_fetcher_many(app, db):
+    """Test batch recid fetchers."""
+    with app.app_context():
+        records = [(uuid.uuid4(), {"control_number": v}) for v in (1, "ab")]
+
+        fetched = recid_fetcher_many(records)
+        assert len(fetched) == 2
+        assert fetched.pid_value == ["1", "ab"]
+        assert fetched.pid_type == ["recid", "recid"]
+        assert fetched.provider == [RecordIdProvider, RecordIdProvider]
+        assert list(fetched.rows()) == [
+            recid_fetcher(rec_uuid, data) for rec_uuid, data in records
+        ]
+
+        fetched = recid_fetcher_v2_many(records)
+        assert fetched.provider == [RecordIdProviderV2, RecordIdProviderV2]
+        assert list(fetched.rows())[1] == FetchedPID(RecordIdProviderV2, "recid", "ab")
+        assert len(recid_fetcher_v2_many([])) == 0
+
+
+def test_batch_fetchers(app, db):
+    """Test batch fetcher registration and fallback."""
+    with app.app_context():
+        assert current_pidstore.get_batch_fetcher("recid") is recid_fetcher_many
+        assert current_pidstore.get_batch_fetcher("recid_v2") is recid_fetcher_v2_many
+
+        current_pidstore.register_fetcher("single", recid_fetcher)
+        fetch_many = current_pidstore.get_batch_fetcher("single")
+        records = [(uuid.uuid4(), {"control_number": 1})]
+        assert fetch_many(records) == recid_fetcher_many(records)
+        assert fetch_many([]) == FetchedPIDs([], [], [])
+
+        current_pidstore.register_batch_fetcher("single", recid_fetcher_v2_many)
+        assert current_pidstore.get_batch_fetcher("single") is recid_fetcher_v2_many
+
+
 def test_register_fetcher(app):
     """Test base provider."""
     with app.app_context():
@@ -7,18 +7,29 @@
 from __future__ import absolute_import, print_function
 
 import uuid
+from datetime import datetime
 
 import pytest
 from mock import patch
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
+from invenio_pidstore import current_pidstore
 from invenio_pidstore.errors import (
     PIDAlreadyExists,
     PIDDoesNotExistError,
     PIDInvalidAction,
     PIDObjectAlreadyAssigned,
 )
-from invenio_pidstore.models import PersistentIdentifier, PIDStatus, Redirect
+from invenio_pidstore.models import (
+    CHANGED_PIDS_KEY,
+    POOL_PROVIDER,
+    PersistentIdentifier,
+    PIDRecord,
+    PIDStatus,
+    Redirect,
+    batch,
+)
 
 
 @patch("invenio_pidstore.models.logger")
@@ -63,6 +74,175 @@ def test_pid_creation(logger, app, db):
             assert logger.exception.call_args[0][0].startswith("Failed to create")
 
 
+@patch("invenio_pidstore.models.logger")
+def test_pid_get_or_create_and_upsert(logger, app, db):
+    """Test creation of persistent identifiers that may already exist."""
+    with app.app_context():
+        rec_uuid = uuid.uuid4()
+        pid, created = PersistentIdentifier.get_or_create(
+            "rec",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=rec_uuid,
+        )
+        assert created
+        assert pid.status == PIDStatus.REGISTERED
+        assert pid.object_uuid == rec_uuid
+        assert pid in db.session
+
+        with patch("invenio_pidstore.models.db.session.begin_nested") as mock:
+            same, created = PersistentIdentifier.get_or_create("rec", "1")
+            assert not mock.called
+        assert not created
+        assert same is pid
+        assert same.status == PIDStatus.REGISTERED
+        assert not logger.exception.called
+
+        other = uuid.uuid4()
+        pid = PersistentIdentifier.upsert(
+            "rec",
+            "1",
+            pid_provider="p",
+            status=PIDStatus.RESERVED,
+            object_type="rec",
+            object_uuid=other,
+        )
+        assert same is pid
+        assert pid.pid_provider == "p"
+        assert pid.status == PIDStatus.RESERVED
+        assert pid.object_uuid == other
+
+        pid = PersistentIdentifier.upsert("rec", "2", status=PIDStatus.REGISTERED)
+        assert pid.status == PIDStatus.REGISTERED
+        assert PersistentIdentifier.query.count() == 2
+        db.session.commit()
+
+        pytest.raises(
+            PIDInvalidAction,
+            PersistentIdentifier.upsert,
+            "rec",
+            "2",
+            status=PIDStatus.DELETED,
+            object_type="rec",
+            object_uuid=other,
+        )
+        assert not logger.exception.called
+
+        # Deleted and redirected PIDs are left untouched.
+        PersistentIdentifier.get("rec", "1").delete()
+        PersistentIdentifier.get("rec", "2").redirect(
+            PersistentIdentifier.create("rec", "3", status=PIDStatus.REGISTERED)
+        )
+        for value, status in (("1", PIDStatus.DELETED), ("2", PIDStatus.REDIRECTED)):
+            pytest.raises(
+                PIDInvalidAction,
+                PersistentIdentifier.upsert,
+                "rec",
+                value,
+                status=PIDStatus.REGISTERED,
+            )
+            assert PersistentIdentifier.get("rec", value).status == status
+        assert Redirect.query.count() == 1
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_pid_claim(app, db, returning):
+    """Test claiming a pooled persistent identifier."""
+    with app.app_context():
+        PersistentIdentifier.create(
+            "rec", "1", pid_provider="pool", status=PIDStatus.RESERVED
+        )
+        db.session.commit()
+        pid = PersistentIdentifier.get("rec", "1")
+        rec_uuid = uuid.uuid4()
+
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            with patch.object(db.engine.dialect, "update_returning", returning):
+                claimed = PersistentIdentifier.claim(
+                    "rec",
+                    "pool",
+                    status=PIDStatus.REGISTERED,
+                    object_type="rec",
+                    object_uuid=rec_uuid,
+                )
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        if returning:
+            assert len(statements) == 1
+        assert claimed is pid
+        assert claimed.pid_provider is None
+        assert claimed.status == PIDStatus.REGISTERED
+        assert claimed.object_uuid == rec_uuid
+        assert ("rec", "1") in db.session.info[CHANGED_PIDS_KEY]
+
+        with patch.object(db.engine.dialect, "update_returning", returning):
+            assert PersistentIdentifier.claim("rec", "pool") is None
+
+
+def test_pid_bulk_create(app, db):
+    """Test bulk pid creation."""
+    with app.app_context():
+        rec_uuid = uuid.uuid4()
+        PersistentIdentifier.create("recid", "1")
+
+        created, conflicts = PersistentIdentifier.bulk_create(
+            [
+                ("recid", "1", None, None, None, None),
+                ("recid", 2, None, PIDStatus.REGISTERED, "rec", str(rec_uuid)),
+                ("recid", "2", None, None, None, None),
+                ("doi", "10.1234/foo", "datacite", "K", None, None),
+                ("recid", "3", None, None, "rec", None),
+            ],
+            chunk_size=2,
+        )
+        assert created == [("recid", "2"), ("doi", "10.1234/foo"), ("recid", "3")]
+        assert [(e.pid_type, e.pid_value) for e in conflicts] == [
+            ("recid", "1"),
+            ("recid", "2"),
+        ]
+        assert all(isinstance(e, PIDAlreadyExists) for e in conflicts)
+        assert PersistentIdentifier.query.count() == 4
+
+        pid = PersistentIdentifier.get("recid", "2")
+        assert pid.status == PIDStatus.REGISTERED
+        assert pid.object_type == "rec"
+        assert pid.object_uuid == rec_uuid
+        assert pid.created and pid.updated
+        pid = PersistentIdentifier.get("doi", "10.1234/foo")
+        assert pid.status == PIDStatus.RESERVED
+        assert pid.pid_provider == "datacite"
+        pid = PersistentIdentifier.get("recid", "3")
+        assert pid.status == PIDStatus.NEW
+        assert not pid.has_object()
+
+        # Same validation as the single row path
+        pytest.raises(
+            PIDInvalidAction,
+            PersistentIdentifier.bulk_create,
+            [("recid", "4", None, PIDStatus.DELETED, "rec", rec_uuid)],
+        )
+
+        # Keys inserted concurrently after the existence check are reported
+        with patch.object(PersistentIdentifier, "_existing_keys", return_value=set()):
+            created, conflicts = PersistentIdentifier.bulk_create(
+                [
+                    ("recid", "5", None, None, None, None),
+                    ("recid", "1", None, None, None, None),
+                ]
+            )
+        assert created == [("recid", "5")]
+        assert [(e.pid_type, e.pid_value) for e in conflicts] == [("recid", "1")]
+        db.session.commit()
+        assert PersistentIdentifier.query.count() == 5
+
+
 def test_alembic(app, db):
     """Test alembic recipes."""
     ext = app.extensions["invenio-db"]
@@ -127,6 +307,137 @@ def test_pid_get(app, db):
         )
 
 
+def test_pid_get_many(app, db):
+    """Test retrieval of many pids at once."""
+    with app.app_context():
+        PersistentIdentifier.create("recid", "1")
+        PersistentIdentifier.create("recid", "2", pid_provider="dcite")
+        PersistentIdentifier.create("doi", "3")
+
+        pids = PersistentIdentifier.get_many("recid", ["3", 2, "1", "1"])
+        assert list(pids) == ["3", "2", "1"]
+        assert pids["3"] is None
+        assert pids["2"].pid_provider == "dcite"
+        assert pids["1"].pid_value == "1"
+
+        pids = PersistentIdentifier.get_many("recid", ["1", "2"], pid_provider="dcite")
+        assert pids["1"] is None
+        assert pids["2"].pid_value == "2"
+
+        assert PersistentIdentifier.get_many("recid", []) == {}
+
+        with patch.object(PersistentIdentifier, "_IN_CHUNK_SIZE", 1):
+            pids = PersistentIdentifier.get_many("recid", ["1", "2"])
+        assert all(pids.values())
+
+        with pytest.raises(PIDDoesNotExistError) as exc_info:
+            PersistentIdentifier.get_many("recid", ["1", "3"], raise_on_missing=True)
+        assert exc_info.value.pid_value == "3"
+
+
+def test_pid_iter_pids(app, db):
+    """Test iteration over the pids."""
+    with app.app_context():
+        rec_uuid = uuid.uuid4()
+        for i in range(7):
+            PersistentIdentifier.create(
+                "recid" if i % 2 else "doi",
+                str(i),
+                status=PIDStatus.REGISTERED if i < 5 else PIDStatus.NEW,
+                object_type="rec" if i % 3 else None,
+                object_uuid=rec_uuid if i % 3 else None,
+            )
+        db.session.commit()
+
+        pids = PersistentIdentifier.iter_pids(chunk_size=3)
+        first = next(pids)
+        assert first.pid_value == "0"
+        assert [p.pid_value for p in pids] == ["1", "2", "3", "4", "5", "6"]
+        assert first not in db.session
+
+        def values(**kwargs):
+            return [p.pid_value for p in PersistentIdentifier.iter_pids(**kwargs)]
+
+        assert values(pid_type="recid", chunk_size=2) == ["1", "3", "5"]
+        assert values(status=PIDStatus.NEW) == ["5", "6"]
+        assert values(object_type="rec") == ["1", "2", "4", "5"]
+        assert values(pid_type="foo") == []
+
+        ranges = PersistentIdentifier.id_ranges(3)
+        assert len(ranges) == 3
+        assert sum((values(id_range=r, chunk_size=1) for r in ranges), []) == [
+            str(i) for i in range(7)
+        ]
+        assert len(PersistentIdentifier.id_ranges(10, pid_type="recid")) == 5
+        assert PersistentIdentifier.id_ranges(2, pid_type="foo") == []
+
+
+def test_pid_read(app, db):
+    """Test read-only retrieval of pids."""
+    with app.app_context():
+        rec_uuid = uuid.uuid4()
+        pid = PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=rec_uuid,
+        )
+        PersistentIdentifier.create("recid", "2", pid_provider="dcite")
+
+        record = PersistentIdentifier.read("recid", 1)
+        assert isinstance(record, PIDRecord)
+        assert record.id == pid.id
+        assert record.status == PIDStatus.REGISTERED
+        assert record.is_registered()
+        assert not any(
+            (
+                record.is_new(),
+                record.is_reserved(),
+                record.is_redirected(),
+                record.is_deleted(),
+            )
+        )
+        assert record.has_object()
+        assert record.get_assigned_object() == rec_uuid
+        assert record.get_assigned_object("rec") == rec_uuid
+        assert record.get_assigned_object("oth") is None
+
+        assert PersistentIdentifier.read("recid", "2", pid_provider="dcite").is_new()
+        pytest.raises(PIDDoesNotExistError, PersistentIdentifier.read, "recid", "3")
+        pytest.raises(
+            PIDDoesNotExistError,
+            PersistentIdentifier.read,
+            "recid",
+            "2",
+            pid_provider="other",
+        )
+
+        assert PersistentIdentifier.read_by_object("recid", "rec", rec_uuid) == record
+        pytest.raises(
+            PIDDoesNotExistError,
+            PersistentIdentifier.read_by_object,
+            "doi",
+            "rec",
+            rec_uuid,
+        )
+
+        records = PersistentIdentifier.read_many("recid", ["3", 1])
+        assert records == {"3": None, "1": record}
+
+        # Pending changes are visible.
+        pid.status = PIDStatus.DELETED
+        assert PersistentIdentifier.read("recid", "1").is_deleted()
+
+        # Redirection
+        pid.status = PIDStatus.REGISTERED
+        pid.redirect(PersistentIdentifier.get("recid", "2"))
+        record = PersistentIdentifier.read("recid", "1")
+        assert record.is_redirected()
+        assert not record.has_object()
+        assert record.get_redirect().pid_value == "2"
+
+
 @patch("invenio_pidstore.models.logger")
 def test_pid_assign(logger, app, db):
     """Test pid object assignment."""
@@ -191,6 +502,80 @@ def test_pid_assign_deleted(app, db):
         pytest.raises(PIDInvalidAction, pid.assign, "rec", uuid.uuid4())
 
 
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_assign(app, db, returning):
+    """Test bulk assignment of objects."""
+    with (
+        app.app_context(),
+        patch.object(db.engine.dialect, "update_returning", returning),
+    ):
+        old, new = uuid.uuid4(), uuid.uuid4()
+        PersistentIdentifier.create("rec", "1")
+        PersistentIdentifier.create(
+            "rec", "2", status=PIDStatus.REGISTERED, object_type="rec", object_uuid=old
+        )
+        PersistentIdentifier.create("rec", "3", status=PIDStatus.DELETED)
+        target = PersistentIdentifier.create("rec", "4", status=PIDStatus.REGISTERED)
+        PersistentIdentifier.create("rec", "5", status=PIDStatus.REGISTERED).redirect(
+            target
+        )
+        db.session.commit()
+        pid = PersistentIdentifier.get("rec", "1")
+
+        pairs = [("rec", value, "rec", str(new)) for value in ["1", "2", "3", "5", "9"]]
+        count, rejected = PersistentIdentifier.bulk_assign(pairs)
+        assert count == 1
+        assert sorted(r.pid_value for r in rejected) == ["2", "3", "5"]
+        assert pid.object_uuid == new
+
+        count, rejected = PersistentIdentifier.bulk_assign(pairs, overwrite=True)
+        assert count == 1
+        assert sorted(r.pid_value for r in rejected) == ["3", "5"]
+        assert PersistentIdentifier.get("rec", "2").object_uuid == new
+        assert PersistentIdentifier.get("rec", "5").get_redirect() == target
+        db.session.commit()
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_reassign_objects(app, db, returning):
+    """Test moving persistent identifiers to other objects."""
+    with (
+        app.app_context(),
+        patch.object(db.engine.dialect, "update_returning", returning),
+    ):
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        for value, object_type, object_uuid, status in [
+            ("1", "rec", a, PIDStatus.REGISTERED),
+            ("2", "rec", a, PIDStatus.REGISTERED),
+            ("3", "rec", b, PIDStatus.RESERVED),
+            ("4", "doc", b, PIDStatus.REGISTERED),
+        ]:
+            PersistentIdentifier.create(
+                "rec",
+                value,
+                status=status,
+                object_type=object_type,
+                object_uuid=object_uuid,
+            )
+        PersistentIdentifier.get("rec", "2").delete()
+        db.session.commit()
+
+        count, rejected = PersistentIdentifier.reassign_objects({a: c, str(b): str(c)})
+        assert count == 3
+        assert [r.pid_value for r in rejected] == ["2"]
+        assert PersistentIdentifier.get("rec", "1").object_uuid == c
+        assert PersistentIdentifier.get("rec", "2").object_uuid == a
+        assert ("rec", "4") in db.session.info[CHANGED_PIDS_KEY]
+
+        count, rejected = PersistentIdentifier.reassign_objects(
+            [(c, b)], object_type="doc"
+        )
+        assert (count, rejected) == (1, [])
+        assert PersistentIdentifier.get("rec", "4").object_uuid == b
+        assert PersistentIdentifier.get("rec", "3").object_uuid == c
+        db.session.commit()
+
+
 @patch("invenio_pidstore.models.logger")
 def test_reserve(logger, app, db):
     """Test pid reserve."""
@@ -361,6 +746,43 @@ def test_redirect_cleanup(app, db):
         assert Redirect.query.count() == 0
 
 
+def test_batch(app, db):
+    """Test state transitions without savepoints."""
+    with app.app_context():
+        target = PersistentIdentifier.create("rec", "0", status=PIDStatus.REGISTERED)
+        db.session.commit()
+        rec_uuid = uuid.uuid4()
+
+        with patch("invenio_pidstore.models.db.session.begin_nested") as mock:
+            with current_pidstore.batch():
+                pid = PersistentIdentifier.create("rec", "1")
+                pid.reserve()
+                pid.assign("rec", rec_uuid)
+                pid.register()
+                other = PersistentIdentifier.create("rec", "2")
+                other.delete()
+                with batch():
+                    moved = PersistentIdentifier.create(
+                        "rec", "3", status=PIDStatus.REGISTERED
+                    )
+                moved.redirect(target)
+            assert not mock.called
+        db.session.commit()
+
+        pid = PersistentIdentifier.get("rec", "1")
+        assert pid.status == PIDStatus.REGISTERED
+        assert pid.object_uuid == rec_uuid
+        assert PersistentIdentifier.get("rec", "3").get_redirect() == target
+        assert PersistentIdentifier.query.count() == 3
+
+        # Errors are raised when the surrounding unit of work is flushed.
+        with batch():
+            PersistentIdentifier.create("rec", "1")
+        pytest.raises(IntegrityError, db.session.commit)
+        db.session.rollback()
+        assert PersistentIdentifier.query.count() == 3
+
+
 @patch("invenio_pidstore.models.logger")
 def test_sync_status(logger, app, db):
     """Test sync status."""
@@ -388,6 +810,70 @@ def test_sync_status(logger, app, db):
             assert "pid" in logger.exception.call_args[1]["extra"]
 
 
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_transitions(app, db, returning):
+    """Test set-based status transitions."""
+    with (
+        app.app_context(),
+        patch.multiple(
+            db.engine.dialect, update_returning=returning, delete_returning=returning
+        ),
+    ):
+        for value, status in [
+            ("1", PIDStatus.NEW),
+            ("2", PIDStatus.RESERVED),
+            ("3", PIDStatus.REGISTERED),
+            ("4", PIDStatus.DELETED),
+            ("5", PIDStatus.NEW),
+        ]:
+            PersistentIdentifier.create("rec", value, status=status)
+        PersistentIdentifier.create("doi", "1")
+        PersistentIdentifier.create(
+            "rec", "6", pid_provider=POOL_PROVIDER, status=PIDStatus.RESERVED
+        )
+        db.session.commit()
+        pid = PersistentIdentifier.get("rec", "1")
+
+        count, rejected = PersistentIdentifier.bulk_reserve("rec", ["1", "3", "9"])
+        assert count == 1
+        assert [(r.pid_value, r.status) for r in rejected] == [("3", "R")]
+        # Loaded instances are synchronized.
+        assert pid.status == PIDStatus.RESERVED
+
+        count, rejected = PersistentIdentifier.bulk_register(
+            "rec", statuses=[PIDStatus.RESERVED]
+        )
+        assert count == 2
+        assert rejected == []
+        assert PersistentIdentifier.get("rec", "2").is_registered()
+        assert PersistentIdentifier.get("rec", "5").is_new()
+        assert PersistentIdentifier.get("doi", "1").is_new()
+        # Unclaimed pooled PIDs are left alone.
+        assert PersistentIdentifier.get("rec", "6").is_reserved()
+
+        count, rejected = PersistentIdentifier.bulk_register(
+            "rec", created_before=datetime(2000, 1, 1)
+        )
+        assert (count, rejected) == (0, [])
+
+        count, rejected = PersistentIdentifier.bulk_delete("rec", ["1", "4", "5"])
+        assert count == 2
+        assert rejected == []
+        assert PersistentIdentifier.get("rec", "1").is_deleted()
+        pytest.raises(PIDDoesNotExistError, PersistentIdentifier.get, "rec", "5")
+
+        count, rejected = PersistentIdentifier.bulk_sync_status("rec", "R")
+        assert count == 2
+        assert (
+            PersistentIdentifier.query.filter_by(
+                pid_type="rec", status=PIDStatus.REGISTERED
+            ).count()
+            == 4
+        )
+        assert ("rec", "4") in db.session.info[CHANGED_PIDS_KEY]
+        db.session.commit()
+
+
 def test_repr(app, db):
     """Test representation."""
     with app.app_context():
@@ -10,7 +10,15 @@ import uuid
 import pytest
 
 from invenio_pidstore import current_pidstore
-from invenio_pidstore.minters import recid_minter, recid_minter_v2
+from invenio_pidstore.errors import PIDAlreadyExists
+from invenio_pidstore.minters import (
+    batch_minter_adapter,
+    recid_minter,
+    recid_minter_many,
+    recid_minter_v2,
+    recid_minter_v2_many,
+)
+from invenio_pidstore.models import PersistentIdentifier
 
 
 def test_recid_minter(app, db):
@@ -45,6 +53,72 @@ def test_recid_minter_v2(app, db):
             recid_minter_v2(rec_uuid, {recid_field: "1"})
 
 
+@pytest.mark.parametrize("block_size", [None, 2])
+def test_recid_minter_many(app, db, block_size):
+    """Test batch legacy recid minter."""
+    app.config["PIDSTORE_RECID_BLOCK_SIZE"] = block_size
+    with app.app_context():
+        recid_field = app.config["PIDSTORE_RECID_FIELD"]
+        records = [(uuid.uuid4(), {}) for _ in range(3)]
+
+        pids = recid_minter_many(records)
+
+        assert [p.pid_value for p in pids] == ["1", "2", "3"]
+        for (rec_uuid, data), pid in zip(records, pids):
+            assert data[recid_field] == pid.pid_value
+            assert pid.object_type == "rec"
+            assert pid.object_uuid == rec_uuid
+            assert pid.is_registered()
+        assert recid_minter(uuid.uuid4(), {}).pid_value == "4"
+        assert recid_minter_many([]) == []
+
+        # Nothing is inserted if one of the record identifiers exists.
+        PersistentIdentifier.create("recid", "5")
+        with pytest.raises(PIDAlreadyExists):
+            recid_minter_many([(uuid.uuid4(), {}), (uuid.uuid4(), {})])
+        assert not PersistentIdentifier.query.filter_by(
+            pid_type="recid", pid_value="6"
+        ).count()
+
+
+def test_recid_minter_v2_many(app, db):
+    """Test batch recommended recid minter."""
+    with app.app_context():
+        recid_field = app.config["PIDSTORE_RECID_FIELD"]
+        records = [(uuid.uuid4(), {}) for _ in range(3)]
+
+        pids = recid_minter_v2_many(records)
+
+        assert len(set(p.pid_value for p in pids)) == 3
+        for (rec_uuid, data), pid in zip(records, pids):
+            assert data[recid_field] == pid.pid_value
+            assert pid.object_uuid == rec_uuid
+            assert pid.is_registered()
+
+        with pytest.raises(AssertionError):
+            recid_minter_v2_many([(uuid.uuid4(), {recid_field: "1"})])
+
+
+def test_batch_minters(app, db):
+    """Test batch minter registration and fallback."""
+    with app.app_context():
+        assert current_pidstore.get_batch_minter("recid_v2") is recid_minter_v2_many
+        assert current_pidstore.get_batch_minter("recid") is recid_minter_many
+
+        current_pidstore.register_minter("single", recid_minter)
+        mint_many = current_pidstore.get_batch_minter("single")
+        records = [(uuid.uuid4(), {}), (uuid.uuid4(), {})]
+        assert [p.pid_value for p in mint_many(records)] == ["1", "2"]
+        assert records[1][1]["control_number"] == "2"
+
+        current_pidstore.register_batch_minter(
+            "single", batch_minter_adapter(recid_minter_v2)
+        )
+        assert current_pidstore.get_batch_minter("single") is not mint_many
+        with pytest.raises(KeyError):
+            current_pidstore.get_batch_minter("unknown")
+
+
 def test_register_minter(app):
     """Test base provider."""
     with app.app_context():
@@ -9,6 +9,7 @@ from __future__ import absolute_import, print_function
 import uuid
 
 import pytest
+from base32_lib import base32
 from datacite.errors import (
     DataCiteError,
     DataCiteGoneError,
@@ -18,11 +19,15 @@ from datacite.errors import (
 )
 from mock import MagicMock, patch
 
-from invenio_pidstore.models import PIDStatus
+from invenio_pidstore.errors import PIDAlreadyExists
+from invenio_pidstore.models import PersistentIdentifier, PIDStatus, RecordIdentifier
 from invenio_pidstore.providers.base import BaseProvider
 from invenio_pidstore.providers.datacite import DataCiteProvider
-from invenio_pidstore.providers.recordid import RecordIdProvider
-from invenio_pidstore.providers.recordid_v2 import RecordIdProviderV2
+from invenio_pidstore.providers.recordid import RESERVED_BLOCKS_KEY, RecordIdProvider
+from invenio_pidstore.providers.recordid_v2 import (
+    RecordIdGenerator,
+    RecordIdProviderV2,
+)
 
 
 def test_base_provider(app, db):
@@ -91,6 +96,40 @@ def test_recordid_provider(app, db):
         pytest.raises(AssertionError, RecordIdProvider.create, pid_value="3")
 
 
+def test_recordid_provider_blocks(app, db):
+    """Test record id provider with block allocation."""
+    app.config["PIDSTORE_RECID_BLOCK_SIZE"] = 3
+    with app.app_context():
+        allocator = app.extensions["invenio-pidstore"].recid_allocator
+        assert allocator.block_size == 3
+        values = [RecordIdProvider.create().pid.pid_value for _ in range(4)]
+        assert values == ["1", "2", "3", "4"]
+        assert RecordIdentifier.max() == 6
+
+        # Uncommitted blocks are only handed out within the reserving session.
+        assert not allocator._ids
+        assert list(db.session.info[RESERVED_BLOCKS_KEY][allocator]) == [5, 6]
+        db.session.commit()
+        assert list(allocator._ids) == [5, 6]
+
+        # Blocks reserved in a rolled back transaction are discarded.
+        assert RecordIdProvider.create().pid.pid_value == "5"
+        RecordIdProvider.create()
+        RecordIdProvider.create()
+        assert RecordIdentifier.max() == 9
+        db.session.rollback()
+        assert not allocator._ids
+        assert RESERVED_BLOCKS_KEY not in db.session.info
+        assert int(RecordIdProvider.create().pid.pid_value) >= 7
+        db.session.commit()
+
+        # Without block allocation
+        app.config["PIDSTORE_RECID_BLOCK_SIZE"] = None
+        app.extensions["invenio-pidstore"]._recid_allocator = None
+        assert app.extensions["invenio-pidstore"].recid_allocator is None
+        assert RecordIdProvider.create().pid.pid_value == str(RecordIdentifier.max())
+
+
 def test_recordid_provider_v2(app, db):
     """Test RecordIdProviderV2."""
     with app.app_context():
@@ -133,6 +172,129 @@ def test_recordid_provider_v2(app, db):
         assert len(part3) == 1
 
 
+def test_recordid_provider_v2_generate_ids(app, db):
+    """Test bulk generation of record ids."""
+    with app.app_context():
+        ids = RecordIdProviderV2.generate_ids(100)
+        assert len(set(ids)) == 100
+        for value in ids:
+            part1, part2 = value.split("-")
+            assert len(part1) == 5
+            assert len(part2) == 5
+            assert base32.decode(value, checksum=True) >= 0
+
+        ids = RecordIdProviderV2.generate_ids(
+            10, options={"length": 7, "split_every": 3, "checksum": False}
+        )
+        assert all(len(v) == 9 and v[3] == "-" and v[7] == "-" for v in ids)
+        assert RecordIdProviderV2.generate_ids(0) == []
+
+        # Options are resolved once, and again when replaced.
+        state = app.extensions["invenio-pidstore"]
+        generator = state.recid_generator
+        assert generator == RecordIdGenerator(10, 5, True)
+        assert RecordIdProviderV2.generator() is generator
+        app.config["PIDSTORE_RECORDID_OPTIONS"] = {"length": 4}
+        assert RecordIdProviderV2.generator() == RecordIdGenerator(4, 0, True)
+        assert RecordIdProviderV2.generator({"foo": 1}).length == 4
+
+    with pytest.raises(ValueError):
+        RecordIdGenerator(2, 0, True).generate_ids(1)
+    with pytest.raises(ValueError):
+        RecordIdGenerator(5, -1, True).generate_ids(1)
+
+
+def test_recordid_provider_v2_create_many(app, db):
+    """Test batch creation of record ids."""
+    with app.app_context():
+        rec_uuid = uuid.uuid4()
+        providers = RecordIdProviderV2.create_many([None, ("rec", rec_uuid)])
+        assert len(providers) == 2
+        assert providers[0].pid.status == PIDStatus.RESERVED
+        assert providers[0].pid.object_uuid is None
+        assert providers[1].pid.status == PIDStatus.REGISTERED
+        assert providers[1].pid.object_uuid == rec_uuid
+        assert len(providers[1].pid.pid_value) == 11
+        assert RecordIdProviderV2.create_many([]) == []
+
+        # Only colliding ids are regenerated.
+        taken = providers[0].pid.pid_value
+        stats = RecordIdProviderV2.stats()
+        with patch.object(
+            RecordIdGenerator,
+            "generate_ids",
+            side_effect=[[taken, "b", "b"], ["c", "d"]],
+        ) as generate_ids:
+            providers = RecordIdProviderV2.create_many([None] * 3, status=PIDStatus.NEW)
+        assert [p.pid.pid_value for p in providers] == ["c", "b", "d"]
+        assert [c[0][0] for c in generate_ids.call_args_list] == [3, 2]
+        assert providers[0].pid.status == PIDStatus.NEW
+        assert RecordIdProviderV2.stats()["generated"] == stats["generated"] + 5
+        assert RecordIdProviderV2.stats()["collisions"] == stats["collisions"] + 2
+        assert 0 < RecordIdProviderV2.stats()["collision_rate"] < 1
+
+        # Ids inserted concurrently after the check are regenerated too.
+        with (
+            patch.object(
+                RecordIdGenerator, "generate_ids", side_effect=[["b", "e"], ["f"]]
+            ),
+            patch.object(RecordIdProviderV2, "max_retries", 1),
+            patch(
+                "invenio_pidstore.models.PersistentIdentifier._existing_keys",
+                return_value=set(),
+            ),
+        ):
+            providers = RecordIdProviderV2.create_many([None, None])
+        assert [p.pid.pid_value for p in providers] == ["f", "e"]
+
+        # Retries are bounded and nothing is inserted when they run out.
+        with patch.object(
+            RecordIdGenerator, "generate_ids", side_effect=[["a0", "a1", "b"], ["b"]]
+        ):
+            with pytest.raises(PIDAlreadyExists):
+                RecordIdProviderV2.create_many([None] * 3, max_retries=1)
+        assert not PersistentIdentifier.query.filter(
+            PersistentIdentifier.pid_value.in_(["a0", "a1"])
+        ).count()
+
+
+def test_recordid_provider_v2_pool(app, db):
+    """Test claiming record ids from the pool."""
+    with app.app_context():
+        assert RecordIdProviderV2.fill_pool(size=2) == 2
+        pooled = set(
+            pid.pid_value
+            for pid in PersistentIdentifier.query.filter_by(pid_provider="pool")
+        )
+        db.session.commit()
+
+        # The pool is not used unless enabled.
+        assert RecordIdProviderV2.create().pid.pid_value not in pooled
+
+        app.config["PIDSTORE_RECID_POOL_SIZE"] = 2
+        rec_uuid = uuid.uuid4()
+        provider = RecordIdProviderV2.create(object_type="rec", object_uuid=rec_uuid)
+        assert provider.pid.pid_value in pooled
+        assert provider.pid.pid_provider is None
+        assert provider.pid.status == PIDStatus.REGISTERED
+        assert provider.pid.object_uuid == rec_uuid
+        assert RecordIdProviderV2.get(provider.pid.pid_value).pid == provider.pid
+
+        provider = RecordIdProviderV2.create()
+        assert provider.pid.pid_value in pooled
+        assert provider.pid.status == PIDStatus.RESERVED
+        assert provider.pid.object_uuid is None
+
+        # Empty pool
+        assert RecordIdProviderV2.create().pid.pid_value not in pooled
+        assert RecordIdProviderV2.fill_pool() == 2
+        assert RecordIdProviderV2.fill_pool() == 0
+
+        # Options bypass the pool.
+        provider = RecordIdProviderV2.create(options={"length": 4})
+        assert len(provider.pid.pid_value) == 4
+
+
 def test_datacite_create_get(app, db):
     """Test datacite provider create/get."""
     with app.app_context():
@@ -34,3 +34,29 @@ def test_record_identifier(app, db):
         RecordIdentifier.insert(7)
         assert RecordIdentifier.max() == 11
         assert RecordIdentifier.next() == 12
+
+
+def test_record_identifier_block(app, db):
+    """Test reservation of blocks of record identifiers."""
+    with app.app_context():
+        assert RecordIdentifier.next() == 1
+        assert RecordIdentifier.next_block(5) == [2, 3, 4, 5, 6]
+        assert RecordIdentifier.max() == 6
+        assert RecordIdentifier.next() == 7
+        assert RecordIdentifier.next_block(1) == [8]
+
+
+def test_record_identifier_compact(app, db):
+    """Test compaction of the record identifier table."""
+    with app.app_context():
+        assert list(RecordIdentifier.compact()) == []
+        for _ in range(5):
+            RecordIdentifier.next()
+        db.session.commit()
+
+        assert list(RecordIdentifier.compact(batch_size=3)) == [3, 1]
+        db.session.commit()
+        assert RecordIdentifier.query.count() == 1
+        assert RecordIdentifier.max() == 5
+        assert RecordIdentifier.next() == 6
+        assert list(RecordIdentifier.compact()) == [1]
@@ -8,19 +8,22 @@ from __future__ import absolute_import, print_function
 import uuid
 
 import pytest
+from sqlalchemy.orm.exc import NoResultFound
 
 from invenio_pidstore.errors import (
     PIDDeletedError,
     PIDDoesNotExistError,
     PIDMissingObjectError,
     PIDRedirectedError,
+    PIDRedirectLoopError,
     PIDUnregistered,
 )
-from invenio_pidstore.models import PersistentIdentifier, PIDStatus
+from invenio_pidstore.models import PersistentIdentifier, PIDRecord, PIDStatus
 from invenio_pidstore.resolver import Resolver
 
 
-def test_resolver(app, db):
+@pytest.mark.parametrize("read_only", [False, True])
+def test_resolver(app, db, read_only):
     """Test the class methods of PersistentIdentifier class."""
     status = [
         PIDStatus.NEW,
@@ -61,7 +64,12 @@ def test_resolver(app, db):
         db.session.commit()
 
         # Start tests
-        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+        resolver = Resolver(
+            pid_type="recid",
+            object_type="rec",
+            getter=lambda x: x,
+            read_only=read_only,
+        )
 
         # Resolve non-existing pid
         pytest.raises(PIDDoesNotExistError, resolver.resolve, "100")
@@ -79,6 +87,7 @@ def test_resolver(app, db):
         pytest.raises(PIDMissingObjectError, resolver.resolve, "5")
         pid, obj = resolver.resolve("6")
         assert pid and obj == rec_a
+        assert isinstance(pid, PIDRecord) == read_only
 
         # Resolve status deleted
         pytest.raises(PIDDeletedError, resolver.resolve, "7")
@@ -98,7 +107,12 @@ def test_resolver(app, db):
             assert e.destination_pid.pid_type == "doi"
             assert e.destination_pid.pid_value == "10.1234/foo"
 
-        doiresolver = Resolver(pid_type="doi", object_type="rec", getter=lambda x: x)
+        doiresolver = Resolver(
+            pid_type="doi",
+            object_type="rec",
+            getter=lambda x: x,
+            read_only=read_only,
+        )
         pytest.raises(PIDDoesNotExistError, doiresolver.resolve, "1")
         pid, obj = doiresolver.resolve("10.1234/foo")
         assert pid and obj == rec_a
@@ -166,3 +180,215 @@ def test_resolver_not_registered_only(app, db):
         pytest.raises(PIDMissingObjectError, resolver.resolve, "5")
         pid, obj = resolver.resolve("6")
         assert pid and obj == rec_a
+
+
+def test_resolver_resolve_many(app, db):
+    """Test resolving many persistent identifiers at once."""
+    with app.app_context():
+        rec_a = uuid.uuid4()
+        rec_b = uuid.uuid4()
+        PersistentIdentifier.create("recid", "1", status=PIDStatus.NEW)
+        PersistentIdentifier.create("recid", "2", status=PIDStatus.REGISTERED)
+        PersistentIdentifier.create(
+            "recid",
+            "3",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=rec_a,
+        )
+        pid = PersistentIdentifier.create(
+            "recid",
+            "4",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=rec_b,
+        )
+        pid.delete()
+        pid = PersistentIdentifier.create("recid", "5", status=PIDStatus.REGISTERED)
+        pid.redirect(PersistentIdentifier.get("recid", "3"))
+        PersistentIdentifier.create(
+            "recid",
+            "6",
+            status=PIDStatus.RESERVED,
+            object_type="rec",
+            object_uuid=rec_b,
+        )
+        db.session.commit()
+
+        calls = []
+
+        def getter_many(obj_ids):
+            calls.append(obj_ids)
+            return {rec_a: "a"}
+
+        resolver = Resolver(
+            pid_type="recid",
+            object_type="rec",
+            getter=lambda x: x,
+            getter_many=getter_many,
+        )
+        values = ["1", "2", "3", "4", "5", "6", "100", 3]
+        res = resolver.resolve_many(values)
+        assert list(res) == ["1", "2", "3", "4", "5", "6", "100"]
+        assert calls == [[rec_a, rec_b]]
+        assert isinstance(res["1"], PIDUnregistered)
+        assert isinstance(res["2"], PIDMissingObjectError)
+        pid, obj = res["3"]
+        assert pid.pid_value == "3" and obj == "a"
+        assert isinstance(res["4"], PIDDeletedError)
+        assert res["4"].record is None
+        assert isinstance(res["5"], PIDRedirectedError)
+        assert res["5"].destination_pid.pid_value == "3"
+        assert isinstance(res["6"], PIDUnregistered)
+        assert isinstance(res["100"], PIDDoesNotExistError)
+
+        # Results are consistent with single resolution
+        for value, r in res.items():
+            if isinstance(r, Exception):
+                pytest.raises(type(r), resolver.resolve, value)
+
+        # Without a batch getter the single getter is used
+        resolver = Resolver(
+            pid_type="recid",
+            object_type="rec",
+            getter=lambda x: x,
+            registered_only=False,
+        )
+        res = resolver.resolve_many(["3", "4", "6"])
+        assert res["3"][1] == rec_a
+        assert res["4"].record == rec_b
+        assert res["6"][1] == rec_b
+        assert resolver.resolve_many([]) == {}
+
+        def getter(obj_id):
+            raise NoResultFound()
+
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=getter)
+        assert resolver.resolve_many(["4"])["4"].record is None
+
+
+def test_resolver_cache(app, db):
+    """Test the resolver cache and its invalidation."""
+    app.config["PIDSTORE_RESOLVER_CACHE"] = dict(max_entries=10, ttl=60)
+    with app.app_context():
+        rec_a = uuid.uuid4()
+        pid = PersistentIdentifier.create(
+            "recid",
+            "1",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=rec_a,
+        )
+        dest = PersistentIdentifier.create(
+            "recid",
+            "2",
+            status=PIDStatus.REGISTERED,
+            object_type="rec",
+            object_uuid=rec_a,
+        )
+        PersistentIdentifier.create("recid", "3", status=PIDStatus.REGISTERED)
+        db.session.commit()
+
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+        cache = app.extensions["invenio-pidstore"].resolver_cache
+
+        resolved, obj = resolver.resolve("1")
+        assert resolved is pid and obj == rec_a
+        resolved, obj = resolver.resolve("1")
+        # Cache hits return the instance of the session, if any.
+        assert resolved is pid and obj == rec_a
+        assert cache.stats == dict(hits=1, misses=1, size=1)
+
+        # Changes bypass the cache until committed, then invalidate it.
+        pid.delete()
+        pytest.raises(PIDDeletedError, resolver.resolve, "1")
+        assert cache.stats["hits"] == 1
+        db.session.commit()
+        assert len(cache) == 0
+        pytest.raises(PIDDeletedError, resolver.resolve, "1")
+        pytest.raises(PIDDeletedError, resolver.resolve, "1")
+        assert cache.stats == dict(hits=2, misses=2, size=1)
+
+        # Rolled back changes keep the cache entry.
+        pid.sync_status(PIDStatus.REGISTERED)
+        db.session.rollback()
+        db.session.commit()
+        assert len(cache) == 1
+
+        # Redirection targets are cached.
+        pid = PersistentIdentifier.get("recid", "3")
+        pid.redirect(dest)
+        db.session.commit()
+        for _ in range(2):
+            with pytest.raises(PIDRedirectedError) as exc_info:
+                resolver.resolve("3")
+            assert exc_info.value.destination_pid.pid_value == "2"
+        assert cache.stats == dict(hits=3, misses=3, size=2)
+
+
+def test_resolver_follow_redirects(app, db):
+    """Test following chains of redirections in a single query."""
+    with app.app_context():
+        rec_a = uuid.uuid4()
+        pids = [
+            PersistentIdentifier.create("recid", str(i), status=PIDStatus.REGISTERED)
+            for i in range(1, 7)
+        ]
+        pids[0].assign("rec", rec_a)
+        # 4 -> 3 -> 2 -> 1
+        pids[1].redirect(pids[0])
+        pids[2].redirect(pids[1])
+        pids[3].redirect(pids[2])
+        # 5 -> 6 -> 5
+        pids[4].redirect(pids[5])
+        pids[5].redirect(pids[4])
+        db.session.commit()
+
+        chain = PersistentIdentifier.get_redirect_chain("recid", "4")
+        assert [p.pid_value for p in chain] == ["4", "3", "2", "1"]
+        chain = PersistentIdentifier.get_redirect_chain("recid", "4", max_depth=1)
+        assert [p.pid_value for p in chain] == ["4", "3"]
+        # Loops are cut at the first revisited PID.
+        chain = PersistentIdentifier.get_redirect_chain("recid", "5")
+        assert [p.pid_value for p in chain] == ["5", "6", "5"]
+        chain = PersistentIdentifier.get_redirect_chain("recid", "5", max_depth=1)
+        assert [p.pid_value for p in chain] == ["5", "6"]
+        assert PersistentIdentifier.get_redirect_chain("recid", "100") == []
+
+        resolver = Resolver(
+            pid_type="recid",
+            object_type="rec",
+            getter=lambda x: x,
+            follow_redirects=True,
+        )
+        pid, obj = resolver.resolve("1")
+        assert pid.pid_value == "1" and obj == rec_a
+        with pytest.raises(PIDRedirectedError) as exc_info:
+            resolver.resolve("4")
+        assert exc_info.value.pid.pid_value == "4"
+        assert exc_info.value.destination_pid.pid_value == "1"
+        assert [p.pid_value for p in exc_info.value.hops] == ["4", "3", "2"]
+
+        final, hops = resolver.resolve_redirects("3")
+        assert final.pid_value == "1"
+        assert [p.pid_value for p in hops] == ["3", "2"]
+        final, hops = resolver.resolve_redirects("1")
+        assert final.pid_value == "1" and hops == []
+
+        pytest.raises(PIDDoesNotExistError, resolver.resolve, "100")
+        with pytest.raises(PIDRedirectLoopError) as exc_info:
+            resolver.resolve("5")
+        assert [p.pid_value for p in exc_info.value.hops] == ["5", "6"]
+
+        # Too many redirections
+        resolver.max_redirects = 2
+        with pytest.raises(PIDRedirectLoopError) as exc_info:
+            resolver.resolve("4")
+        assert [p.pid_value for p in exc_info.value.hops] == ["4", "3", "2"]
+
+        # Without following, only the first redirection is returned.
+        resolver = Resolver(pid_type="recid", object_type="rec", getter=lambda x: x)
+        with pytest.raises(PIDRedirectedError) as exc_info:
+            resolver.resolve("4")
+        assert exc_info.value.destination_pid.pid_value == "3"
+        assert exc_info.value.hops is None